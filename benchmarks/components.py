@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Per-component microbenchmarks over growing per-user data sizes.
+
+Each benchmark fills one user with ``size`` entries through the component's
+public API, then times a single operation. Results are written as JSON and,
+when matplotlib is installed, plotted as log-log scaling curves.
+
+Example::
+
+    python -m benchmarks.components --max-size 1000000 \\
+        --output bench/components.json --plot bench/components.png
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from voice_ai_agent.memory.episodic_memory import EpisodicMemory  # noqa: E402
+from voice_ai_agent.utils.feedback_processor import FeedbackProcessor  # noqa: E402
+from voice_ai_agent.utils.nlp_processor import NLUProcessor  # noqa: E402
+from voice_ai_agent.utils.recommendation_engine import RecommendationEngine  # noqa: E402
+from voice_ai_agent.utils.scheduler import Scheduler  # noqa: E402
+from voice_ai_agent.utils.task_manager import TaskManager  # noqa: E402
+from voice_ai_agent.utils.voice_command_processor import VoiceCommandProcessor  # noqa: E402
+
+USER = "bench-user"
+Operation = Callable[[], Awaitable[Any]]
+
+
+def _sentence(size: int) -> str:
+    words = ("please", "check", "the", "status", "of", "my", "meeting", "at", "3", "pm")
+    return " ".join(words[i % len(words)] for i in range(size))
+
+
+async def setup_nlu(size: int) -> Operation:
+    processor, text = NLUProcessor(), _sentence(size)
+    return lambda: processor.process_query(text)
+
+
+async def setup_voice_commands(size: int) -> Operation:
+    processor, text = VoiceCommandProcessor(), _sentence(size)
+    return lambda: processor.process_text(text)
+
+
+async def _filled_episodic(size: int) -> EpisodicMemory:
+    memory = EpisodicMemory()
+    for index in range(size):
+        await memory.store_interaction(USER, f"utterance {index}", is_response=bool(index % 2))
+    return memory
+
+
+async def setup_episodic_summary(size: int) -> Operation:
+    memory = await _filled_episodic(size)
+    start, end = datetime.utcnow() - timedelta(hours=1), datetime.utcnow() + timedelta(hours=1)
+    return lambda: memory.summarize_session(USER, start, end)
+
+
+async def setup_episodic_clear(size: int) -> Operation:
+    memory = await _filled_episodic(size)
+    # Nothing is old enough to be removed, so every run scans the full list.
+    return lambda: memory.clear_old_interactions(USER, days_to_keep=3650)
+
+
+async def setup_feedback_score(size: int) -> Operation:
+    processor = FeedbackProcessor()
+    for index in range(size):
+        await processor.submit_rating(USER, index % 5 + 1)
+
+    return lambda: processor.get_user_satisfaction_score(USER)
+
+
+async def setup_recommendations(size: int) -> Operation:
+    # Candidates are compiled when preferences change, so a turn's cost
+    # depends on the user's recommendation history rather than preferences.
+    # A committed turn generates suggestions and records the delivered ones.
+    engine = RecommendationEngine(history_limit=size)
+    await engine.import_users({USER: {"history": [f"suggestion {i}" for i in range(size)]}})
+
+    async def operation() -> None:
+        recommendations = await engine.generate_recommendations(USER, context="I need to call the office")
+        await engine.record_history(USER, [rec.content for rec in recommendations])
+
+    return operation
+
+
+async def setup_task_summary(size: int) -> Operation:
+    manager = TaskManager()
+    for index in range(size):
+        await manager.add_task(USER, {"title": f"task {index}", "done": index % 3 == 0})
+    return lambda: manager.get_task_summary(USER)
+
+
+async def setup_event_summary(size: int) -> Operation:
+    scheduler = Scheduler()
+    now = datetime.utcnow()
+    for index in range(size):
+        await scheduler.add_event(USER, f"event {index}", now + timedelta(minutes=index))
+    return lambda: scheduler.get_event_summary(USER)
+
+
+BENCHMARKS: Dict[str, Callable[[int], Awaitable[Operation]]] = {
+    "NLUProcessor.process_query": setup_nlu,
+    "VoiceCommandProcessor.process_text": setup_voice_commands,
+    "EpisodicMemory.summarize_session": setup_episodic_summary,
+    "EpisodicMemory.clear_old_interactions": setup_episodic_clear,
+    "FeedbackProcessor.get_user_satisfaction_score": setup_feedback_score,
+    "RecommendationEngine.generate_recommendations": setup_recommendations,
+    "TaskManager.get_task_summary": setup_task_summary,
+    "Scheduler.get_event_summary": setup_event_summary,
+}
+
+
+async def time_operation(operation: Operation, min_time: float, max_runs: int) -> Dict[str, float]:
+    """Run ``operation`` repeatedly and return per-call timings in microseconds."""
+
+    timings: List[float] = []
+    budget_end = time.perf_counter() + min_time
+    while len(timings) < max_runs and (len(timings) < 3 or time.perf_counter() < budget_end):
+        started = time.perf_counter()
+        await operation()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return {
+        "runs": len(timings),
+        "median_us": round(timings[len(timings) // 2] * 1e6, 3),
+        "min_us": round(timings[0] * 1e6, 3),
+        "max_us": round(timings[-1] * 1e6, 3),
+    }
+
+
+def scaling_exponent(points: List[Dict[str, Any]]) -> Optional[float]:
+    """Log-log slope between the smallest and largest size (1.0 = linear)."""
+
+    if len(points) < 2:
+        return None
+    first, last = points[0], points[-1]
+    if first["median_us"] <= 0 or last["median_us"] <= 0:
+        return None
+    return round(
+        math.log(last["median_us"] / first["median_us"]) / math.log(last["size"] / first["size"]), 3
+    )
+
+
+async def run_suite(names: List[str], sizes: List[int], min_time: float, max_runs: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for name in names:
+        points = []
+        for size in sizes:
+            operation = await BENCHMARKS[name](size)
+            timing = await time_operation(operation, min_time, max_runs)
+            points.append({"size": size, **timing})
+            print(f"{name:50s} size={size:>9d} median={timing['median_us']:>14.3f} us", flush=True)
+        results[name] = {"points": points, "scaling_exponent": scaling_exponent(points)}
+    return results
+
+
+def plot(results: Dict[str, Any], path: Path) -> bool:
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except Exception:  # pragma: no cover - optional dependency
+        print("matplotlib is not installed; skipping plot", file=sys.stderr)
+        return False
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for name, data in results.items():
+        sizes = [point["size"] for point in data["points"]]
+        medians = [point["median_us"] for point in data["points"]]
+        ax.plot(sizes, medians, marker="o", label=name)
+    ax.set_xscale("log")
+    ax.set_yscale("log")
+    ax.set_xlabel("entries per user")
+    ax.set_ylabel("median time per call (us)")
+    ax.grid(True, which="both", alpha=0.3)
+    ax.legend(fontsize="small")
+    fig.tight_layout()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(path)
+    return True
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-size", type=int, default=10)
+    parser.add_argument("--max-size", type=int, default=1_000_000)
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="run a subset")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds spent timing each point")
+    parser.add_argument("--max-runs", type=int, default=10_000)
+    parser.add_argument("--output", type=Path, help="write JSON results to this file")
+    parser.add_argument("--plot", type=Path, help="write a log-log scaling plot (needs matplotlib)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    sizes = []
+    size = args.min_size
+    while size <= args.max_size:
+        sizes.append(size)
+        size *= 10
+
+    names = args.only or list(BENCHMARKS)
+    results = asyncio.run(run_suite(names, sizes, args.min_time, args.max_runs))
+    for name, data in results.items():
+        print(f"{name:50s} scaling exponent: {data['scaling_exponent']}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"generated_at": datetime.now().isoformat(), "sizes": sizes, "results": results}
+        args.output.write_text(json.dumps(payload, indent=2) + "\n")
+    if args.plot:
+        plot(results, args.plot)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
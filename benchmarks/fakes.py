@@ -0,0 +1,122 @@
+"""Local stand-ins for the LLM and translation model used in benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+
+@dataclass
+class LatencyDistribution:
+    """Latency model parsed from ``kind[:a[:b]]`` specs (seconds).
+
+    Supported kinds: ``constant:value``, ``uniform:low:high``,
+    ``exponential:mean`` and ``lognormal:median:sigma``.
+    """
+
+    kind: str = "constant"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        kind, *params = spec.split(":")
+        values = [float(value) for value in params] + [0.0, 0.0]
+        if kind not in {"constant", "uniform", "exponential", "lognormal"}:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        return cls(kind, values[0], values[1])
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "exponential":
+            return rng.expovariate(1 / self.a) if self.a > 0 else 0.0
+        if self.kind == "lognormal":
+            return self.a * rng.lognormvariate(0.0, self.b)
+        return self.a
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{self.a}:{self.b}"
+
+
+class FakeAsyncOpenAI:
+    """Mimics ``AsyncOpenAI.chat.completions.create`` with simulated latency."""
+
+    def __init__(
+        self,
+        latency: LatencyDistribution,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        stall_rate: float = 0.0,
+        stall_factor: float = 20.0,
+    ) -> None:
+        self._latency = latency
+        self._error_rate = error_rate
+        # A stalled request takes stall_factor times its sampled latency,
+        # reproducing the long tail that hedging and deadlines cut off.
+        self._stall_rate = stall_rate
+        self._stall_factor = stall_factor
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, *, model: str, messages: List[Dict[str, str]], **_: object) -> SimpleNamespace:
+        self.calls += 1
+        delay = self._latency.sample(self._rng)
+        if self._stall_rate and self._rng.random() < self._stall_rate:
+            delay *= self._stall_factor
+        await asyncio.sleep(delay)
+        if self._error_rate and self._rng.random() < self._error_rate:
+            raise RuntimeError("Simulated LLM failure")
+        content = f"Simulated reply to: {messages[-1]['content'][:40]}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class StubTranslator:
+    """Callable matching the ``transformers`` translation pipeline interface.
+
+    The real pipeline is CPU-bound on the translation worker thread, so the
+    stub busy-waits for its simulated latency to reproduce that cost.
+    """
+
+    def __init__(self, latency: LatencyDistribution, seed: int = 0) -> None:
+        self._latency = latency
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    def __call__(self, text: str, **_: object) -> List[Dict[str, str]]:
+        self.calls += 1
+        deadline = time.perf_counter() + self._latency.sample(self._rng)
+        while time.perf_counter() < deadline:
+            pass
+        return [{"translation_text": text}]
+
+
+def rss_bytes() -> int:
+    """Return the current resident set size of this process."""
+
+    try:
+        with open("/proc/self/statm", "rb") as handle:
+            pages = int(handle.read().split()[1])
+        import os
+
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        # ru_maxrss is a high-water mark in KiB on Linux; good enough elsewhere.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+async def sample_loop_lag(samples: List[float], stop: asyncio.Event, interval: float = 0.01) -> None:
+    """Record how late the event loop wakes up after each ``interval`` sleep."""
+
+    clock: Callable[[], float] = time.perf_counter
+    while not stop.is_set():
+        expected = clock() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, clock() - expected))
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Offline load generator for ``IntegratedVoiceAgent``.
+
+Drives synthetic users through ``start_session`` -> ``process_user_input``
+-> ``end_session`` with a fake LLM and a stub translation model, then reports
+throughput, turn latency percentiles, event-loop lag and RSS growth.
+
+Example::
+
+    python -m benchmarks.load_agent --users 2000 --concurrency 200 \\
+        --llm-latency lognormal:0.25:0.4 --output bench/baseline.json
+    python -m benchmarks.load_agent --users 2000 --compare bench/baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from benchmarks.fakes import (  # noqa: E402
+    FakeAsyncOpenAI,
+    LatencyDistribution,
+    StubTranslator,
+    rss_bytes,
+    sample_loop_lag,
+)
+
+_UTTERANCES = [
+    "Hello, how are you?",
+    "Can you remind me to call John at 3 PM?",
+    "What's the status of my tasks?",
+    "Schedule a meeting with the design team tomorrow",
+    "Turn the lights on please",
+    "Tell me something interesting about the weather",
+    "Remember that my favourite colour is green",
+    "Open dashboard",
+]
+
+# Metrics where a higher value is worse; used when comparing with a baseline.
+_LOWER_IS_BETTER = (
+    ("latency_ms", "p50"),
+    ("latency_ms", "p99"),
+    ("loop_lag_ms", "p99"),
+    ("rss_mb", "growth"),
+)
+
+
+def _percentiles(samples: List[float], scale: float = 1000.0) -> Dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+
+    def pick(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * scale, 3)
+
+    return {"p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99), "max": round(ordered[-1] * scale, 3)}
+
+
+def build_agent(args: argparse.Namespace):
+    from voice_ai_agent.integrated_agent import IntegratedVoiceAgent
+
+    from voice_ai_agent.agents.llm_backends import LLMRouter, OpenAIBackend
+
+    agent = IntegratedVoiceAgent()
+    backends = [
+        OpenAIBackend(
+            FakeAsyncOpenAI(args.llm_latency, args.llm_error_rate, args.seed, stall_rate=args.llm_stall_rate),
+            name="fake-primary",
+        )
+    ]
+    if args.llm_secondary_latency is not None:
+        backends.append(
+            OpenAIBackend(FakeAsyncOpenAI(args.llm_secondary_latency, seed=args.seed + 1), name="fake-secondary")
+        )
+    agent.voice_agent.router = LLMRouter(
+        backends,
+        agent.voice_agent.router.fallback,
+        deadline=args.llm_deadline,
+        attempt_timeout=args.llm_attempt_timeout,
+        hedge_quantile=args.hedge_quantile,
+    )
+    # Installed before first use, so the real translation model never loads.
+    agent.translation_processor._detector = StubTranslator(args.translation_latency, args.seed)
+    agent.turn_deadline = args.turn_deadline
+    return agent
+
+
+async def _run_user(
+    agent: Any,
+    user_index: int,
+    args: argparse.Namespace,
+    semaphore: asyncio.Semaphore,
+    latencies: List[float],
+    errors: List[str],
+) -> None:
+    rng = random.Random(args.seed + user_index)
+    user_id = f"bench-user-{user_index}"
+    for session_index in range(args.sessions):
+        session_id = f"{user_id}-s{session_index}"
+        async with semaphore:
+            await agent.start_session(user_id, session_id)
+            for _ in range(args.turns):
+                text = rng.choice(_UTTERANCES)
+                started = time.perf_counter()
+                try:
+                    await agent.process_user_input(text, user_id)
+                except Exception as exc:  # pragma: no cover - surfaced in the report
+                    errors.append(repr(exc))
+                    continue
+                latencies.append(time.perf_counter() - started)
+                if args.think_time:
+                    await asyncio.sleep(rng.uniform(0, args.think_time))
+            await agent.end_session(session_id)
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    agent = build_agent(args)
+    latencies: List[float] = []
+    errors: List[str] = []
+    lag_samples: List[float] = []
+    stop = asyncio.Event()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    rss_start = rss_bytes()
+    lag_task = asyncio.create_task(sample_loop_lag(lag_samples, stop))
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(_run_user(agent, index, args, semaphore, latencies, errors) for index in range(args.users))
+    )
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await lag_task
+    rss_end = rss_bytes()
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "users": args.users,
+            "sessions": args.sessions,
+            "turns": args.turns,
+            "concurrency": args.concurrency,
+            "think_time": args.think_time,
+            "llm_latency": str(args.llm_latency),
+            "llm_error_rate": args.llm_error_rate,
+            "llm_stall_rate": args.llm_stall_rate,
+            "llm_secondary_latency": str(args.llm_secondary_latency) if args.llm_secondary_latency else None,
+            "llm_deadline": args.llm_deadline,
+            "hedge_quantile": args.hedge_quantile,
+            "turn_deadline": args.turn_deadline,
+            "translation_latency": str(args.translation_latency),
+            "seed": args.seed,
+        },
+        "turns": len(latencies),
+        "errors": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "turns_per_sec": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": _percentiles(latencies),
+        "llm": _counters(
+            "voice_agent_llm_requests_total",
+            "voice_agent_llm_backend_requests_total",
+            "voice_agent_llm_hedges_total",
+        ),
+        "degraded": _counters("voice_agent_degraded_stages_total"),
+        "loop_lag_ms": _percentiles(lag_samples),
+        "rss_mb": {
+            "start": round(rss_start / 2**20, 2),
+            "end": round(rss_end / 2**20, 2),
+            "growth": round((rss_end - rss_start) / 2**20, 2),
+        },
+    }
+
+
+def _counters(*names: str) -> Dict[str, Dict[str, int]]:
+    from voice_ai_agent.utils.metrics import REGISTRY
+
+    outcomes: Dict[str, Dict[str, int]] = {}
+    for name in names:
+        metric = REGISTRY.counter(name, "")
+        section = outcomes.setdefault(name.replace("voice_agent_", "").replace("_total", ""), {})
+        for labels, value in metric._values.items():  # noqa: SLF001 - benchmark report
+            section[":".join(labels)] = int(value)
+    return outcomes
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return human readable regressions of ``result`` against ``baseline``."""
+
+    regressions = []
+    old_tps, new_tps = baseline.get("turns_per_sec", 0.0), result["turns_per_sec"]
+    if old_tps and new_tps < old_tps * (1 - tolerance):
+        regressions.append(f"turns_per_sec {old_tps} -> {new_tps}")
+    for section, key in _LOWER_IS_BETTER:
+        old = baseline.get(section, {}).get(key)
+        new = result[section][key]
+        if old is None:
+            continue
+        # Ignore tiny absolute values where relative noise dominates.
+        if new > old * (1 + tolerance) and new - old > 1.0:
+            regressions.append(f"{section}.{key} {old} -> {new}")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--sessions", type=int, default=2, help="sessions per user")
+    parser.add_argument("--turns", type=int, default=5, help="turns per session")
+    parser.add_argument("--concurrency", type=int, default=100, help="concurrently active sessions")
+    parser.add_argument("--think-time", type=float, default=0.0, help="max pause between turns (s)")
+    parser.add_argument("--llm-latency", type=LatencyDistribution.parse, default=LatencyDistribution.parse("lognormal:0.2:0.5"))
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-stall-rate", type=float, default=0.0, help="fraction of requests taking 20x longer")
+    parser.add_argument("--llm-secondary-latency", type=LatencyDistribution.parse, help="add a failover backend")
+    parser.add_argument("--llm-deadline", type=float, default=6.0, help="per-call LLM deadline (s)")
+    parser.add_argument("--llm-attempt-timeout", type=float, default=4.0, help="per-backend timeout (s)")
+    parser.add_argument("--hedge-quantile", type=float, default=0.95)
+    parser.add_argument("--turn-deadline", type=float, default=4.0, help="per-turn latency budget (s)")
+    parser.add_argument("--translation-latency", type=LatencyDistribution.parse, default=LatencyDistribution.parse("constant:0.0005"))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="write the JSON result to this file")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    result = asyncio.run(run_benchmark(args))
+    print(json.dumps(result, indent=2))
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2) + "\n")
+
+    if args.compare:
+        regressions = compare(result, json.loads(args.compare.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
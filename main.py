@@ -4,35 +4,53 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
 import logging
 import os
 import sys
+import threading
+import time
 from pathlib import Path
 from typing import Optional
 from urllib.parse import urlparse, urlunparse
 
-from dotenv import load_dotenv
+_STARTED = time.perf_counter()
 
-from livekit.agents import WorkerOptions, cli
+from dotenv import load_dotenv
 
 # Ensure the repository root is on the Python path for package imports
 ROOT_DIR = Path(__file__).resolve().parent
 if str(ROOT_DIR) not in sys.path:
     sys.path.append(str(ROOT_DIR))
 
-from voice_ai_agent.integrated_agent import LiveKitVoiceAgent
+from voice_ai_agent.utils.startup import STARTUP
+
+# Time the whole process start, not just what follows this import.
+STARTUP.started = _STARTED
+
+with STARTUP.measure("import", "livekit.agents"):
+    from livekit.agents import WorkerOptions, cli
+
+with STARTUP.measure("import", "voice_ai_agent"):
+    from voice_ai_agent.database.shared_state import StateServer
+    from voice_ai_agent.integrated_agent import IntegratedVoiceAgent, entrypoint, prewarm
+    from voice_ai_agent.utils.metrics import start_metrics_server_from_env
+    from voice_ai_agent.utils.profiler import PROFILER
+    from voice_ai_agent.utils.structured_logging import configure_logging, stop_logging
 
 
 # Load environment variables as early as possible so local development works
 load_dotenv()
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+# Set up logging: records are queued and written by a background thread.
+configure_logging()
+atexit.register(stop_logging)
 logger = logging.getLogger(__name__)
 
+# The shared state daemon hosted by this worker process; job processes only
+# get its socket path through AGENT_STATE_SOCKET.
+_STATE_SERVER: Optional[StateServer] = None
+
 
 async def _probe_livekit_endpoint(url: str, api_key: str, api_secret: str) -> None:
     """Check whether the configured LiveKit deployment is reachable."""
@@ -59,6 +77,19 @@ def _http_url_from_ws_url(url: str) -> str:
     return urlunparse(parsed._replace(scheme=scheme))
 
 
+def _start_connectivity_probe(ws_url: str, api_key: str, api_secret: str) -> threading.Thread:
+    """Probe LiveKit in the background while the worker registers."""
+
+    probe = threading.Thread(
+        target=_verify_livekit_connectivity,
+        args=(ws_url, api_key, api_secret),
+        name="livekit-probe",
+        daemon=True,
+    )
+    probe.start()
+    return probe
+
+
 def _verify_livekit_connectivity(ws_url: str, api_key: str, api_secret: str) -> bool:
     rest_url = _http_url_from_ws_url(ws_url)
     logger.info("Checking LiveKit connectivity at %s", rest_url)
@@ -73,9 +104,61 @@ def _verify_livekit_connectivity(ws_url: str, api_key: str, api_secret: str) ->
         return True
 
 
+def _start_shared_state() -> Optional[StateServer]:
+    """Host per-user stores for every job process spawned by this worker."""
+
+    global _STATE_SERVER
+    if os.getenv("AGENT_SHARED_STATE", "1").lower() in {"0", "false", "no"}:
+        return None
+
+    try:
+        # The parent serves no turns; its agent only owns the hosted stores.
+        with STARTUP.measure("init", "IntegratedVoiceAgent"):
+            agent = IntegratedVoiceAgent()
+        _STATE_SERVER = agent.host_shared_state(os.getenv("AGENT_STATE_SOCKET") or None)
+    except OSError as exc:
+        logger.warning("Could not start shared state daemon: %s", exc)
+        return None
+
+    # Job processes inherit these and attach to the daemon in their entrypoint.
+    os.environ["AGENT_STATE_SOCKET"] = _STATE_SERVER.path
+    os.environ["AGENT_STATE_OWNER_PID"] = str(os.getpid())
+    # The shared stores are exported from here only, not once per job process.
+    start_metrics_server_from_env()
+    return _STATE_SERVER
+
+
+def _dispatch_load(worker: object = None) -> float:
+    """``load_fnc`` for the worker, computed on the shared state daemon's loop."""
+
+    if _STATE_SERVER is None:
+        return 1.0
+    try:
+        return _STATE_SERVER.call_threadsafe("worker_load", "load", timeout=1.0)
+    except Exception as exc:
+        logger.warning("Worker load unavailable, reporting full load: %s", exc)
+        return 1.0
+
+
 def _create_worker_options() -> WorkerOptions:
-    agent = LiveKitVoiceAgent()
-    worker_options = WorkerOptions(entrypoint_fnc=agent.entrypoint)
+    with STARTUP.measure("init", "shared state daemon"):
+        server = _start_shared_state()
+    load_options = {}
+    if server is not None:
+        # Dispatch load comes from in-flight turns, translation queue depth and
+        # event-loop lag reported by the job processes, not just CPU usage.
+        load_options["load_fnc"] = _dispatch_load
+    else:
+        # Job processes report their pressure through the daemon only.
+        logger.info("Shared state is off; dispatch load falls back to CPU usage")
+    # Each job process builds its own agent in prewarm and keeps it in
+    # proc.userdata; only these module-level functions are pickled.
+    worker_options = WorkerOptions(
+        entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm,
+        load_threshold=float(os.getenv("AGENT_LOAD_THRESHOLD", "0.75")),
+        **load_options,
+    )
     return worker_options
 
 
@@ -117,8 +200,11 @@ def main() -> None:
             raise SystemExit(1)
 
     if api_key and api_secret:
-        _verify_livekit_connectivity(ws_url, api_key, api_secret)
+        _start_connectivity_probe(ws_url, api_key, api_secret)
+
+    PROFILER.install_signal_handler(duration=float(os.getenv("AGENT_PROFILE_SECONDS", "30")))
 
+    STARTUP.report("Worker startup")
     logger.info("Voice AI Agent is starting...")
     _ensure_default_command()
     cli.run_app(worker_options)
@@ -0,0 +1,65 @@
+"""Batched frames are split across data packets at the size limit."""
+
+import asyncio
+import os
+
+import pytest
+
+from voice_ai_agent.utils.data_protocol import (
+    DataChannel,
+    MessageType,
+    ProtocolError,
+    decode_packet,
+    encode_frame,
+    encode_packets,
+)
+
+
+def _frames(count, size):
+    # Random text keeps zlib from shrinking the batch under the limit.
+    return [
+        encode_frame(MessageType.CHAT, seq, {"text": os.urandom(size // 2).hex()}) for seq in range(1, count + 1)
+    ]
+
+
+def test_batch_over_the_limit_is_split_in_order():
+    frames = _frames(20, 1000)
+
+    packets = encode_packets(frames, max_packet_bytes=4096)
+
+    assert len(packets) > 1
+    assert all(len(packet) <= 4096 for packet in packets)
+    messages = [message for packet in packets for message in decode_packet(packet)]
+    assert [message.seq for message in messages] == list(range(1, 21))
+
+
+def test_batch_under_the_limit_is_one_packet():
+    assert len(encode_packets(_frames(3, 100), max_packet_bytes=4096)) == 1
+
+
+def test_frame_over_the_limit_is_rejected():
+    with pytest.raises(ProtocolError):
+        encode_packets(_frames(1, 20_000), max_packet_bytes=4096)
+
+
+def test_channel_publishes_every_packet_of_a_large_batch():
+    published = []
+
+    async def publish(packet):
+        published.append(packet)
+
+    async def run():
+        channel = DataChannel(publish, max_batch_bytes=100_000, max_packet_bytes=4096)
+        for _ in range(20):
+            await channel.send(MessageType.CHAT, {"text": os.urandom(500).hex()})
+        with pytest.raises(ProtocolError):
+            await channel.send(MessageType.CHAT, {"text": os.urandom(5000).hex()})
+        await channel.aclose()
+        return channel
+
+    channel = asyncio.run(run())
+
+    assert channel.packets_sent == len(published) > 1
+    assert channel.messages_sent == 20
+    assert all(len(packet) <= 4096 for packet in published)
+    assert [message.seq for packet in published for message in decode_packet(packet)] == list(range(1, 21))
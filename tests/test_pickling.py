@@ -0,0 +1,27 @@
+"""LiveKit's process executor pickles the entrypoint and prewarm functions."""
+
+import pickle
+
+import pytest
+
+pytest.importorskip("livekit.agents")
+
+from voice_ai_agent.integrated_agent import LiveKitVoiceAgent
+
+
+def test_agent_entrypoints_pickle():
+    agent = LiveKitVoiceAgent()
+    agent.integrated_agent.warm_up()
+
+    entrypoint = pickle.loads(pickle.dumps(agent.entrypoint))
+    prewarm = pickle.loads(pickle.dumps(agent.prewarm))
+
+    assert entrypoint.__self__.integrated_agent is not agent.integrated_agent
+    assert prewarm.__self__.admin_identities == agent.admin_identities
+
+
+def test_worker_functions_pickle_by_reference():
+    from voice_ai_agent import integrated_agent
+
+    assert pickle.loads(pickle.dumps(integrated_agent.entrypoint)) is integrated_agent.entrypoint
+    assert pickle.loads(pickle.dumps(integrated_agent.prewarm)) is integrated_agent.prewarm
@@ -1,5 +1,14 @@
 """Voice AI agent package providing cockpit orchestration components."""
 
-from .integrated_agent import IntegratedVoiceAgent, LiveKitVoiceAgent
+from typing import Any
 
 __all__ = ["IntegratedVoiceAgent", "LiveKitVoiceAgent"]
+
+
+def __getattr__(name: str) -> Any:
+    # Imported on first use so that light submodules load without the agent.
+    if name in __all__:
+        from . import integrated_agent
+
+        return getattr(integrated_agent, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
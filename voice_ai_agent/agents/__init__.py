@@ -2,5 +2,13 @@
 
 from .voice_agent import VoiceAIAgent
 from .avatar_manager import AvatarManager
+from .llm_backends import LLMBackend, LLMRouter, OpenAIBackend, RuleBasedBackend
 
-__all__ = ["VoiceAIAgent", "AvatarManager"]
+__all__ = [
+    "VoiceAIAgent",
+    "AvatarManager",
+    "LLMBackend",
+    "LLMRouter",
+    "OpenAIBackend",
+    "RuleBasedBackend",
+]
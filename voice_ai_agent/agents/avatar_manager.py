@@ -2,9 +2,15 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
-from dataclasses import dataclass, asdict
-from typing import Dict, Any
+from collections import OrderedDict
+from dataclasses import dataclass, asdict, fields, replace
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from ..utils.metrics import approx_size
 
 
 @dataclass
@@ -18,14 +24,47 @@ class AvatarProfile:
 
     def as_dict(self) -> Dict[str, Any]:
         data = asdict(self)
-        data.setdefault("accessories", {})
+        if data["accessories"] is None:
+            data["accessories"] = {}
         return data
 
 
+_FIELDS = frozenset(field.name for field in fields(AvatarProfile))
+
+
+@dataclass(frozen=True)
+class AvatarPayload:
+    """A profile serialised once for the data channel, with its ETag.
+
+    ``config`` is the profile as a dict, shared by every reader; it must
+    not be modified.
+    """
+
+    profile: AvatarProfile
+    config: Dict[str, Any]
+    etag: str
+    body: bytes
+
+
+def _serialize(user_id: Optional[str], profile: AvatarProfile) -> AvatarPayload:
+    config = profile.as_dict()
+    encoded = json.dumps(config, separators=(",", ":"), sort_keys=True)
+    etag = hashlib.blake2b(encoded.encode("utf-8"), digest_size=8).hexdigest()
+    body = json.dumps(
+        {"user_id": user_id, "etag": etag, "config": config}, separators=(",", ":"), sort_keys=True
+    ).encode("utf-8")
+    return AvatarPayload(profile, config, etag, body)
+
+
 class AvatarManager:
-    """Stores avatar presets for the cockpit UI."""
+    """Stores avatar profiles per user for the cockpit UI.
 
-    def __init__(self) -> None:
+    Each profile is kept with its AVATAR message body already serialised
+    and an ETag of its config, both recomputed only when the profile
+    changes. Users without a profile share the default one.
+    """
+
+    def __init__(self, default_cache_size: int = 1024) -> None:
         self.logger = logging.getLogger(self.__class__.__name__)
         self._default_profile = AvatarProfile(
             ready_player_me_url=(
@@ -35,7 +74,91 @@ class AvatarManager:
             background="#1e1e2f",
             accessories={"glasses": "cyber", "outfit": "casual"},
         )
+        # Default payloads of recently seen users, in LRU order
+        self._default_payloads: "OrderedDict[Optional[str], AvatarPayload]" = OrderedDict()
+        self._default_cache_size = default_cache_size
+        self._payloads: Dict[str, AvatarPayload] = {}
+        self._lock = asyncio.Lock()
+
+    def _payload(self, user_id: Optional[str]) -> AvatarPayload:
+        payload = self._payloads.get(user_id) if user_id is not None else None
+        if payload is None:
+            # The body names its user, so the default is serialised per user too.
+            payload = self._default_payloads.get(user_id)
+            if payload is None:
+                payload = self._default_payloads[user_id] = _serialize(user_id, self._default_profile)
+                if len(self._default_payloads) > self._default_cache_size:
+                    self._default_payloads.popitem(last=False)
+            else:
+                self._default_payloads.move_to_end(user_id)
+        return payload
+
+    async def get_avatar_config(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        return self._payload(user_id).config
+
+    async def get_avatar_payload(
+        self, user_id: Optional[str], etag: Optional[str] = None
+    ) -> Tuple[str, Optional[bytes]]:
+        """Current ETag and AVATAR body, or no body when ``etag`` is still current."""
+
+        payload = self._payload(user_id)
+        return payload.etag, None if etag == payload.etag else payload.body
+
+    async def update_avatar(self, user_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Apply ``changes`` to a user's profile and return the delta.
+
+        The delta holds the previous and new ETag and the changed fields
+        only; None when nothing changed. Unknown fields raise ValueError.
+        """
+
+        unknown = set(changes) - _FIELDS
+        if unknown:
+            raise ValueError(f"Unknown avatar fields: {', '.join(sorted(unknown))}")
+        for name, value in changes.items():
+            if name == "accessories":
+                if value is not None and not isinstance(value, dict):
+                    raise ValueError("accessories must be an object")
+            elif not isinstance(value, str) or not value:
+                raise ValueError(f"{name} must be a non-empty string")
+
+        async with self._lock:
+            current = self._payload(user_id)
+            payload = _serialize(user_id, replace(current.profile, **changes))
+            delta = {
+                name: value for name, value in payload.config.items() if current.config[name] != value
+            }
+            if not delta:
+                return None
+            self._payloads[user_id] = payload
+            self._default_payloads.pop(user_id, None)
+        self.logger.debug("Updated avatar of %s: %s", user_id, ", ".join(delta))
+        return {"user_id": user_id, "etag": payload.etag, "base": current.etag, "changes": delta}
+
+    async def reset_avatar(self, user_id: str) -> None:
+        async with self._lock:
+            self._payloads.pop(user_id, None)
+
+    def user_ids(self) -> List[str]:
+        return list(self._payloads)
+
+    async def export_users(self, user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        return {
+            user_id: self._payloads[user_id].config for user_id in user_ids if user_id in self._payloads
+        }
+
+    async def import_users(self, profiles: Dict[str, Dict[str, Any]]) -> None:
+        """Restore many profiles at once; profiles changed since are kept."""
+
+        async with self._lock:
+            for user_id, profile in profiles.items():
+                if user_id not in self._payloads:
+                    self._payloads[user_id] = _serialize(user_id, AvatarProfile(**profile))
+                    self._default_payloads.pop(user_id, None)
 
-    async def get_avatar_config(self) -> Dict[str, Any]:
-        self.logger.debug("Providing default avatar configuration")
-        return self._default_profile.as_dict()
+    def stats(self) -> Dict[str, int]:
+        return {
+            "users": len(self._payloads),
+            "entries": len(self._payloads),
+            "approx_bytes": approx_size(self._payloads)
+            + sum(len(payload.body) for payload in self._payloads.values()),
+        }
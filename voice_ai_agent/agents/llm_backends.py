@@ -0,0 +1,226 @@
+"""Pluggable LLM backends with deadlines, hedging and failover."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Protocol, Sequence, Tuple
+
+from ..utils.metrics import REGISTRY
+from ..utils.structured_logging import ThrottledLogger
+
+Messages = List[Dict[str, str]]
+
+_BACKEND_REQUESTS = REGISTRY.counter(
+    "voice_agent_llm_backend_requests_total",
+    "LLM backend calls by backend and outcome (success, error, timeout, cancelled).",
+    ("backend", "outcome"),
+)
+_HEDGES = REGISTRY.counter(
+    "voice_agent_llm_hedges_total", "Hedged LLM requests by backend and winner.", ("backend", "winner")
+)
+
+
+class LLMBackend(Protocol):
+    """Anything that turns chat messages into a reply."""
+
+    name: str
+
+    async def complete(self, messages: Messages, *, max_tokens: int) -> str:
+        ...
+
+
+class OpenAIBackend:
+    """Chat completions on an ``AsyncOpenAI``-compatible client."""
+
+    def __init__(self, client: Any, model: str = "gpt-4o-mini", name: Optional[str] = None) -> None:
+        self.client = client
+        self.model = model
+        self.name = name or model
+
+    async def complete(self, messages: Messages, *, max_tokens: int) -> str:
+        result = await self.client.chat.completions.create(
+            model=self.model, messages=messages, max_tokens=max_tokens
+        )
+        message = result.choices[0].message.content if result.choices else None
+        return (message or "").strip()
+
+
+class RuleBasedBackend:
+    """Local canned responder used when no remote backend answers in time."""
+
+    name = "rule_based"
+
+    def __init__(self, responses: Optional[Sequence[str]] = None) -> None:
+        self.responses = list(responses or (
+            "I am ready to help you with your tasks.",
+            "Let's work together to get things done.",
+            "How can I support you today?",
+        ))
+
+    async def complete(self, messages: Messages, *, max_tokens: int) -> str:
+        query = messages[-1]["content"] if messages else ""
+        return self.responses[abs(hash(query)) % len(self.responses)]
+
+
+class _LatencyWindow:
+    """Recent successful latencies of one backend, for the hedge delay."""
+
+    def __init__(self, size: int) -> None:
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._quantile: Optional[float] = None
+
+    def add(self, latency: float) -> None:
+        self._samples.append(latency)
+        self._quantile = None
+
+    def quantile(self, fraction: float, min_samples: int) -> Optional[float]:
+        if len(self._samples) < min_samples:
+            return None
+        if self._quantile is None:
+            ordered = sorted(self._samples)
+            self._quantile = ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+        return self._quantile
+
+
+class LLMRouter:
+    """Calls backends in order within a deadline, hedging slow requests.
+
+    Each backend gets at most ``attempt_timeout`` seconds of the remaining
+    deadline; failures and timeouts move on to the next backend and finally
+    to ``fallback``, which is expected to answer instantly. A request still
+    pending after the backend's recent ``hedge_quantile`` latency is
+    duplicated once and the first reply wins, which trims the tail caused
+    by individual slow requests.
+    """
+
+    def __init__(
+        self,
+        backends: Sequence[LLMBackend],
+        fallback: Optional[LLMBackend] = None,
+        deadline: float = 6.0,
+        attempt_timeout: float = 4.0,
+        hedge_quantile: float = 0.95,
+        hedge_min_delay: float = 0.25,
+        hedge_min_samples: int = 20,
+        window: int = 200,
+    ) -> None:
+        # Backend outages fail every request; counters carry the totals.
+        self.logger = ThrottledLogger(logging.getLogger(self.__class__.__name__), per_second=1, burst=5)
+        self.backends = list(backends)
+        self.fallback = fallback or RuleBasedBackend()
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self._window = window
+        self._latencies: Dict[str, _LatencyWindow] = {}
+
+    @classmethod
+    def from_env(cls, backends: Sequence[LLMBackend], fallback: Optional[LLMBackend] = None) -> "LLMRouter":
+        return cls(
+            backends,
+            fallback,
+            deadline=float(os.getenv("AGENT_LLM_DEADLINE", "6")),
+            attempt_timeout=float(os.getenv("AGENT_LLM_ATTEMPT_TIMEOUT", "4")),
+        )
+
+    def hedge_delay(self, backend: LLMBackend) -> Optional[float]:
+        """Seconds to wait before hedging, or None until enough samples exist."""
+
+        window = self._latencies.get(backend.name)
+        quantile = window.quantile(self.hedge_quantile, self.hedge_min_samples) if window else None
+        return None if quantile is None else max(self.hedge_min_delay, quantile)
+
+    async def complete(
+        self,
+        messages: Messages,
+        *,
+        max_tokens: int,
+        deadline: Optional[float] = None,
+        hedge: bool = True,
+        use_fallback: bool = True,
+    ) -> Tuple[str, str]:
+        """Return ``(reply, backend name)`` within ``deadline`` seconds.
+
+        Raises ``TimeoutError`` when every backend failed and
+        ``use_fallback`` is False.
+        """
+
+        expires = time.monotonic() + (self.deadline if deadline is None else deadline)
+        for backend in self.backends:
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                reply = await asyncio.wait_for(
+                    self._call(backend, messages, max_tokens, hedge),
+                    timeout=min(remaining, self.attempt_timeout),
+                )
+            except asyncio.TimeoutError:
+                _BACKEND_REQUESTS.inc(backend.name, "timeout")
+                self.logger.warning("LLM backend %s timed out", backend.name)
+                continue
+            except asyncio.CancelledError:
+                _BACKEND_REQUESTS.inc(backend.name, "cancelled")
+                raise
+            except Exception as exc:
+                self.logger.warning("LLM backend %s failed: %s", backend.name, exc)
+                continue
+            if reply:
+                return reply, backend.name
+        if not use_fallback:
+            raise TimeoutError("No LLM backend answered before the deadline")
+        return await self.fallback.complete(messages, max_tokens=max_tokens), self.fallback.name
+
+    async def _call(self, backend: LLMBackend, messages: Messages, max_tokens: int, hedge: bool) -> str:
+        delay = self.hedge_delay(backend) if hedge else None
+        primary = asyncio.ensure_future(self._timed(backend, messages, max_tokens))
+        attempts = [primary]
+        abandoned = False
+        try:
+            if delay is None:
+                return await primary
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if done:
+                return primary.result()
+
+            secondary = asyncio.ensure_future(self._timed(backend, messages, max_tokens))
+            attempts.append(secondary)
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        _HEDGES.inc(backend.name, "hedge" if attempt is secondary else "original")
+                        return attempt.result()
+            # Both attempts failed: surface the original error.
+            return primary.result()
+        except asyncio.CancelledError:
+            # Timed out or cancelled by the caller, which counts the request once.
+            abandoned = True
+            raise
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+                    if not abandoned:
+                        _BACKEND_REQUESTS.inc(backend.name, "cancelled")
+
+    async def _timed(self, backend: LLMBackend, messages: Messages, max_tokens: int) -> str:
+        started = time.perf_counter()
+        try:
+            reply = await backend.complete(messages, max_tokens=max_tokens)
+        except Exception:
+            _BACKEND_REQUESTS.inc(backend.name, "error")
+            raise
+        _BACKEND_REQUESTS.inc(backend.name, "success")
+        window = self._latencies.get(backend.name)
+        if window is None:
+            window = self._latencies[backend.name] = _LatencyWindow(self._window)
+        window.add(time.perf_counter() - started)
+        return reply
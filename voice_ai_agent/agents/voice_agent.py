@@ -4,12 +4,25 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Optional
+import time
+from typing import Dict, List, Optional, Tuple
 
-try:  # Optional dependency if an API key is provided
-    from openai import AsyncOpenAI
-except Exception:  # pragma: no cover - import guard for environments without openai
-    AsyncOpenAI = None  # type: ignore
+from ..utils.metrics import REGISTRY
+from ..utils.startup import STARTUP
+from .llm_backends import LLMBackend, LLMRouter, OpenAIBackend, RuleBasedBackend
+
+
+_LLM_REQUESTS = REGISTRY.counter(
+    "voice_agent_llm_requests_total",
+    "LLM requests by outcome (success from a remote backend, fallback to rules).",
+    ("outcome",),
+)
+_LLM_LATENCY = REGISTRY.histogram("voice_agent_llm_request_seconds", "LLM request latency.")
+
+SYSTEM_PROMPT = (
+    "You are an empathetic voice assistant that controls a smart home "
+    "cockpit. Provide concise and actionable replies."
+)
 
 
 class VoiceAIAgent:
@@ -17,55 +30,134 @@ class VoiceAIAgent:
 
     def __init__(self) -> None:
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.system_prompt = SYSTEM_PROMPT
+        self.router = LLMRouter.from_env(self._backends_from_env(), RuleBasedBackend())
+
+    def _backends_from_env(self) -> List[LLMBackend]:
+        """Primary OpenAI backend plus an optional secondary one.
+
+        ``AGENT_LLM_SECONDARY_MODEL`` adds a second model on the same
+        account; with ``AGENT_LLM_SECONDARY_BASE_URL`` it targets any
+        OpenAI-compatible server (e.g. a local one) instead.
+        """
+        backends: List[LLMBackend] = []
         api_key = os.getenv("OPENAI_API_KEY")
-        self._client: Optional[AsyncOpenAI] = None
-        if AsyncOpenAI and api_key:
-            try:
-                self._client = AsyncOpenAI(api_key=api_key)
+        if not (api_key or os.getenv("AGENT_LLM_SECONDARY_BASE_URL")):
+            return backends
+        try:  # Optional dependency, only imported when a backend is configured
+            with STARTUP.measure("import", "openai"):
+                from openai import AsyncOpenAI
+        except Exception:  # pragma: no cover - import guard for environments without openai
+            return backends
+        try:
+            if api_key:
+                client = AsyncOpenAI(api_key=api_key)
+                backends.append(OpenAIBackend(client, os.getenv("AGENT_LLM_MODEL", "gpt-4o-mini")))
                 self.logger.debug("AsyncOpenAI client initialised")
-            except Exception as exc:  # pragma: no cover - network failures
-                self.logger.warning("Failed to initialise OpenAI client: %s", exc)
-                self._client = None
-
-        self._fallback_responses = [
-            "I am ready to help you with your tasks.",
-            "Let's work together to get things done.",
-            "How can I support you today?",
-        ]
+            secondary_model = os.getenv("AGENT_LLM_SECONDARY_MODEL")
+            base_url = os.getenv("AGENT_LLM_SECONDARY_BASE_URL")
+            if secondary_model and (base_url or api_key):
+                secondary_client = (
+                    AsyncOpenAI(base_url=base_url, api_key=os.getenv("AGENT_LLM_SECONDARY_API_KEY", "local"))
+                    if base_url
+                    else client
+                )
+                backends.append(OpenAIBackend(secondary_client, secondary_model, name=f"secondary:{secondary_model}"))
+        except Exception as exc:  # pragma: no cover - client construction failures
+            self.logger.warning("Failed to initialise OpenAI client: %s", exc)
+        return backends
+
+    def use_backends(self, backends: List[LLMBackend], fallback: Optional[LLMBackend] = None) -> None:
+        """Replace the LLM backends, keeping the router's deadline and hedging settings."""
+        router = self.router
+        self.router = LLMRouter(
+            backends,
+            fallback or router.fallback,
+            deadline=router.deadline,
+            attempt_timeout=router.attempt_timeout,
+            hedge_quantile=router.hedge_quantile,
+            hedge_min_delay=router.hedge_min_delay,
+            hedge_min_samples=router.hedge_min_samples,
+        )
 
-    async def process_user_query(self, text: str, user_id: str) -> str:
-        """Return a response for the provided user query."""
+    async def process_user_query(
+        self,
+        text: str,
+        user_id: str,
+        context: Optional[List[Dict[str, str]]] = None,
+        deadline: Optional[float] = None,
+    ) -> str:
+        """Return a response for the provided user query.
+
+        ``context`` holds earlier conversation messages (see
+        :class:`~voice_ai_agent.memory.context_builder.ConversationContext`)
+        placed between the system prompt and the query. ``deadline`` caps the
+        seconds spent waiting on remote backends before the rule-based
+        responder answers.
+        """
+
+        response, _ = await self.reply(text, user_id, context, deadline)
+        return response
+
+    async def reply(
+        self,
+        text: str,
+        user_id: str,
+        context: Optional[List[Dict[str, str]]] = None,
+        deadline: Optional[float] = None,
+    ) -> Tuple[str, bool]:
+        """Like :meth:`process_user_query`, also telling whether the reply is degraded.
+
+        It is when the fallback answered in place of a configured backend
+        that failed or ran out of time; without backends it always answers.
+        """
 
         cleaned = text.strip()
         if not cleaned:
-            return "I didn't quite catch that. Could you repeat it?"
+            return "I didn't quite catch that. Could you repeat it?", False
 
-        if self._client is None:
-            # Provide a deterministic but friendly fallback response.
-            idx = abs(hash((user_id, cleaned))) % len(self._fallback_responses)
-            response = self._fallback_responses[idx]
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            *(context or ()),
+            {"role": "user", "content": cleaned},
+        ]
+        started = time.perf_counter()
+        response, backend = await self.router.complete(messages, max_tokens=200, deadline=deadline)
+        fallback = backend == self.router.fallback.name
+        if fallback:
             self.logger.debug("Fallback response selected: %s", response)
-            return response
+            _LLM_REQUESTS.inc("fallback")
+        else:
+            _LLM_REQUESTS.inc("success")
+            _LLM_LATENCY.observe(time.perf_counter() - started)
+        degraded = fallback and bool(self.router.backends)
+        return response or "I am here if you need anything else.", degraded
 
-        prompt = (
-            "You are an empathetic voice assistant that controls a smart home "
-            "cockpit. Provide concise and actionable replies."
-        )
+    async def summarize(self, previous: str, entries: List[Dict[str, str]], max_tokens: int) -> Optional[str]:
+        """Fold ``entries`` into ``previous``; None when no LLM backend answers."""
+
+        if not self.router.backends:
+            return None
+        transcript = "\n".join(f"{entry['role']}: {entry['text']}" for entry in entries)
+        messages = [
+            {
+                "role": "system",
+                "content": (
+                    "Update the running summary of a conversation between a user and "
+                    "a voice assistant. Keep facts, preferences and open requests. "
+                    f"Reply with the summary only, in at most {max_tokens * 3 // 4} words."
+                ),
+            },
+            {
+                "role": "user",
+                "content": f"Summary so far:\n{previous or '(none)'}\n\nNew turns:\n{transcript}",
+            },
+        ]
         try:
-            result = await self._client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": prompt},
-                    {"role": "user", "content": cleaned},
-                ],
-                max_tokens=200,
+            summary, _ = await self.router.complete(
+                messages, max_tokens=max_tokens, hedge=False, use_fallback=False
             )
-        except Exception as exc:  # pragma: no cover - network/API failure
-            self.logger.warning("OpenAI request failed: %s", exc)
-            idx = abs(hash(("error", cleaned))) % len(self._fallback_responses)
-            return self._fallback_responses[idx]
-
-        message = result.choices[0].message.content if result.choices else None
-        if not message:
-            return "I am here if you need anything else."
-        return message.strip()
+        except TimeoutError as exc:
+            self.logger.warning("Summary request failed: %s", exc)
+            return None
+        return summary or None
@@ -1,5 +1,6 @@
 """Database helpers for the cockpit."""
 
 from .mongodb_handler import MongoDBHandler
+from .shared_state import StateClient, StateServer
 
-__all__ = ["MongoDBHandler"]
+__all__ = ["MongoDBHandler", "StateClient", "StateServer"]
@@ -6,10 +6,7 @@ import logging
 import os
 from typing import Any, Dict, Optional
 
-try:
-    from motor.motor_asyncio import AsyncIOMotorClient
-except Exception:  # pragma: no cover - dependency missing at runtime
-    AsyncIOMotorClient = None  # type: ignore
+from ..utils.startup import STARTUP
 
 
 class MongoDBHandler:
@@ -18,15 +15,20 @@ class MongoDBHandler:
     def __init__(self) -> None:
         self.logger = logging.getLogger(self.__class__.__name__)
         self._uri = os.getenv("MONGODB_URI")
-        self._client: Optional[AsyncIOMotorClient] = None
+        self._client: Optional[Any] = None
         self._db = None
         self._connected = False
 
     async def connect(self) -> None:
-        if self._connected or not self._uri or AsyncIOMotorClient is None:
+        if self._connected or not self._uri:
             if not self._uri:
                 self.logger.info("No MONGODB_URI provided; using in-memory storage")
             return
+        try:  # Imported on first connect; motor is only needed with a database
+            with STARTUP.measure("import", "motor"):
+                from motor.motor_asyncio import AsyncIOMotorClient
+        except Exception:  # pragma: no cover - dependency missing at runtime
+            return
         try:
             self._client = AsyncIOMotorClient(self._uri)
             self._db = self._client.get_default_database()
@@ -0,0 +1,416 @@
+"""Node-local state daemon shared by all LiveKit job processes.
+
+LiveKit runs every job in its own process, so in-memory stores would
+otherwise diverge per process. The parent worker process hosts the real
+stores behind a Unix domain socket; job processes replace their stores with
+thin proxies that forward each method call. Every proxied method is a
+coroutine, so a call never blocks the job's event loop, and hosted
+components are only ever touched from the daemon's own loop; other threads
+of the parent go through :meth:`StateServer.call_threadsafe`.
+
+Wire format: every frame is a big-endian ``uint32`` length followed by a
+pickled tuple. After connecting, the server sends the method schema
+``{component: {method: is_coroutine}}``; requests are
+``(request_id, component, method, args, kwargs)`` and responses
+``(request_id, ok, value)``. The socket lives in a private ``0700``
+directory because the payload is pickle.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import inspect
+import itertools
+import logging
+import os
+import pickle
+import socket
+import struct
+import tempfile
+import threading
+from functools import partial
+from typing import Any, Coroutine, Dict, Iterable, Iterator, Optional, Tuple
+
+_HEADER = struct.Struct(">I")
+_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+# IntegratedVoiceAgent attributes whose state is hosted by the daemon.
+SHARED_COMPONENTS = (
+    "episodic_memory",
+    "semantic_memory",
+    "task_manager",
+    "scheduler",
+    "recommendation_engine",
+    "feedback_processor",
+    "memory_manager",
+    "worker_load",
+    "avatar_manager",
+    "user_transfer",
+)
+
+Schema = Dict[str, Dict[str, bool]]
+
+
+def _pack(message: Any) -> bytes:
+    body = pickle.dumps(message, protocol=_PROTOCOL)
+    return _HEADER.pack(len(body)) + body
+
+
+def _schema_for(component: Any) -> Dict[str, bool]:
+    methods = {}
+    for name in dir(component):
+        if name.startswith("_"):
+            continue
+        attr = getattr(component, name)
+        if callable(attr):
+            methods[name] = inspect.iscoroutinefunction(attr)
+    return methods
+
+
+class SharedMapping:
+    """Dictionary wrapper exposing mapping access as public methods."""
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None) -> None:
+        self._data = data if data is not None else {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._data.get(key, default)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        return {key: self._data[key] for key in keys if key in self._data}
+
+    def set(self, key: str, value: Any) -> None:
+        self._data[key] = value
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        return self._data.pop(key, default)
+
+    def contains(self, key: str) -> bool:
+        return key in self._data
+
+    def size(self) -> int:
+        return len(self._data)
+
+    def merge_missing(self, data: Dict[str, Any]) -> int:
+        """Add the keys of ``data`` not set yet; returns how many were added."""
+        added = 0
+        for key, value in data.items():
+            if key not in self._data:
+                self._data[key] = value
+                added += 1
+        return added
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self._data)
+
+
+class StateServer:
+    """Hosts components on a Unix socket from a background event loop."""
+
+    def __init__(self, components: Dict[str, Any], path: Optional[str] = None) -> None:
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._components = components
+        self._schema: Schema = {name: _schema_for(component) for name, component in components.items()}
+        self.path = path or os.path.join(tempfile.mkdtemp(prefix="voice-agent-state-"), "state.sock")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._handlers: set[asyncio.Task] = set()
+
+    def start_in_thread(self) -> str:
+        """Serve from a daemon thread and return the socket path once listening."""
+
+        ready = threading.Event()
+        errors: list[BaseException] = []
+
+        def _run() -> None:
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self._start())
+            except BaseException as exc:  # pragma: no cover - surfaced to caller
+                errors.append(exc)
+                ready.set()
+                return
+            ready.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=_run, name="shared-state", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        return self.path
+
+    async def _start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+        os.chmod(self.path, 0o600)
+        self.logger.info("Shared state daemon listening on %s", self.path)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            self._handlers.add(task)
+            task.add_done_callback(self._handlers.discard)
+        writer.write(_pack(self._schema))
+        try:
+            while True:
+                header = await reader.readexactly(_HEADER.size)
+                (length,) = _HEADER.unpack(header)
+                request_id, component, method, args, kwargs = pickle.loads(await reader.readexactly(length))
+                response = await self._dispatch(request_id, component, method, args, kwargs)
+                try:
+                    frame = _pack(response)
+                except Exception as exc:
+                    frame = _pack((request_id, False, RuntimeError(f"Unpicklable result: {exc}")))
+                writer.write(frame)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(
+        self, request_id: int, component: str, method: str, args: tuple, kwargs: dict
+    ) -> Tuple[int, bool, Any]:
+        if method not in self._schema.get(component, {}):
+            return request_id, False, AttributeError(f"{component}.{method} is not shared")
+        try:
+            result = getattr(self._components[component], method)(*args, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+        except Exception as exc:
+            return request_id, False, exc
+        return request_id, True, result
+
+    async def _invoke(self, component: str, method: str, args: tuple, kwargs: dict) -> Any:
+        _, ok, value = await self._dispatch(0, component, method, args, kwargs)
+        if not ok:
+            raise value
+        return value
+
+    def call_threadsafe(
+        self, component: str, method: str, *args: Any, timeout: Optional[float] = 5.0, **kwargs: Any
+    ) -> Any:
+        """Call a hosted component from another thread of the parent process.
+
+        The call runs on the daemon loop like a job's request would, so the
+        component is never touched from two threads at once.
+        """
+
+        return self.submit(self._invoke(component, method, args, kwargs)).result(timeout)
+
+    def submit(self, coroutine: Coroutine[Any, Any, Any]) -> "concurrent.futures.Future[Any]":
+        """Run ``coroutine`` on the daemon loop from another thread."""
+
+        if self._loop is None or not self._loop.is_running():
+            coroutine.close()
+            raise RuntimeError("Shared state daemon is not running")
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def stop(self) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+
+        async def _close() -> None:
+            if self._server is not None:
+                self._server.close()
+            handlers = list(self._handlers)
+            for handler in handlers:
+                handler.cancel()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            loop.stop()
+
+        asyncio.run_coroutine_threadsafe(_close(), loop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class StateClient:
+    """Connects a job process to the state daemon.
+
+    All calls are coroutines sharing one multiplexed asyncio connection per
+    event loop. The schema is read once, over a short-lived blocking
+    connection, when the client is created.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._ids: Iterator[int] = itertools.count(1)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self.schema: Schema = self._fetch_schema()
+
+    def _fetch_schema(self) -> Schema:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.path)
+            reader = sock.makefile("rb")
+            (length,) = _HEADER.unpack(reader.read(_HEADER.size))
+            body = reader.read(length)
+            if len(body) != length:
+                raise ConnectionError("Shared state daemon closed the connection")
+            return pickle.loads(body)
+
+    async def _ensure_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._writer is not None and self._loop is loop and not self._writer.is_closing():
+            return
+        if self._connect_lock is None or self._loop is not loop:
+            self._connect_lock = asyncio.Lock()
+            self._loop = loop
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+            (length,) = _HEADER.unpack(await self._reader.readexactly(_HEADER.size))
+            await self._reader.readexactly(length)  # schema, already known
+            self._reader_task = loop.create_task(self._read_responses(self._reader))
+
+    async def _read_responses(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                (length,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+                request_id, ok, value = pickle.loads(await reader.readexactly(length))
+                future = self._pending.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+        except (asyncio.IncompleteReadError, ConnectionError) as exc:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(f"Shared state daemon unavailable: {exc}"))
+            self._pending.clear()
+            if self._writer is not None:
+                self._writer.close()
+
+    async def call(self, component: str, method: str, *args: Any, **kwargs: Any) -> Any:
+        await self._ensure_async()
+        assert self._writer is not None
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(_pack((request_id, component, method, args, kwargs)))
+        return await future
+
+    def proxy(self, component: str) -> "RemoteComponent":
+        if component not in self.schema:
+            raise KeyError(f"Component {component} is not hosted by the state daemon")
+        return RemoteComponent(self, component, self.schema[component])
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class RemoteComponent:
+    """Stand-in exposing a hosted component's public methods.
+
+    Every method returns an awaitable, including those that are plain
+    functions on the hosted component.
+    """
+
+    def __init__(self, client: StateClient, name: str, methods: Dict[str, bool]) -> None:
+        self._name = name
+        for method in methods:
+            setattr(self, method, partial(client.call, name, method))
+
+    def __repr__(self) -> str:
+        return f"<RemoteComponent {self._name}>"
+
+
+class RemoteMapping:
+    """Local copy of a :class:`SharedMapping` hosted by the daemon.
+
+    Reads are served from the copy so they cost nothing on the turn path.
+    Writes update the copy and are forwarded to the daemon in the background;
+    :meth:`refresh` pulls the current values of some keys, e.g. a user's
+    when their session starts.
+    """
+
+    def __init__(self, client: StateClient, name: str) -> None:
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._remote = client.proxy(name)
+        self._data: Dict[str, Any] = {}
+        # Keys with a write still on its way to the daemon
+        self._writing: Dict[str, int] = {}
+        self._writes: set[asyncio.Task] = set()
+
+    async def refresh(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        current = await self._remote.get_many(keys)
+        for key in keys:
+            if key in self._writing:
+                continue
+            if key in current:
+                self._data[key] = current[key]
+            else:
+                self._data.pop(key, None)
+
+    def _forward(self, keys: Iterable[str], method: str, *args: Any) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.logger.warning("No event loop; %s not forwarded to the daemon", method)
+            return
+        keys = list(keys)
+        for key in keys:
+            self._writing[key] = self._writing.get(key, 0) + 1
+        task = loop.create_task(getattr(self._remote, method)(*args))
+        self._writes.add(task)
+        task.add_done_callback(partial(self._written, keys))
+
+    def _written(self, keys: list, task: asyncio.Task) -> None:
+        self._writes.discard(task)
+        for key in keys:
+            pending = self._writing.pop(key, 1) - 1
+            if pending:
+                self._writing[key] = pending
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.warning("Shared mapping write failed: %s", task.exception())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._data.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._data[key] = value
+        self._forward([key], "set", key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        self._forward([key], "pop", key)
+        return self._data.pop(key, default)
+
+    def merge_missing(self, data: Dict[str, Any]) -> int:
+        added = {key: value for key, value in data.items() if key not in self._data}
+        self._data.update(added)
+        self._forward(data, "merge_missing", dict(data))
+        return len(added)
+
+    def items(self):
+        return self._data.items()
+
+    def values(self):
+        return self._data.values()
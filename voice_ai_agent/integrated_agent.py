@@ -1,18 +1,49 @@
 """Integrated Voice AI agent orchestrating all subsystems."""
 
+from __future__ import annotations
+
 import asyncio
+import inspect
 import logging
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Awaitable
-
-from livekit import rtc
-from livekit.agents import Agent, AgentSession, JobContext
-from livekit.agents.voice import events as voice_events
-from livekit.plugins import openai, silero
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Any, AsyncIterable, AsyncIterator, Iterator, Optional, List, Awaitable, Tuple, Union
 
 from .agents.voice_agent import VoiceAIAgent
 from .agents.avatar_manager import AvatarManager
 from .utils.screen_observer import ScreenObserver
+from .utils.screen_analysis import ScreenAnalysisStage
+from .utils.loop_monitor import EventLoopMonitor
+from .utils.memory_manager import MemoryManager
+from .utils.metrics import REGISTRY, start_metrics_server_from_env
+from .utils.profiler import PROFILER
+from .utils.speculation import Speculator
+from .utils.turn_tracker import TurnTracker
+from .utils.voice_latency import VoiceLatencyTracker, VoiceTurn
+from .utils.warm_state import WarmStateManager
+from .utils.startup import STARTUP, Component, ComponentRegistry
+from .utils.worker_load import WorkerLoad
+from .utils.structured_logging import (
+    ThrottledLogger,
+    bind_log_context,
+    configure_logging,
+    current_trace_id,
+    log_context,
+    new_trace_id,
+)
+from .utils.data_protocol import (
+    PROTOCOL_TOPIC,
+    DataChannel,
+    Message,
+    MessageType,
+    ProtocolError,
+    decode_packet,
+)
 from .utils.nlp_processor import NLUProcessor
 from .utils.voice_command_processor import VoiceCommandProcessor
 from .utils.translation_engine import MultilingualProcessor
@@ -20,36 +51,211 @@ from .utils.feedback_processor import FeedbackProcessor, FeedbackIntegration
 from .utils.recommendation_engine import RecommendationEngine
 from .memory.semantic_memory import SemanticMemory
 from .memory.episodic_memory import EpisodicMemory
+from .memory.context_builder import ConversationContext
 from .database.mongodb_handler import MongoDBHandler
+from .database.shared_state import (
+    SHARED_COMPONENTS,
+    RemoteMapping,
+    SharedMapping,
+    StateClient,
+    StateServer,
+)
 from .utils.task_manager import TaskManager
 from .utils.scheduler import Scheduler
+from .utils.user_transfer import UserTransfer, export_to_file, format_for, import_from_file
+
+if TYPE_CHECKING:  # livekit is imported by the job process when a job starts
+    from livekit import rtc
+    from livekit.agents import JobContext, JobProcess
+    from livekit.agents.voice import events as voice_events
+
+_STAGE_LATENCY = REGISTRY.histogram(
+    "voice_agent_stage_seconds", "Latency of each turn pipeline stage.", ("stage",)
+)
+_TURN_LATENCY = REGISTRY.histogram(
+    "voice_agent_turn_seconds", "End-to-end latency of process_user_input.", ("type",)
+)
+_TURNS_IN_FLIGHT = REGISTRY.gauge("voice_agent_turns_in_flight", "Turns currently being processed.")
+_TURN_ERRORS = REGISTRY.counter("voice_agent_turn_errors_total", "Turns that raised an exception.")
+_DEGRADED_STAGES = REGISTRY.counter(
+    "voice_agent_degraded_stages_total",
+    "Optional stages skipped or served from cache to meet the turn deadline.",
+    ("stage",),
+)
+_CANCELLED_STAGES = REGISTRY.counter(
+    "voice_agent_cancelled_stages_total",
+    "Stage a turn was in when it was cancelled; later stages (and the LLM call) were skipped.",
+    ("stage",),
+)
+
+# Components that hold per-user state, reported by the metrics collector.
+_STORES = (
+    "episodic_memory",
+    "semantic_memory",
+    "task_manager",
+    "scheduler",
+    "recommendation_engine",
+    "feedback_processor",
+    "translation_processor",
+    "screen_observer",
+    "avatar_manager",
+)
+
+# Stores the memory manager may spill to disk for idle users.
+_USER_STORES = (
+    "episodic_memory",
+    "semantic_memory",
+    "task_manager",
+    "scheduler",
+    "recommendation_engine",
+    "feedback_processor",
+    "translation_processor",  # language preferences
+)
+
+# Stores covered by bulk export and import.
+_TRANSFER_STORES = _USER_STORES + ("avatar_manager",)
+
+_COMPONENTS = (
+    "voice_agent",
+    "avatar_manager",
+    "screen_observer",
+    "screen_analysis",
+    "nlp_processor",
+    "voice_command_processor",
+    "translation_processor",
+    "feedback_processor",
+    "feedback_integration",
+    "recommendation_engine",
+    "semantic_memory",
+    "episodic_memory",
+    "db_handler",
+    "task_manager",
+    "scheduler",
+    "memory_manager",
+    "worker_load",
+    "user_transfer",
+)
+
+
+async def _resolved(value: Any) -> Any:
+    """Result of a store method; shared-state proxies return awaitables for plain methods too"""
+    return await value if inspect.isawaitable(value) else value
+
+
+@dataclass
+class PreparedTurn:
+    """Side-effect-free results of a turn, applied by process_user_input"""
+    user_input: str
+    user_id: str
+    lang_processing: Dict[str, str]
+    nlp_result: Dict[str, Any]
+    command: Optional[Tuple[str, str]] = None
+    response_translation: Optional[Dict[str, str]] = None
+    degraded: List[str] = field(default_factory=list)
 
 
 class IntegratedVoiceAgent:
+    # System components, each built on first use by ``self.components``
+    voice_agent = Component()
+    avatar_manager = Component()
+    screen_observer = Component()
+    screen_analysis = Component()
+    nlp_processor = Component()
+    voice_command_processor = Component()
+    translation_processor = Component()
+    feedback_processor = Component()
+    feedback_integration = Component()
+    recommendation_engine = Component()
+    semantic_memory = Component()
+    episodic_memory = Component()
+    db_handler = Component()
+    task_manager = Component()
+    scheduler = Component()
+    context_builder = Component()
+    memory_manager = Component()
+    worker_load = Component()
+    user_transfer = Component()
+
     def __init__(self):
         self.logger = logging.getLogger(self.__class__.__name__)
+        # Per-turn debug lines are sampled and rate limited
+        self.turn_log = ThrottledLogger(
+            self.logger, sample=float(os.getenv("AGENT_LOG_TURN_SAMPLE", "0.05")), per_second=10
+        )
         
-        # Initialize all system components
-        self.voice_agent = VoiceAIAgent()
-        self.avatar_manager = AvatarManager()
-        self.screen_observer = ScreenObserver()
-        self.nlp_processor = NLUProcessor()
-        self.voice_command_processor = VoiceCommandProcessor()
-        self.translation_processor = MultilingualProcessor()
-        self.feedback_processor = FeedbackProcessor()
-        self.feedback_integration = FeedbackIntegration(self.feedback_processor)
-        self.recommendation_engine = RecommendationEngine()
+        # Register all system components; nothing is constructed until used
+        self.components = ComponentRegistry()
+        register = self.components.register
+        register("voice_agent", VoiceAIAgent)
+        register("avatar_manager", AvatarManager)
+        register("screen_observer", ScreenObserver)
+        register("screen_analysis", ScreenAnalysisStage)
+        register("nlp_processor", NLUProcessor)
+        register("voice_command_processor", VoiceCommandProcessor)
+        register("translation_processor", MultilingualProcessor)
+        register("feedback_processor", FeedbackProcessor)
+        register("feedback_integration", lambda: FeedbackIntegration(self.feedback_processor))
+        register("recommendation_engine", RecommendationEngine)
         
-        # Initialize memory and storage systems
-        self.semantic_memory = SemanticMemory()
-        self.episodic_memory = EpisodicMemory()
-        self.db_handler = MongoDBHandler()
-        self.task_manager = TaskManager()
-        self.scheduler = Scheduler()
+        # Memory and storage systems
+        register("semantic_memory", SemanticMemory)
+        register("episodic_memory", EpisodicMemory)
+        register("db_handler", MongoDBHandler)
+        register("task_manager", TaskManager)
+        register("scheduler", Scheduler)
+
+        # Recent turns plus a rolling summary, bounded by AGENT_CONTEXT_TOKENS
+        register("context_builder", lambda: ConversationContext.from_env(
+            self.episodic_memory, summarizer=self.voice_agent.summarize
+        ))
+
+        # Keeps per-user state under AGENT_MEMORY_BUDGET_MB by spilling idle users
+        register("memory_manager", lambda: MemoryManager.from_env(
+            {name: getattr(self, name) for name in _USER_STORES + ("context_builder",)}
+        ))
+
+        # Dispatch load of this worker; job processes report their pressure
+        # to the parent's instance through the shared state daemon
+        register("worker_load", WorkerLoad.from_env)
+
+        # Streaming export and import of all per-user state, a page at a time
+        register("user_transfer", lambda: UserTransfer(
+            {name: getattr(self, name) for name in _TRANSFER_STORES}, self.memory_manager
+        ))
+        self.load_report_interval = float(os.getenv("AGENT_LOAD_REPORT_INTERVAL", "1"))
+        self._load_reporter: Optional[asyncio.Task] = None
         
-        # Session-specific data
+        # Session-specific data; sessions idle for longer than the timeout are reaped
         self.current_session_data = {}
+        self.session_idle_timeout = float(os.getenv("AGENT_SESSION_IDLE_SECONDS", "900"))
+        self._session_reaper: Optional[asyncio.Task] = None
+
+        # Per-turn latency budget; optional stages are skipped or served from
+        # cache when the remaining budget would not also cover the LLM call.
+        self.turn_deadline = float(os.getenv("AGENT_TURN_DEADLINE", "4"))
+        self._stage_estimates: Dict[str, float] = {}
+
+        # Set once this process uses the node-wide shared state daemon, or
+        # hosts it (the parent worker process, which keeps the server itself)
+        self.state_client: Optional[StateClient] = None
+        self.hosts_shared_state = False
+
+        # Caches and preferences snapshotted to AGENT_SNAPSHOT_PATH and
+        # restored in the background at startup, so restarts do not start cold
+        self.warm_state = WarmStateManager.from_env()
+        self._warm_state_task: Optional[asyncio.Task] = None
+
+        # Continuous event-loop lag monitoring, started once a loop is running
+        self.loop_monitor = EventLoopMonitor()
+
+        # Recommendations are prepared in the background after each turn and
+        # attached to the user's next reply, keeping them off the reply path.
+        self.recommendation_timeout = 2.0
+        self._pending_recommendations: Dict[str, List[str]] = {}
+        self._recommendation_tasks: Dict[str, asyncio.Task] = {}
         
+        REGISTRY.register_collector(self._collect_metrics)
+
         # Initialize components
         self._initialize_system()
 
@@ -65,6 +271,7 @@ class IntegratedVoiceAgent:
 
         if loop and loop.is_running():
             loop.create_task(self.db_handler.connect())
+            self.loop_monitor.start()
         else:
             # A loop isn't running yet (e.g. during synchronous construction).
             # The handler will lazily connect when first used.
@@ -72,91 +279,306 @@ class IntegratedVoiceAgent:
 
         self.logger.info("Integrated voice AI agent initialized successfully")
 
-    async def process_user_input(self, user_input: str, user_id: str = "default_user") -> Dict[str, Any]:
-        """Process user input through all system components"""
-        
+    def shared_state_components(self) -> Dict[str, Any]:
+        """Components to host in the shared state daemon of this node"""
+        components = {name: getattr(self, name) for name in SHARED_COMPONENTS}
+        components["language_preferences"] = SharedMapping(
+            self.translation_processor.language_preferences
+        )
+        return components
+
+    def host_shared_state(self, socket_path: Optional[str] = None) -> StateServer:
+        """Serve the shared components to this node's job processes
+
+        The hosted components then belong to the daemon loop; this process
+        reaches them through the returned server's ``call_threadsafe`` only.
+        The caller keeps the server; job processes attach to it through
+        ``AGENT_STATE_SOCKET``.
+        """
+        server = StateServer(self.shared_state_components(), path=socket_path)
+        server.start_in_thread()
+        self.hosts_shared_state = True
+        REGISTRY.register_collector(partial(self._collect_hosted_metrics, server))
+        if self.warm_state is not None:
+            # This process is the only writer of the shared stores' sections.
+            server.submit(self.warm_state.start(self._warm_state_sections(local=False, shared=True)))
+        return server
+
+    def attach_shared_state(self, socket_path: str) -> bool:
+        """Route all per-user stores through the shared state daemon"""
+        if self.state_client is not None:
+            return True
+        try:
+            client = StateClient(socket_path)
+        except OSError as exc:
+            self.logger.warning("Shared state daemon unavailable, using local stores: %s", exc)
+            return False
+
+        for name in SHARED_COMPONENTS:
+            setattr(self, name, client.proxy(name))
+        self.feedback_integration.processor = self.feedback_processor
+        self.translation_processor.use_preference_store(RemoteMapping(client, "language_preferences"))
+        self.state_client = client
+        self.logger.info("Using shared state daemon at %s", socket_path)
+        return True
+
+    def attach_shared_state_from_env(self) -> bool:
+        """Attach in job processes when the parent worker hosts shared state"""
+        socket_path = os.getenv("AGENT_STATE_SOCKET")
+        owner = os.getenv("AGENT_STATE_OWNER_PID")
+        if not socket_path or owner == str(os.getpid()):
+            return False
+        return self.attach_shared_state(socket_path)
+
+    @contextmanager
+    def _stage(self, name: str) -> Iterator[None]:
+        """Time a pipeline stage and attribute loop stalls inside it"""
+        started = time.perf_counter()
+        with self.loop_monitor.stage(name):
+            try:
+                yield
+            except asyncio.CancelledError:
+                _CANCELLED_STAGES.inc(name)
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                _STAGE_LATENCY.observe(elapsed, name)
+                previous = self._stage_estimates.get(name)
+                self._stage_estimates[name] = elapsed if previous is None else 0.8 * previous + 0.2 * elapsed
+
+    def _optional_budget(self, expires: float) -> float:
+        """Seconds an optional stage may take while leaving room for the LLM"""
+        return expires - time.monotonic() - self._stage_estimates.get("llm", 0.0)
+
+    async def process_user_input(
+        self,
+        user_input: str,
+        user_id: str = "default_user",
+        session_id: Optional[str] = None,
+        prepared: Optional[PreparedTurn] = None,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Process user input through all system components
+
+        ``prepared`` is the result of an earlier :meth:`prepare_turn` for the
+        same input, e.g. computed speculatively from an interim transcript.
+        ``deadline`` overrides the turn budget (AGENT_TURN_DEADLINE seconds).
+        """
+        started = time.perf_counter()
+        expires = time.monotonic() + (self.turn_deadline if deadline is None else deadline)
+        session = self.current_session_data.get(session_id) if session_id else None
+        if session is not None:
+            session["last_activity"] = time.monotonic()
+        _TURNS_IN_FLIGHT.inc()
+        with log_context(trace_id=None if current_trace_id() else new_trace_id()):
+            try:
+                if (
+                    prepared is None
+                    or prepared.user_input.strip() != user_input.strip()
+                    or prepared.user_id != user_id
+                ):
+                    prepared = await self.prepare_turn(user_input, user_id, expires=expires)
+                result = await self._commit_turn(prepared, expires)
+            except Exception:
+                _TURN_ERRORS.inc()
+                raise
+            finally:
+                _TURNS_IN_FLIGHT.dec()
+            elapsed = time.perf_counter() - started
+            _TURN_LATENCY.observe(elapsed, result["type"])
+            self.turn_log.debug(
+                "Turn processed in %.1f ms", elapsed * 1000,
+                extra={"turn_type": result["type"], "degraded": result["degraded_stages"]},
+            )
+        return result
+
+    async def prepare_turn(
+        self, user_input: str, user_id: str, expires: Optional[float] = None
+    ) -> PreparedTurn:
+        """Run the stages of a turn that have no side effects on user state
+
+        The result is only applied by process_user_input, so it is safe to
+        compute ahead of time and discard. ``expires`` is the time.monotonic()
+        deadline of the turn.
+        """
+        if expires is None:
+            expires = time.monotonic() + self.turn_deadline
+        degraded: List[str] = []
+        self.loop_monitor.start()
+        self._start_session_reaper()
+        await self.restore_warm_state()
+        stage = self._stage
+
+        # 0. Reload the user's state if it was spilled to disk while idle
+        with stage("memory"):
+            await self.memory_manager.activate(user_id)
+
         # 1. Detect language and translate if necessary
-        lang_processing = await self.translation_processor.process_multilingual_input(
-            user_input, user_id
+        with stage("translation"):
+            lang_processing = await self.translation_processor.process_multilingual_input(
+                user_input, user_id, timeout=max(0.0, self._optional_budget(expires))
+            )
+        if lang_processing.get("degraded"):
+            degraded.append("translation")
+        processed_text = lang_processing["processed_text"]
+        
+        # 2. Process natural language understanding, from cache when short on time
+        if self._optional_budget(expires) < self._stage_estimates.get("nlu", 0.0):
+            nlp_result = self.nlp_processor.cached(processed_text)
+            degraded.append("nlu")
+        else:
+            with stage("nlu"):
+                nlp_result = await self.nlp_processor.process_query(processed_text)
+        
+        # 3. Check for voice commands; these are answered without the LLM
+        with stage("voice_command"):
+            voice_command_result = await self.voice_command_processor.process_text(user_input)
+        prepared = PreparedTurn(
+            user_input, user_id, lang_processing, nlp_result, voice_command_result, degraded=degraded
         )
+        if voice_command_result:
+            return prepared
         
-        # 2. Process natural language understanding
-        nlp_result = await self.nlp_processor.process_query(lang_processing["processed_text"])
+        # 4. Build the conversation context from the turns stored so far
+        with stage("context"):
+            context = await self.context_builder.build(
+                user_id, processed_text, self.voice_agent.system_prompt
+            )
         
-        # 3. Check for voice commands
-        voice_command_result = await self.voice_command_processor.process_text(user_input)
+        # 5. Process through the main voice agent within the remaining budget
+        with stage("llm"):
+            response, llm_degraded = await self.voice_agent.reply(
+                processed_text, user_id, context=context,
+                deadline=max(0.0, expires - time.monotonic()),
+            )
+        if llm_degraded:
+            degraded.append("llm")
         
-        # 4. If it's a voice command, execute it and return
-        if voice_command_result:
-            cmd_name, result = voice_command_result
+        # 6. Translate response back to user's preferred language
+        with stage("translation"):
+            prepared.response_translation = await self.translation_processor.translate_response(
+                response, user_id
+            )
+        return prepared
+
+    async def _commit_turn(self, prepared: PreparedTurn, expires: float) -> Dict[str, Any]:
+        user_input, user_id = prepared.user_input, prepared.user_id
+        degraded = prepared.degraded
+
+        # 7. If it's a voice command, execute it and return
+        if prepared.command:
+            cmd_name, result = prepared.command
+            self._record_degraded(degraded)
             return {
                 "type": "command_response",
                 "command": cmd_name,
                 "result": result,
+                "degraded_stages": degraded,
                 "processed_at": datetime.now().isoformat()
             }
         
-        # 5. Store interaction in episodic memory
-        await self.episodic_memory.store_interaction(user_id, user_input)
-        
-        # 6. Process through the main voice agent
-        response = await self.voice_agent.process_user_query(
-            lang_processing["processed_text"], user_id
-        )
-        
-        # 7. Generate recommendations based on the interaction
-        recommendations = await self.recommendation_engine.generate_recommendations(
-            user_id, 
-            context=user_input
-        )
-        
-        # 8. Translate response back to user's preferred language
-        response_translation = await self.translation_processor.translate_response(
-            response, user_id
-        )
+        # 8. Attach recommendations prepared after the previous turn; only
+        # these reach the user, so only these enter their history
+        recommendations = self._pending_recommendations.pop(user_id, [])
+        if recommendations:
+            await self.recommendation_engine.record_history(user_id, recommendations)
+        final_response = prepared.response_translation["final_response"]
         
-        # 9. Package the complete result
+        # 9. Background work is shed once the turn has overrun its budget
+        if time.monotonic() < expires:
+            self._schedule_recommendations(user_id, user_input)
+        else:
+            degraded.append("recommendations")
+        self._record_degraded(degraded)
+
+        # 10. Package the complete result
         result = {
             "type": "conversation_response",
             "original_input": user_input,
-            "processed_input": lang_processing["processed_text"],
-            "nlp_analysis": nlp_result,
-            "response": response_translation["final_response"],
-            "recommendations": [rec.content for rec in recommendations],
+            "processed_input": prepared.lang_processing["processed_text"],
+            "nlp_analysis": prepared.nlp_result,
+            "response": final_response,
+            "recommendations": recommendations,
+            "degraded_stages": degraded,
             "processed_at": datetime.now().isoformat(),
-            "user_preferences_applied": lang_processing["target_language"] != "en"
+            "user_preferences_applied": prepared.lang_processing["target_language"] != "en"
         }
         
-        # 10. Store the response in episodic memory
-        await self.episodic_memory.store_interaction(
-            user_id, response_translation["final_response"], is_response=True
-        )
+        # 11. Store the interaction and the response in episodic memory
+        with self._stage("episodic_memory"):
+            await self.episodic_memory.store_interaction(user_id, user_input)
+            await self.episodic_memory.store_interaction(user_id, final_response, is_response=True)
+
+        # 12. Refresh the context summary in the background
+        self.context_builder.note_turn(user_id)
         
         return result
 
+    @staticmethod
+    def _record_degraded(stages: List[str]) -> None:
+        for name in stages:
+            _DEGRADED_STAGES.inc(name)
+
+    def _schedule_recommendations(self, user_id: str, context: str) -> None:
+        """Compute recommendations speculatively without delaying the reply"""
+        previous = self._recommendation_tasks.get(user_id)
+        if previous and not previous.done():
+            previous.cancel()
+
+        task = asyncio.create_task(self._refresh_recommendations(user_id, context))
+        self._recommendation_tasks[user_id] = task
+
+        def _forget(done: asyncio.Task) -> None:
+            if self._recommendation_tasks.get(user_id) is done:
+                del self._recommendation_tasks[user_id]
+
+        task.add_done_callback(_forget)
+
+    async def _refresh_recommendations(self, user_id: str, context: str) -> None:
+        try:
+            with self._stage("recommendations"):
+                recommendations = await asyncio.wait_for(
+                    self.recommendation_engine.generate_recommendations(user_id, context=context),
+                    timeout=self.recommendation_timeout,
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self.logger.warning("Background recommendations failed for %s: %s", user_id, exc)
+            return
+        self._pending_recommendations[user_id] = [rec.content for rec in recommendations]
+
     async def handle_screen_observation(self, screen_data: Dict[str, Any]):
         """Handle screen observation data"""
-        # In a real implementation, this would:
-        # 1. Analyze the screen content
-        # 2. Determine if user needs assistance
-        # 3. Generate appropriate response
-        
-        self.logger.info(f"Screen observation received: {screen_data.get('timestamp')}")
-        
-        # For now, just log the event
-        # In the future, implement computer vision to understand screen content
-        pass
+        # Rate limiting and change detection happen at ingestion, so only
+        # material screen changes reach the analysis below.
+        if not await self.screen_observer.record_event(screen_data):
+            return
+
+        self.turn_log.debug("Screen change received: %s", screen_data.get("timestamp"))
+
+        # CPU-heavy analyzers (OCR, layout diffing, ...) registered on
+        # self.screen_analysis run in worker processes; results arrive through
+        # its result listeners without blocking voice turns.
+        frame = screen_data.get("frame")
+        if frame is not None:
+            metadata = {key: value for key, value in screen_data.items() if key != "frame"}
+            self.screen_analysis.submit(frame, metadata)
 
     async def start_session(self, user_id: str, session_id: str):
         """Start a new interaction session"""
         self.current_session_data[session_id] = {
             "user_id": user_id,
             "start_time": datetime.now(),
+            "last_activity": time.monotonic(),
             "interactions": [],
             "context": {}
         }
         
-        self.logger.info(f"Started session {session_id} for user {user_id}")
+        self.logger.info("Started session %s for user %s", session_id, user_id)
+        self._start_session_reaper()
+        await self.memory_manager.activate(user_id)
+        await self.translation_processor.load_language_preferences([user_id])
 
     async def end_session(self, session_id: str):
         """End a session and perform cleanup"""
@@ -173,19 +595,129 @@ class IntegratedVoiceAgent:
             
             # Clean up session data
             del self.current_session_data[session_id]
+            if not any(session["user_id"] == user_id for session in self.current_session_data.values()):
+                # Recommendations wait for the user's next reply in this
+                # process; without a session there will not be one.
+                self._pending_recommendations.pop(user_id, None)
+                task = self._recommendation_tasks.pop(user_id, None)
+                if task is not None:
+                    task.cancel()
             
-            self.logger.info(f"Ended session {session_id} for user {user_id}")
+            self.logger.info("Ended session %s for user %s", session_id, user_id)
+
+    async def reap_idle_sessions(self) -> List[str]:
+        """End sessions without a turn for longer than session_idle_timeout"""
+        cutoff = time.monotonic() - self.session_idle_timeout
+        idle = [
+            session_id
+            for session_id, session in self.current_session_data.items()
+            if session.get("last_activity", cutoff) <= cutoff
+        ]
+        for session_id in idle:
+            await self.end_session(session_id)
+        if idle:
+            self.logger.info("Reaped %d idle sessions", len(idle))
+        return idle
+
+    def _start_session_reaper(self) -> None:
+        if self._session_reaper is not None and not self._session_reaper.done():
+            return
+        self._session_reaper = asyncio.get_running_loop().create_task(self._reap_sessions_forever())
+
+    def warm_up(self) -> None:
+        """Build every component now and start loading the translation model
+
+        Components are otherwise built on first use, which would add their
+        init cost to the first turn that needs them.
+        """
+        self.components.warm()
+        self.translation_processor.warm_up()
+
+    def _warm_state_sections(self, local: bool, shared: bool) -> Dict[str, Tuple[Any, Any]]:
+        """Warm-state sections of this process's caches and/or the shared stores"""
+        translation = self.translation_processor
+        sections: Dict[str, Tuple[Any, Any]] = {}
+        if local:
+            sections["translation_cache"] = (translation.export_cache, translation.import_cache)
+            sections["nlu_cache"] = (self.nlp_processor.export_cache, self.nlp_processor.import_cache)
+        if shared:
+            sections["language_preferences"] = (
+                translation.export_language_preferences,
+                translation.import_language_preferences,
+            )
+            sections["recommendation_preferences"] = (
+                self.recommendation_engine.export_preferences,
+                self.recommendation_engine.import_preferences,
+            )
+        return sections
+
+    async def restore_warm_state(self) -> None:
+        """Merge the last warm-state snapshot in and start taking new ones
+
+        Call after attaching to shared state: the shared stores' sections are
+        then left to the process hosting the daemon.
+        """
+        if self.warm_state is None or self.warm_state.started:
+            return
+        await self.warm_state.start(
+            self._warm_state_sections(local=True, shared=self.state_client is None)
+        )
+
+    def start_warm_state(self) -> None:
+        """Restore warm state in the background; turns meanwhile run on cold caches"""
+        if self._warm_state_task is not None:
+            return
+        self._warm_state_task = asyncio.get_running_loop().create_task(self.restore_warm_state())
+
+    def start_load_reporter(self) -> None:
+        """Report this process's pipeline pressure to ``worker_load`` periodically
+
+        Only reports through the shared state daemon reach the parent's
+        load function, so a process that is not attached to it reports
+        nothing.
+        """
+        if self._load_reporter is not None and not self._load_reporter.done():
+            return
+        self.loop_monitor.start()
+        if self.state_client is None:
+            return
+        self._load_reporter = asyncio.get_running_loop().create_task(self._report_load_forever())
+
+    async def _report_load_forever(self) -> None:
+        pid = os.getpid()
+        while True:
+            try:
+                await self.worker_load.report(
+                    pid,
+                    int(_TURNS_IN_FLIGHT.value()),
+                    self.translation_processor.queue_depth,
+                    self.loop_monitor.recent_lag,
+                )
+            except Exception as exc:
+                self.logger.debug("Load report failed: %s", exc)
+            await asyncio.sleep(self.load_report_interval)
+
+    async def _reap_sessions_forever(self) -> None:
+        interval = min(60.0, max(1.0, self.session_idle_timeout / 2))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reap_idle_sessions()
+            except Exception as exc:
+                self.logger.warning("Session reaper failed: %s", exc)
 
     async def get_user_profile(self, user_id: str) -> Dict[str, Any]:
         """Get comprehensive user profile including all system data"""
         await self.db_handler.ensure_connection()
+        await self.memory_manager.activate(user_id)
 
         # Get data from all components
-        user_data = await self.db_handler.get_user_data(user_id)
-        satisfaction_score = self.feedback_processor.get_user_satisfaction_score(user_id)
-        task_summary = await self.task_manager.get_task_summary(user_id)
-        event_summary = await self.scheduler.get_event_summary(user_id)
-        personalization_summary = await self.recommendation_engine.personalization_summary(user_id)
+        with self._stage("user_profile"):
+            user_data = await self.db_handler.get_user_data(user_id)
+            satisfaction_score = await self.feedback_processor.get_user_satisfaction_score(user_id)
+            task_summary = await self.task_manager.get_task_summary(user_id)
+            event_summary = await self.scheduler.get_event_summary(user_id)
+            personalization_summary = await self.recommendation_engine.personalization_summary(user_id)
         
         profile = {
             "user_id": user_id,
@@ -201,7 +733,10 @@ class IntegratedVoiceAgent:
     async def generate_periodic_report(self) -> Dict[str, Any]:
         """Generate a system-wide report combining all component analytics"""
         feedback_report = await self.feedback_processor.generate_feedback_report()
-        active_users = len(set([fb.user_id for fb in self.feedback_processor.feedback_store]))
+        feedback_stats = await _resolved(self.feedback_processor.stats())
+        worker_load = await _resolved(self.worker_load.snapshot())
+        memory_stats = await _resolved(self.memory_manager.stats())
+        active_users = feedback_stats["users"]
         
         report = {
             "timestamp": datetime.now().isoformat(),
@@ -209,12 +744,21 @@ class IntegratedVoiceAgent:
             "feedback_analytics": feedback_report["analytics"],
             "improvement_suggestions": feedback_report["improvement_suggestions"],
             "system_health": {
-                "components_initialized": 12,  # All our components
+                "components_initialized": sum(
+                    self.components.is_built(name) for name in _COMPONENTS
+                ),
                 "database_connected": self.db_handler._connected,
+                "worker_load": worker_load,
                 "last_error": None
             },
+            "screen_analysis": self.screen_analysis.metrics(),
+            "event_loop": self.loop_monitor.report(),
+            "memory": {
+                "active_sessions": len(self.current_session_data),
+                **memory_stats,
+            },
             "usage_metrics": {
-                "total_interactions": len(self.feedback_processor.feedback_store),
+                "total_interactions": feedback_stats["entries"],
                 "avg_session_length": 0,  # Would need to track sessions
                 "most_popular_features": []  # Would need to track feature usage
             }
@@ -222,6 +766,63 @@ class IntegratedVoiceAgent:
         
         return report
 
+    def _collect_metrics(self):
+        """Scrape-time gauges; reads sizes only and never takes the async locks
+
+        Stores hosted by the shared state daemon are left out by job
+        processes, so each is exported once, by _collect_hosted_metrics.
+        """
+        yield (
+            "voice_agent_active_sessions",
+            "gauge",
+            "Sessions started and not yet ended.",
+            [("voice_agent_active_sessions", {}, len(self.current_session_data))],
+        )
+        if not self.hosts_shared_state:
+            stats = {}
+            for name in _STORES:
+                if name in SHARED_COMPONENTS and self.state_client is not None:
+                    continue  # Exported once, by the process hosting the daemon
+                store = self.components.built(name)
+                if store is not None:
+                    stats[name] = store.stats()
+            yield from self._store_metrics(stats)
+        lag = self.loop_monitor.report()
+        yield (
+            "voice_agent_event_loop_max_lag_seconds",
+            "gauge",
+            "Largest event-loop lag observed by the monitor.",
+            [("voice_agent_event_loop_max_lag_seconds", {}, lag["max_lag_ms"] / 1000)],
+        )
+
+    def _collect_hosted_metrics(self, server: StateServer):
+        """Store gauges of the hosting process, read on the daemon loop
+
+        The parent serves no turns, so only the hosted stores are exported
+        from it; job processes export their local stores.
+        """
+        stats = {
+            name: server.call_threadsafe(name, "stats", timeout=1.0)
+            for name in _STORES
+            if name in SHARED_COMPONENTS and self.components.is_built(name)
+        }
+        yield from self._store_metrics(stats)
+
+    @staticmethod
+    def _store_metrics(stats: Dict[str, Dict[str, int]]):
+        samples: Dict[str, List] = {"users": [], "entries": [], "approx_bytes": []}
+        for name, store_stats in stats.items():
+            for key in samples:
+                samples[key].append((f"voice_agent_store_{key}", {"store": name}, store_stats[key]))
+        yield ("voice_agent_store_users", "gauge", "Users with state in each store.", samples["users"])
+        yield ("voice_agent_store_entries", "gauge", "Entries held by each store.", samples["entries"])
+        yield (
+            "voice_agent_store_approx_bytes",
+            "gauge",
+            "Approximate memory held by each store.",
+            samples["approx_bytes"],
+        )
+
     async def request_user_feedback(self, user_id: str) -> Optional[str]:
         """Intelligently request feedback from a user"""
         feedback_request = await self.feedback_integration.get_personalized_feedback_request(user_id)
@@ -241,14 +842,24 @@ class IntegratedVoiceAgent:
         elif feedback_type == "issue":
             await self.feedback_processor.submit_issue_report(user_id, content)
 
-    async def get_avatar_config(self) -> Dict[str, Any]:
+    async def get_avatar_config(self, user_id: Optional[str] = None) -> Dict[str, Any]:
         """Get avatar configuration for the frontend"""
-        return await self.avatar_manager.get_avatar_config()
+        return await self.avatar_manager.get_avatar_config(user_id)
+
+    async def get_avatar_payload(self, user_id: str, etag: Optional[str] = None) -> Tuple[str, Optional[bytes]]:
+        """Serialized AVATAR payload of a user, or None if ``etag`` is current"""
+        return await self.avatar_manager.get_avatar_payload(user_id, etag)
+
+    async def update_avatar(self, user_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Change a user's avatar; returns the delta to push, if any"""
+        return await self.avatar_manager.update_avatar(user_id, changes)
 
     async def get_recommendations(self, user_id: str) -> List[str]:
         """Get personalized recommendations for a user"""
         recommendations = await self.recommendation_engine.generate_recommendations(user_id)
-        return [rec.content for rec in recommendations]
+        contents = [rec.content for rec in recommendations]
+        await self.recommendation_engine.record_history(user_id, contents)
+        return contents
 
     async def update_user_preferences(self, user_id: str, preferences: Dict[str, Any]):
         """Update user preferences across all systems"""
@@ -266,7 +877,10 @@ class IntegratedVoiceAgent:
     async def perform_system_maintenance(self):
         """Perform routine system maintenance"""
         # Clear old episodic memories
-        await self.episodic_memory.clear_old_interactions("default_user", days_to_keep=30)
+        with self._stage("maintenance"):
+            await self.episodic_memory.clear_old_interactions("default_user", days_to_keep=30)
+            await self.reap_idle_sessions()
+            await self.memory_manager.enforce_budget()
         
         # Maintain database connections
         # Perform other maintenance tasks
@@ -278,17 +892,96 @@ class LiveKitVoiceAgent:
     def __init__(self):
         self.integrated_agent = IntegratedVoiceAgent()
         self.logger = logging.getLogger(self.__class__.__name__)
+        # Participants allowed to send ADMIN data messages (e.g. profiling)
+        self.admin_identities = {
+            identity.strip()
+            for identity in os.getenv("AGENT_ADMIN_IDENTITIES", "").split(",")
+            if identity.strip()
+        }
+        # ADMIN exports and imports only read and write files under this directory
+        self.export_dir = Path(os.getenv("AGENT_EXPORT_DIR", "exports"))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # LiveKit pickles entrypoint_fnc and prewarm_fnc into job processes.
+        # The integrated agent holds locks, threads and event-loop tasks, so
+        # each process builds its own instead of receiving this one.
+        state = self.__dict__.copy()
+        del state["integrated_agent"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.integrated_agent = IntegratedVoiceAgent()
+
+    def _export_path(self, name: str) -> Path:
+        """``name`` inside export_dir; ValueError for absolute paths or ones leaving it"""
+        relative = Path(name)
+        if not name or relative.is_absolute() or ".." in relative.parts:
+            raise ValueError(f"Path must be relative to the export directory: {name}")
+        path = self.export_dir / relative
+        if not path.resolve().is_relative_to(self.export_dir.resolve()):
+            raise ValueError(f"Path must be relative to the export directory: {name}")
+        return path
+
+    async def _handle_admin_message(self, payload: Dict[str, Any], identity: str) -> Optional[Dict[str, Any]]:
+        """Run an admin action requested over the data channel"""
+        if identity not in self.admin_identities:
+            self.logger.warning("Ignoring admin message from unauthorised participant %s", identity)
+            return None
+        action = payload.get("action")
+        if action == "profile":
+            seconds = float(payload.get("seconds", 30))
+            started = PROFILER.start(min(seconds, 600.0))
+            return {"action": action, "started": started, "output_dir": str(PROFILER.output_dir)}
+        if action in ("export", "import") and payload.get("path"):
+            path = str(payload["path"])
+            fmt = format_for(path, payload.get("format"))
+            resume = payload.get("resume")
+            try:
+                target = self._export_path(path)
+                if action == "export":
+                    count, token = await export_to_file(self.integrated_agent.user_transfer, target, fmt, resume)
+                else:
+                    count, token = await import_from_file(self.integrated_agent.user_transfer, target, fmt, resume)
+            except (OSError, ValueError) as exc:
+                return {"action": action, "path": path, "error": str(exc)}
+            return {"action": action, "path": path, "users": count, "resume": token}
+        return {"action": action, "error": "unknown action"}
+
+    def prewarm(self, proc: JobProcess) -> None:
+        """Prepare an idle job process before it is assigned a job"""
+        # Put the handlers the LiveKit CLI installed behind the log queue.
+        configure_logging()
+        with STARTUP.measure("init", "silero VAD"):
+            from livekit.plugins import silero
+
+            proc.userdata["vad"] = silero.VAD.load()
+        self.integrated_agent.attach_shared_state_from_env()
+        self.integrated_agent.warm_up()
+        STARTUP.report("Job process prewarm")
 
     async def entrypoint(self, ctx: JobContext):
         """Entrypoint for the LiveKit agent"""
-        print(f"Voice agent connected to room: {ctx.room.name}")
+        # Records from this job and every task it starts carry the room name.
+        bind_log_context(room=ctx.room.name)
+        with STARTUP.measure("import", "livekit.agents"):
+            from livekit.agents import Agent, AgentSession
+            from livekit.plugins import openai, silero
+
+        self.integrated_agent.attach_shared_state_from_env()
+        self.integrated_agent.start_warm_state()
+        self.integrated_agent.start_load_reporter()
+        start_metrics_server_from_env()
+        PROFILER.install_signal_handler(duration=float(os.getenv("AGENT_PROFILE_SECONDS", "30")))
+        self.logger.info("Voice agent connected to room: %s", ctx.room.name)
 
         await ctx.connect()
 
+        # No session LLM: replies come from the integrated pipeline and are
+        # spoken verbatim with say(), so the session never generates its own.
         agent_session = AgentSession(
-            vad=silero.VAD.load(),
+            vad=ctx.proc.userdata.get("vad") or silero.VAD.load(),
             stt=openai.STT(),
-            llm=openai.LLM(model="gpt-4o-mini"),
             tts=openai.TTS(),
         )
 
@@ -303,74 +996,227 @@ class LiveKitVoiceAgent:
 
         local_participant = ctx.room.local_participant
         disconnect_event = asyncio.Event()
+        # Latest voice turn per speaker; newer speech cancels the older turn.
+        turns = TurnTracker()
+        # End of speech to first audio, per voice turn in this room.
+        voice_latency = VoiceLatencyTracker(ctx.room.name)
+
+        def _log_task_result(fut: asyncio.Task) -> None:
+            if fut.cancelled():
+                return
+            try:
+                fut.result()
+            except Exception as exc:  # pragma: no cover - defensive logging
+                self.logger.exception("Background task failed: %s", exc)
 
         def _spawn_task(coro: Awaitable[Any]) -> asyncio.Task:
             task = asyncio.create_task(coro)
-
-            def _log_task_result(fut: asyncio.Task) -> None:
-                try:
-                    fut.result()
-                except Exception as exc:  # pragma: no cover - defensive logging
-                    self.logger.exception("Background task failed: %s", exc)
-
             task.add_done_callback(_log_task_result)
             return task
 
+        async def _publish_packet(packet: bytes) -> None:
+            await local_participant.publish_data(packet, reliable=True, topic=PROTOCOL_TOPIC)
+
+        # Outgoing messages are typed and coalesced into shared packets.
+        channel = DataChannel(_publish_packet)
+
         async def publish_chat(text: str) -> None:
             cleaned = text.strip()
             if not cleaned:
                 return
-            try:
-                await local_participant.publish_data(cleaned, reliable=True, topic="chat")
-            except Exception as exc:
-                self.logger.warning("Failed to publish chat message: %s", exc)
+            await channel.send(MessageType.CHAT, {"text": cleaned})
 
-        async def speak_and_send(text: str) -> None:
-            cleaned = text.strip()
-            if not cleaned:
+        async def speak_and_send(
+            text: Union[str, AsyncIterable[str]], timeline: Optional[VoiceTurn] = None
+        ) -> None:
+            # Final text goes straight to TTS. Streamed chunks are spoken as they
+            # arrive and published as chat once the reply is complete.
+            if isinstance(text, str):
+                cleaned = text.strip()
+                if not cleaned:
+                    return
+                await publish_chat(cleaned)
+                try:
+                    turns.track_speech(agent_session.say(cleaned))
+                except Exception as exc:
+                    self.logger.warning("Failed to synthesize reply: %s", exc)
+                    return
+                if timeline is not None:
+                    voice_latency.tts_requested(timeline)
                 return
-            await publish_chat(cleaned)
+
+            spoken: List[str] = []
+
+            async def _chunks() -> AsyncIterator[str]:
+                async for chunk in text:
+                    spoken.append(chunk)
+                    yield chunk
+                await publish_chat("".join(spoken))
+
             try:
-                await agent_session.generate_reply(instructions=cleaned)
+                turns.track_speech(agent_session.say(_chunks()))
             except Exception as exc:
                 self.logger.warning("Failed to synthesize reply: %s", exc)
+                return
+            if timeline is not None:
+                voice_latency.tts_requested(timeline)
 
-        async def process_user_text(user_text: str, user_id: str) -> None:
+        room_sessions: set[str] = set()
+
+        async def ensure_session(user_id: str) -> str:
+            # One session per participant and room; restarted after being reaped.
+            session_id = f"{ctx.room.name}:{user_id}"
+            if session_id not in self.integrated_agent.current_session_data:
+                await self.integrated_agent.start_session(user_id, session_id)
+                room_sessions.add(session_id)
+            return session_id
+
+        async def process_user_text(
+            user_text: str,
+            user_id: str,
+            speculative: Optional[asyncio.Task] = None,
+            timeline: Optional[VoiceTurn] = None,
+        ) -> None:
+            # Runs as its own task, so the trace id is scoped to this turn.
+            bind_log_context(trace_id=new_trace_id())
             cleaned = user_text.strip()
+            prepared: Optional[PreparedTurn] = None
+            if speculative is not None:
+                try:
+                    prepared = await speculative
+                except Exception as exc:
+                    self.logger.debug("Discarding failed speculative turn: %s", exc)
+                else:
+                    # The prefetched reply answers the interim wording.
+                    cleaned = prepared.user_input
             if not cleaned:
                 return
             try:
-                result = await self.integrated_agent.process_user_input(cleaned, user_id=user_id)
+                session_id = await ensure_session(user_id)
+                result = await self.integrated_agent.process_user_input(
+                    cleaned, user_id=user_id, session_id=session_id, prepared=prepared
+                )
             except Exception as exc:
                 self.logger.exception("Error processing user input: %s", exc)
-                await speak_and_send("I'm sorry, I ran into an internal error while processing that.")
+                await speak_and_send("I'm sorry, I ran into an internal error while processing that.", timeline)
                 return
+            if timeline is not None:
+                timeline.mark("pipeline_complete")
 
             reply: str | None = None
+            recommendations: List[str] = []
             if result.get("type") == "conversation_response":
                 reply = result.get("response")
                 recommendations = result.get("recommendations") or []
-                if recommendations:
-                    suggestion_text = " Here are some suggestions: " + "; ".join(recommendations)
-                    reply = (reply or "").strip() + suggestion_text
             elif result.get("type") == "command_response":
                 command_name = result.get("command", "command")
                 command_result = result.get("result")
                 reply = f"{command_name.replace('_', ' ').title()} result: {command_result}."
+                await channel.send(
+                    MessageType.COMMAND, {"command": command_name, "result": command_result}
+                )
 
             if reply:
-                await speak_and_send(reply)
+                await speak_and_send(reply, timeline)
+            if recommendations:
+                # Suggestions are a low-priority side channel: they are shown in
+                # the cockpit but never lengthen the spoken reply.
+                _spawn_task(channel.send(MessageType.RECOMMENDATION, {"items": recommendations}))
+
+        async def handle_message(message: Message, identity: str) -> None:
+            payload = message.payload
+            if message.type in (MessageType.CHAT, MessageType.COMMAND):
+                await process_user_text(str(payload.get("text", "")), identity)
+            elif message.type == MessageType.PROFILE:
+                preferences = payload.get("preferences")
+                if isinstance(preferences, dict):
+                    await self.integrated_agent.update_user_preferences(identity, preferences)
+                    await channel.send(MessageType.PROFILE, {"preferences": preferences})
+            elif message.type == MessageType.AVATAR:
+                changes = payload.get("changes")
+                if isinstance(changes, dict):
+                    try:
+                        delta = await self.integrated_agent.update_avatar(identity, changes)
+                    except ValueError as exc:
+                        await channel.send(MessageType.AVATAR, {"user_id": identity, "error": str(exc)})
+                        return
+                    if delta is not None:
+                        await channel.send(MessageType.AVATAR, delta)
+                        return
+                await send_avatar(identity, payload.get("etag"))
+            elif message.type == MessageType.ADMIN:
+                response = await self._handle_admin_message(payload, identity)
+                if response is not None:
+                    await channel.send(MessageType.ADMIN, response)
+
+        async def send_avatar(identity: str, etag: Optional[str] = None) -> None:
+            # A cached body is sent as is; a current ETag only gets a short reply.
+            current, body = await self.integrated_agent.get_avatar_payload(identity, etag)
+            if body is None:
+                await channel.send(MessageType.AVATAR, {"user_id": identity, "etag": current, "not_modified": True})
+            else:
+                await channel.send_encoded(MessageType.AVATAR, body)
+
+        def commit_turn(speaker: str, text: str, speculative: Optional[asyncio.Task]) -> None:
+            timeline = voice_latency.current
+            turns.start(speaker, process_user_text(text, speaker, speculative, timeline)).add_done_callback(
+                _log_task_result
+            )
+
+        # Stable interim transcripts start the turn early; voice commands are
+        # committed as soon as they are recognised.
+        commands = self.integrated_agent.voice_command_processor
+        speculator = Speculator(
+            self.integrated_agent.prepare_turn,
+            commit_turn,
+            speculate_now=lambda text: commands.match(text) is not None,
+            commit_early=lambda prepared: prepared.command is not None,
+        )
+
+        # Participant whose speech was transcribed last. VAD events carry no
+        # identity, so speech start barges in on this participant's turn only.
+        voice_speaker = "default_user"
 
         @agent_session.on("user_input_transcribed")
         def _on_user_input(event: voice_events.UserInputTranscribedEvent) -> None:
-            if not event.is_final:
-                return
-            _spawn_task(process_user_text(event.transcript, event.speaker_id or "default_user"))
+            nonlocal voice_speaker
+            speaker = voice_speaker = event.speaker_id or "default_user"
+            if event.is_final:
+                voice_latency.final_transcript()
+                speculator.final(speaker, event.transcript)
+            else:
+                speculator.interim(speaker, event.transcript)
+
+        @agent_session.on("user_state_changed")
+        def _on_user_state(event: voice_events.UserStateChangedEvent) -> None:
+            # VAD speech start: the user is barging in on their own turn in flight.
+            if event.new_state == "speaking":
+                turns.cancel(voice_speaker, "vad")
+                voice_latency.speech_started()
+            elif event.old_state == "speaking":
+                voice_latency.speech_ended()
+
+        @agent_session.on("agent_state_changed")
+        def _on_agent_state(event: voice_events.AgentStateChangedEvent) -> None:
+            # The first playout of a requested reply is its first audio frame.
+            if event.new_state == "speaking":
+                voice_latency.agent_speaking()
 
         @ctx.room.on("data_received")
         def _on_data(packet: rtc.DataPacket) -> None:
             if packet.participant is None:
                 return
+            identity = packet.participant.identity or "default_user"
+            if packet.topic == PROTOCOL_TOPIC:
+                try:
+                    messages = decode_packet(packet.data)
+                except ProtocolError as exc:
+                    self.logger.warning("Failed to decode data packet: %s", exc)
+                    return
+                for message in messages:
+                    _spawn_task(handle_message(message, identity))
+                return
+            # Plain UTF-8 text on the legacy chat topic is still accepted.
             if packet.topic and packet.topic not in ("", "chat"):
                 return
             try:
@@ -380,9 +1226,12 @@ class LiveKitVoiceAgent:
                 return
             if not message:
                 return
-            identity = packet.participant.identity or "default_user"
             _spawn_task(process_user_text(message, identity))
 
+        @ctx.room.on("participant_connected")
+        def _on_participant_connected(participant: rtc.RemoteParticipant) -> None:
+            _spawn_task(send_avatar(participant.identity or "default_user"))
+
         @agent_session.on("error")
         def _on_session_error(event: voice_events.ErrorEvent) -> None:
             self.logger.error("Agent session error: %s", event.error)
@@ -397,9 +1246,16 @@ class LiveKitVoiceAgent:
             disconnect_event.set()
 
         await publish_chat("Agent connected. Say hello whenever you're ready.")
+        for participant in list(ctx.room.remote_participants.values()):
+            await send_avatar(participant.identity or "default_user")
         await speak_and_send("Hello! I'm your virtual assistant. How can I help you today?")
 
         await disconnect_event.wait()
+        speculator.discard_all()
+        voice_latency.close()
+        await channel.aclose()
+        for session_id in room_sessions:
+            await self.integrated_agent.end_session(session_id)
 
         try:
             await agent_session.aclose()
@@ -411,6 +1267,25 @@ class LiveKitVoiceAgent:
         return await self.integrated_agent.process_user_input(user_input, user_id)
 
 
+def _process_agent(proc: JobProcess) -> LiveKitVoiceAgent:
+    """The agent of this job process, built on first use and kept in userdata"""
+    agent = proc.userdata.get("agent")
+    if agent is None:
+        with STARTUP.measure("init", "LiveKitVoiceAgent"):
+            agent = proc.userdata["agent"] = LiveKitVoiceAgent()
+    return agent
+
+
+def prewarm(proc: JobProcess) -> None:
+    """``prewarm_fnc`` for the worker; pickled by reference into job processes"""
+    _process_agent(proc).prewarm(proc)
+
+
+async def entrypoint(ctx: JobContext) -> None:
+    """``entrypoint_fnc`` for the worker; pickled by reference into job processes"""
+    await _process_agent(ctx.proc).entrypoint(ctx)
+
+
 # Example usage function
 async def run_example():
     """Example of how to use the integrated agent"""
@@ -2,5 +2,6 @@
 
 from .semantic_memory import SemanticMemory
 from .episodic_memory import EpisodicMemory
+from .context_builder import ConversationContext
 
-__all__ = ["SemanticMemory", "EpisodicMemory"]
+__all__ = ["SemanticMemory", "EpisodicMemory", "ConversationContext"]
@@ -0,0 +1,205 @@
+"""Token-budgeted conversation context for LLM requests."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..utils.metrics import REGISTRY, approx_size
+from .episodic_memory import Cursor
+
+Message = Dict[str, str]
+# (previous summary, entries to fold in, token limit) -> new summary or None
+Summarizer = Callable[[str, List[Dict[str, str]], int], Awaitable[Optional[str]]]
+
+# Per-message framing cost in chat completion requests.
+_MESSAGE_OVERHEAD = 4
+
+_ROLES = {"user": "user", "agent": "assistant"}
+
+_CONTEXT_TOKENS = REGISTRY.histogram(
+    "voice_agent_context_tokens",
+    "Estimated prompt tokens per LLM request.",
+    buckets=(100, 250, 500, 1000, 2000, 4000, 8000),
+)
+_SUMMARY_REFRESHES = REGISTRY.counter(
+    "voice_agent_summary_refreshes_total", "Rolling summary refreshes by outcome.", ("outcome",)
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+
+    return len(text) // 4 + 1
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Keep the end of ``text`` so that it fits ``max_tokens``."""
+
+    limit = max(0, max_tokens - 1) * 4
+    if len(text) <= limit:
+        return text
+    return "…" + text[len(text) - limit + 1:].lstrip()
+
+
+class ConversationContext:
+    """Builds the prior-turn messages for a user's next LLM request.
+
+    The latest ``recent_turns`` entries from episodic memory go in verbatim;
+    older ones are folded into a per-user rolling summary. The summary is
+    refreshed in the background every ``refresh_every`` turns, so building a
+    context never waits on the LLM. Everything is trimmed, oldest turn
+    first, to ``token_budget`` together with the system prompt and query.
+    """
+
+    def __init__(
+        self,
+        memory: Any,
+        summarizer: Optional[Summarizer] = None,
+        token_budget: int = 1500,
+        recent_turns: int = 8,
+        summary_tokens: int = 250,
+        refresh_every: int = 4,
+        max_batch: int = 50,
+        max_users: int = 10000,
+    ) -> None:
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._memory = memory
+        self._summarizer = summarizer
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self.summary_tokens = summary_tokens
+        self.refresh_every = refresh_every
+        self.max_batch = max_batch
+        self.max_users = max_users
+        # user -> (summary, episodic memory cursor past the entries it covers)
+        self._summaries: "OrderedDict[str, Tuple[str, Optional[Cursor]]]" = OrderedDict()
+        # Turns since the last refresh, for users with some; LRU bounded too
+        self._turns_since_refresh: "OrderedDict[str, int]" = OrderedDict()
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_env(cls, memory: Any, summarizer: Optional[Summarizer] = None) -> "ConversationContext":
+        return cls(
+            memory,
+            summarizer,
+            token_budget=int(os.getenv("AGENT_CONTEXT_TOKENS", "1500")),
+            recent_turns=int(os.getenv("AGENT_CONTEXT_RECENT_TURNS", "8")),
+        )
+
+    def summary(self, user_id: str) -> str:
+        return self._summaries.get(user_id, ("", None))[0]
+
+    async def build(self, user_id: str, query: str, system_prompt: str = "") -> List[Message]:
+        """Return the messages to place between the system prompt and ``query``.
+
+        Call this before the current utterance is stored in episodic memory.
+        """
+
+        fixed = estimate_tokens(system_prompt) + estimate_tokens(query) + 2 * _MESSAGE_OVERHEAD
+        remaining = self.token_budget - fixed
+        summary, covered = self._summaries.get(user_id, ("", None))
+        if user_id in self._summaries:
+            self._summaries.move_to_end(user_id)
+
+        prefix: List[Message] = []
+        if summary:
+            cost = estimate_tokens(summary) + _MESSAGE_OVERHEAD
+            if cost <= remaining:
+                prefix.append({"role": "system", "content": f"Earlier in this conversation: {summary}"})
+                remaining -= cost
+
+        entries = await self._memory.recent_interactions(user_id, self.recent_turns, after=covered)
+        turns: List[Message] = []
+        for entry in reversed(entries):
+            cost = estimate_tokens(entry["text"]) + _MESSAGE_OVERHEAD
+            if cost > remaining:
+                break
+            turns.append({"role": _ROLES.get(entry["role"], "user"), "content": entry["text"]})
+            remaining -= cost
+        turns.reverse()
+
+        _CONTEXT_TOKENS.observe(self.token_budget - remaining)
+        return prefix + turns
+
+    def note_turn(self, user_id: str) -> None:
+        """Record a completed turn and refresh the summary when one is due."""
+
+        count = self._turns_since_refresh.get(user_id, 0) + 1
+        self._turns_since_refresh[user_id] = count
+        self._turns_since_refresh.move_to_end(user_id)
+        if len(self._turns_since_refresh) > self.max_users:
+            self._turns_since_refresh.popitem(last=False)
+        if count < self.refresh_every:
+            return
+        running = self._refresh_tasks.get(user_id)
+        if running is not None and not running.done():
+            return
+        del self._turns_since_refresh[user_id]
+        task = asyncio.create_task(self._refresh(user_id))
+        self._refresh_tasks[user_id] = task
+
+        def _forget(done: asyncio.Task) -> None:
+            if self._refresh_tasks.get(user_id) is done:
+                del self._refresh_tasks[user_id]
+
+        task.add_done_callback(_forget)
+
+    async def _refresh(self, user_id: str) -> None:
+        # Fold in the turns older than the verbatim window, oldest first and
+        # at most max_batch per summarizer call, until the summary catches up.
+        while True:
+            previous, covered = self._summaries.get(user_id, ("", None))
+            overflow, cursor = await self._memory.interactions_after(
+                user_id, covered, self.max_batch, skip_latest=self.recent_turns
+            )
+            if not overflow:
+                return
+
+            summary: Optional[str] = None
+            if self._summarizer is not None:
+                try:
+                    summary = await self._summarizer(previous, overflow, self.summary_tokens)
+                except Exception as exc:
+                    self.logger.warning("Summarizer failed for %s: %s", user_id, exc)
+            outcome = "llm" if summary else "extractive"
+            if not summary:
+                summary = self._extractive_summary(previous, overflow)
+            _SUMMARY_REFRESHES.inc(outcome)
+
+            self._summaries[user_id] = (
+                truncate_to_tokens(summary, self.summary_tokens),
+                cursor,
+            )
+            self._summaries.move_to_end(user_id)
+            while len(self._summaries) > self.max_users:
+                evicted, _ = self._summaries.popitem(last=False)
+                self._turns_since_refresh.pop(evicted, None)
+            if len(overflow) < self.max_batch:
+                return
+
+    def user_footprint(self, user_id: str) -> int:
+        summary = self._summaries.get(user_id)
+        return approx_size(summary[0]) if summary is not None else 0
+
+    async def export_user(self, user_id: str) -> Optional[Tuple[str, Optional[Cursor]]]:
+        return self._summaries.get(user_id)
+
+    async def import_user(self, user_id: str, state: Tuple[str, Optional[Cursor]]) -> None:
+        if user_id not in self._summaries:
+            self._summaries[user_id] = tuple(state)
+
+    async def evict_user(self, user_id: str) -> None:
+        self._summaries.pop(user_id, None)
+        self._turns_since_refresh.pop(user_id, None)
+        task = self._refresh_tasks.pop(user_id, None)
+        if task is not None:
+            task.cancel()
+
+    @staticmethod
+    def _extractive_summary(previous: str, entries: List[Dict[str, str]]) -> str:
+        said = "; ".join(entry["text"] for entry in entries if entry["role"] == "user")
+        return f"{previous} The user said: {said}.".strip() if said else previous
@@ -3,9 +3,43 @@
 from __future__ import annotations
 
 import asyncio
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..utils.metrics import approx_size, per_user_stats
+
+
+def _timestamp(entry: Dict[str, str]) -> str:
+    return entry["timestamp"]
+
+
+def _entry_key(entry: Dict[str, str]) -> tuple:
+    return entry["timestamp"], entry["role"], entry["text"]
+
+
+# Position after an entry: its timestamp and how many entries with that
+# timestamp come up to and including it. Entries may share a timestamp, so
+# the timestamp alone does not say which of them a reader has seen.
+Cursor = Tuple[str, int]
+
+
+def _position(entries: List[Dict[str, str]], cursor: Optional[Cursor]) -> int:
+    """Index of the first entry past ``cursor``."""
+
+    if cursor is None:
+        return 0
+    timestamp, seen = cursor
+    first = bisect_left(entries, timestamp, key=_timestamp)
+    return min(first + seen, bisect_right(entries, timestamp, key=_timestamp))
+
+
+def _cursor(entries: List[Dict[str, str]], end: int) -> Cursor:
+    """Cursor past ``entries[end - 1]``."""
+
+    timestamp = entries[end - 1]["timestamp"]
+    return timestamp, end - bisect_left(entries, timestamp, key=_timestamp)
 
 
 class EpisodicMemory:
@@ -31,6 +65,79 @@ class EpisodicMemory:
         summary = f"Session between {start.isoformat()} and {end.isoformat()} with {len(entries)} turns."
         return {"summary": summary}
 
+    async def recent_interactions(
+        self, user_id: str, limit: int, after: Optional[Cursor] = None
+    ) -> List[Dict[str, str]]:
+        """Return up to ``limit`` latest entries, oldest first, past the ``after`` cursor."""
+
+        async with self._lock:
+            entries = self._interactions.get(user_id, [])
+            start = max(len(entries) - limit, _position(entries, after))
+            return entries[start:]
+
+    async def interactions_after(
+        self, user_id: str, after: Optional[Cursor], limit: int, skip_latest: int = 0
+    ) -> Tuple[List[Dict[str, str]], Optional[Cursor]]:
+        """Return up to ``limit`` oldest entries past ``after``, and a cursor past them.
+
+        The latest ``skip_latest`` entries are never included. The cursor is
+        ``after`` when there are no such entries.
+        """
+
+        async with self._lock:
+            entries = self._interactions.get(user_id, [])
+            start = _position(entries, after)
+            end = min(start + limit, len(entries) - skip_latest)
+            if end <= start:
+                return [], after
+            return entries[start:end], _cursor(entries, end)
+
+    def stats(self) -> Dict[str, int]:
+        return per_user_stats(self._interactions)
+
+    def user_footprint(self, user_id: str) -> int:
+        return approx_size(self._interactions.get(user_id, ()))
+
+    async def export_user(self, user_id: str) -> List[Dict[str, str]]:
+        async with self._lock:
+            return list(self._interactions.get(user_id, ()))
+
+    async def import_user(self, user_id: str, entries: List[Dict[str, str]]) -> None:
+        """Restore exported entries ahead of anything recorded since."""
+
+        async with self._lock:
+            self._interactions[user_id] = list(entries) + self._interactions.get(user_id, [])
+
+    def user_ids(self) -> List[str]:
+        return list(self._interactions)
+
+    async def export_users(self, user_ids: Iterable[str]) -> Dict[str, List[Dict[str, str]]]:
+        async with self._lock:
+            return {
+                user_id: list(self._interactions[user_id])
+                for user_id in user_ids
+                if self._interactions.get(user_id)
+            }
+
+    async def import_users(self, entries: Dict[str, List[Dict[str, str]]]) -> None:
+        """Restore many users at once, each ahead of anything recorded since.
+
+        Entries the user already has are skipped, so a retried or resumed
+        import does not duplicate them.
+        """
+
+        async with self._lock:
+            for user_id, imported in entries.items():
+                current = self._interactions.get(user_id, [])
+                present = {_entry_key(entry) for entry in current}
+                self._interactions[user_id] = [
+                    entry for entry in imported if _entry_key(entry) not in present
+                ] + current
+
+    async def evict_user(self, user_id: str) -> None:
+        async with self._lock:
+            self._interactions.pop(user_id, None)
+
     async def clear_old_interactions(self, user_id: str, days_to_keep: int = 30) -> None:
         cutoff = datetime.utcnow() - timedelta(days=days_to_keep)
         async with self._lock:
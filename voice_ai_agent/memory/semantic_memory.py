@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List
+
+from ..utils.metrics import approx_size, per_user_stats
 
 
 class SemanticMemory:
@@ -17,6 +19,40 @@ class SemanticMemory:
         async with self._lock:
             self._knowledge.setdefault(user_id, {})[key] = value
 
+    def stats(self) -> Dict[str, int]:
+        return per_user_stats(self._knowledge)
+
+    def user_footprint(self, user_id: str) -> int:
+        return approx_size(self._knowledge.get(user_id, {}))
+
+    async def export_user(self, user_id: str) -> Dict[str, Any]:
+        async with self._lock:
+            return dict(self._knowledge.get(user_id, {}))
+
+    async def import_user(self, user_id: str, facts: Dict[str, Any]) -> None:
+        """Restore exported facts; values stored since take precedence."""
+
+        async with self._lock:
+            self._knowledge[user_id] = {**facts, **self._knowledge.get(user_id, {})}
+
+    def user_ids(self) -> List[str]:
+        return list(self._knowledge)
+
+    async def export_users(self, user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        async with self._lock:
+            return {user_id: dict(self._knowledge[user_id]) for user_id in user_ids if self._knowledge.get(user_id)}
+
+    async def import_users(self, facts: Dict[str, Dict[str, Any]]) -> None:
+        """Restore many users at once; values stored since take precedence."""
+
+        async with self._lock:
+            for user_id, imported in facts.items():
+                self._knowledge[user_id] = {**imported, **self._knowledge.get(user_id, {})}
+
+    async def evict_user(self, user_id: str) -> None:
+        async with self._lock:
+            self._knowledge.pop(user_id, None)
+
     async def retrieve_facts(self, user_id: str) -> Dict[str, Any]:
         async with self._lock:
             return dict(self._knowledge.get(user_id, {}))
@@ -1,6 +1,16 @@
 """Utility helpers used across the cockpit stack."""
 
 from .screen_observer import ScreenObserver
+from .screen_analysis import ScreenAnalysisStage
+from .data_protocol import DataChannel, MessageType
+from .loop_monitor import EventLoopMonitor
+from .memory_manager import MemoryManager
+from .metrics import REGISTRY, MetricsRegistry, MetricsServer
+from .profiler import PROFILER, SamplingProfiler
+from .speculation import Speculator
+from .structured_logging import ThrottledLogger, configure_logging, log_context
+from .turn_tracker import TurnTracker
+from .voice_latency import VoiceLatencyTracker
 from .nlp_processor import NLUProcessor
 from .voice_command_processor import VoiceCommandProcessor
 from .translation_engine import MultilingualProcessor
@@ -16,6 +26,22 @@ from .scheduler import Scheduler
 
 __all__ = [
     "ScreenObserver",
+    "ScreenAnalysisStage",
+    "DataChannel",
+    "MessageType",
+    "EventLoopMonitor",
+    "MemoryManager",
+    "REGISTRY",
+    "MetricsRegistry",
+    "MetricsServer",
+    "PROFILER",
+    "SamplingProfiler",
+    "Speculator",
+    "ThrottledLogger",
+    "configure_logging",
+    "log_context",
+    "TurnTracker",
+    "VoiceLatencyTracker",
     "NLUProcessor",
     "VoiceCommandProcessor",
     "MultilingualProcessor",
@@ -0,0 +1,211 @@
+"""Compact, batched message protocol for the LiveKit data channel.
+
+Every packet starts with a two byte header (protocol version, flags) followed
+by a body holding one or more frames. Each frame is a message type byte, a
+big-endian ``uint32`` sequence number, a ``uint32`` payload length and the
+payload as compact UTF-8 JSON. When the body is larger than the compression
+threshold it is zlib-compressed and ``FLAG_COMPRESSED`` is set.
+
+Payloads stay JSON so that the browser frontend can decode them without a
+codec library. Frames are never split: a batch that would not fit in one
+LiveKit data packet is sent as several packets of whole frames.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import struct
+import zlib
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+PROTOCOL_TOPIC = "agent"
+PROTOCOL_VERSION = 1
+FLAG_COMPRESSED = 0x01
+# LiveKit drops reliable data packets larger than this
+MAX_PACKET_BYTES = 15 * 1024
+
+_HEADER = struct.Struct(">BB")
+_FRAME = struct.Struct(">BII")
+
+
+class MessageType(IntEnum):
+    CHAT = 1
+    COMMAND = 2
+    RECOMMENDATION = 3
+    AVATAR = 4
+    PROFILE = 5
+    ADMIN = 6
+
+
+class ProtocolError(ValueError):
+    """Raised when a packet cannot be decoded."""
+
+
+@dataclass
+class Message:
+    type: MessageType
+    seq: int
+    payload: Dict[str, Any]
+
+
+def encode_payload(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def encode_frame(msg_type: MessageType, seq: int, payload: Dict[str, Any]) -> bytes:
+    return encode_frame_body(msg_type, seq, encode_payload(payload))
+
+
+def encode_frame_body(msg_type: MessageType, seq: int, body: bytes) -> bytes:
+    """Frame a payload that is already compact UTF-8 JSON."""
+
+    return _FRAME.pack(int(msg_type), seq, len(body)) + body
+
+
+def encode_packet(frames: List[bytes], compress_threshold: int = 512) -> bytes:
+    body = b"".join(frames)
+    flags = 0
+    if len(body) > compress_threshold:
+        compressed = zlib.compress(body, 6)
+        if len(compressed) < len(body):
+            body = compressed
+            flags |= FLAG_COMPRESSED
+    return _HEADER.pack(PROTOCOL_VERSION, flags) + body
+
+
+def encode_packets(
+    frames: List[bytes], compress_threshold: int = 512, max_packet_bytes: int = MAX_PACKET_BYTES
+) -> List[bytes]:
+    """Encode ``frames`` in order into packets of at most ``max_packet_bytes``.
+
+    A batch that does not fit is halved until each part does. Raises
+    ProtocolError for a single frame that does not fit in a packet.
+    """
+
+    packet = encode_packet(frames, compress_threshold)
+    if len(packet) <= max_packet_bytes:
+        return [packet]
+    if len(frames) == 1:
+        raise ProtocolError(f"Frame of {len(frames[0])} bytes does not fit in a data packet")
+    middle = len(frames) // 2
+    return encode_packets(frames[:middle], compress_threshold, max_packet_bytes) + encode_packets(
+        frames[middle:], compress_threshold, max_packet_bytes
+    )
+
+
+def decode_packet(data: bytes) -> List[Message]:
+    if len(data) < _HEADER.size:
+        raise ProtocolError("Packet too short")
+    version, flags = _HEADER.unpack_from(data)
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Unsupported protocol version {version}")
+    body = memoryview(data)[_HEADER.size:]
+    if flags & FLAG_COMPRESSED:
+        try:
+            body = memoryview(zlib.decompress(body))
+        except zlib.error as exc:
+            raise ProtocolError(f"Corrupt compressed body: {exc}") from exc
+
+    messages: List[Message] = []
+    offset = 0
+    while offset < len(body):
+        if len(body) - offset < _FRAME.size:
+            raise ProtocolError("Truncated frame header")
+        msg_type, seq, length = _FRAME.unpack_from(body, offset)
+        offset += _FRAME.size
+        if offset + length > len(body):
+            raise ProtocolError("Truncated frame payload")
+        try:
+            kind = MessageType(msg_type)
+            payload = json.loads(bytes(body[offset:offset + length]))
+        except ValueError as exc:
+            raise ProtocolError(f"Invalid frame: {exc}") from exc
+        offset += length
+        messages.append(Message(kind, seq, payload if isinstance(payload, dict) else {"value": payload}))
+    return messages
+
+
+class DataChannel:
+    """Coalesces outgoing messages into as few data packets as possible.
+
+    Messages queued within ``flush_interval`` of each other share a packet.
+    A batch is sent early once it reaches ``max_batch_bytes``, and split
+    into several packets when it exceeds ``max_packet_bytes``.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[bytes], Awaitable[None]],
+        *,
+        flush_interval: float = 0.02,
+        max_batch_bytes: int = 12_000,
+        compress_threshold: int = 512,
+        max_packet_bytes: int = MAX_PACKET_BYTES,
+    ) -> None:
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._publish = publish
+        self._flush_interval = flush_interval
+        self._max_batch_bytes = max_batch_bytes
+        self._compress_threshold = compress_threshold
+        self._max_packet_bytes = max_packet_bytes
+        self._pending: List[bytes] = []
+        self._pending_bytes = 0
+        self._seq = 0
+        self._flush_task: Optional[asyncio.Task] = None
+        self._send_lock = asyncio.Lock()
+        self.packets_sent = 0
+        self.messages_sent = 0
+
+    async def send(self, msg_type: MessageType, payload: Dict[str, Any]) -> int:
+        """Queue a message and return its sequence number."""
+
+        return await self.send_encoded(msg_type, encode_payload(payload))
+
+    async def send_encoded(self, msg_type: MessageType, body: bytes) -> int:
+        """Queue a pre-serialised JSON payload and return its sequence number.
+
+        Raises ProtocolError, without queuing it, for a message that does
+        not fit in a data packet even on its own.
+        """
+
+        frame = encode_frame_body(msg_type, (self._seq + 1) & 0xFFFFFFFF, body)
+        if _HEADER.size + len(frame) > self._max_packet_bytes:
+            encode_packets([frame], self._compress_threshold, self._max_packet_bytes)
+        self._seq = (self._seq + 1) & 0xFFFFFFFF
+        self._pending.append(frame)
+        self._pending_bytes += len(frame)
+
+        if self._pending_bytes >= self._max_batch_bytes:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+        return self._seq
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._flush_interval)
+        await self.flush()
+
+    async def flush(self) -> None:
+        async with self._send_lock:
+            if not self._pending:
+                return
+            frames, self._pending, self._pending_bytes = self._pending, [], 0
+            packets = encode_packets(frames, self._compress_threshold, self._max_packet_bytes)
+            for packet in packets:
+                try:
+                    await self._publish(packet)
+                except Exception as exc:
+                    self.logger.warning("Failed to publish data packet: %s", exc)
+                    return
+                self.packets_sent += 1
+            self.messages_sent += len(frames)
+
+    async def aclose(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            # Let a scheduled flush finish rather than dropping its batch.
+            await self._flush_task
+        await self.flush()
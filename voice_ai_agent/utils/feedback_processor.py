@@ -4,10 +4,13 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import datetime
 from enum import Enum
 from statistics import mean
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
+
+from .metrics import approx_size, per_user_stats
 
 
 class FeedbackType(str, Enum):
@@ -22,6 +25,11 @@ class FeedbackEntry:
     feedback_type: FeedbackType
     content: Any
     rating: Optional[int] = None
+    timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+    def key(self) -> tuple:
+        """Identity of the entry across an export and re-import."""
+        return self.timestamp, self.feedback_type, self.rating, repr(self.content)
 
 
 class FeedbackProcessor:
@@ -29,41 +37,97 @@ class FeedbackProcessor:
 
     def __init__(self) -> None:
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.feedback_store: List[FeedbackEntry] = []
+        # Entries per user, so lookups, export and eviction touch one user only
+        self._entries_by_user: Dict[str, List[FeedbackEntry]] = {}
         self._lock = asyncio.Lock()
 
+    @property
+    def feedback_store(self) -> List[FeedbackEntry]:
+        """All entries, grouped by user."""
+        return [entry for entries in self._entries_by_user.values() for entry in entries]
+
+    def _append(self, entry: FeedbackEntry) -> None:
+        self._entries_by_user.setdefault(entry.user_id, []).append(entry)
+
     async def submit_rating(self, user_id: str, rating: int, comment: str = "") -> None:
         rating = max(1, min(5, rating))
         async with self._lock:
-            self.feedback_store.append(
-                FeedbackEntry(user_id, FeedbackType.RATING, comment, rating=rating)
-            )
+            self._append(FeedbackEntry(user_id, FeedbackType.RATING, comment, rating=rating))
         self.logger.debug("Rating submitted for %s", user_id)
 
     async def submit_text_feedback(self, user_id: str, content: str) -> None:
         async with self._lock:
-            self.feedback_store.append(
-                FeedbackEntry(user_id, FeedbackType.TEXT, content)
-            )
+            self._append(FeedbackEntry(user_id, FeedbackType.TEXT, content))
         self.logger.debug("Text feedback submitted for %s", user_id)
 
     async def submit_issue_report(self, user_id: str, content: Dict[str, Any]) -> None:
         async with self._lock:
-            self.feedback_store.append(
-                FeedbackEntry(user_id, FeedbackType.ISSUE, content)
-            )
+            self._append(FeedbackEntry(user_id, FeedbackType.ISSUE, content))
         self.logger.debug("Issue reported by %s", user_id)
 
-    def get_user_satisfaction_score(self, user_id: str) -> float:
-        ratings = [fb.rating for fb in self.feedback_store if fb.user_id == user_id and fb.rating]
+    def stats(self) -> Dict[str, int]:
+        return per_user_stats(self._entries_by_user)
+
+    def user_footprint(self, user_id: str) -> int:
+        return approx_size(self._entries_by_user[user_id]) if user_id in self._entries_by_user else 0
+
+    async def export_user(self, user_id: str) -> List[FeedbackEntry]:
+        async with self._lock:
+            return list(self._entries_by_user.get(user_id, ()))
+
+    async def import_user(self, user_id: str, entries: List[FeedbackEntry]) -> None:
+        async with self._lock:
+            for entry in entries:
+                self._append(entry)
+
+    def user_ids(self) -> List[str]:
+        return list(self._entries_by_user)
+
+    async def export_users(self, user_ids: Iterable[str]) -> Dict[str, List[FeedbackEntry]]:
+        async with self._lock:
+            return {
+                user_id: list(self._entries_by_user[user_id])
+                for user_id in user_ids
+                if user_id in self._entries_by_user
+            }
+
+    async def import_users(self, entries: Dict[str, List[Any]]) -> None:
+        """Restore many users at once; entries may be dicts read from an export.
+
+        Entries the user already has are skipped, so a retried or resumed
+        import does not duplicate them.
+        """
+
+        async with self._lock:
+            for user_id, imported in entries.items():
+                present = {entry.key() for entry in self._entries_by_user.get(user_id, ())}
+                for entry in imported:
+                    if not isinstance(entry, FeedbackEntry):
+                        entry = FeedbackEntry(
+                            user_id,
+                            FeedbackType(entry["feedback_type"]),
+                            entry.get("content"),
+                            rating=entry.get("rating"),
+                            timestamp=entry.get("timestamp", ""),
+                        )
+                    if entry.key() not in present:
+                        self._append(entry)
+
+    async def evict_user(self, user_id: str) -> None:
+        async with self._lock:
+            self._entries_by_user.pop(user_id, None)
+
+    async def get_user_satisfaction_score(self, user_id: str) -> float:
+        ratings = [fb.rating for fb in self._entries_by_user.get(user_id, ()) if fb.rating]
         if not ratings:
             return 0.0
         return round(mean(ratings), 2)
 
     async def generate_feedback_report(self) -> Dict[str, Any]:
         async with self._lock:
-            total = len(self.feedback_store)
-            ratings = [fb.rating for fb in self.feedback_store if fb.rating]
+            entries = self.feedback_store
+            total = len(entries)
+            ratings = [fb.rating for fb in entries if fb.rating]
             avg_rating = round(mean(ratings), 2) if ratings else 0.0
 
         return {
@@ -85,7 +149,7 @@ class FeedbackIntegration:
         self.processor = processor
 
     async def get_personalized_feedback_request(self, user_id: str) -> str:
-        score = self.processor.get_user_satisfaction_score(user_id)
+        score = await self.processor.get_user_satisfaction_score(user_id)
         if score == 0:
             return "How has your experience been so far?"
         if score >= 4:
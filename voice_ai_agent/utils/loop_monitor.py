@@ -0,0 +1,188 @@
+"""Event-loop lag monitoring with blocking-call attribution."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .structured_logging import ThrottledLogger
+
+_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class EventLoopMonitor:
+    """Measures how late the event loop runs a periodic heartbeat.
+
+    A watchdog thread notices when the heartbeat is overdue by more than
+    ``threshold`` seconds and captures the loop thread's stack while it is
+    still blocked. The stall is attributed to the pipeline stage that the
+    running task declared through :meth:`stage`, and to the innermost frame
+    of the captured stack.
+    """
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, max_offenders: int = 20) -> None:
+        # Stalls are aggregated in report(); the log only needs a sample of them.
+        self.logger = ThrottledLogger(logging.getLogger(self.__class__.__name__), per_second=1, burst=5)
+        self._interval = interval
+        self._threshold = threshold
+        self._max_offenders = max_offenders
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_beat = time.perf_counter()
+        # (beat timestamp, stage, location, formatted stack) of the current stall
+        self._pending: Optional[Tuple[float, str, str, List[str]]] = None
+        self._task_stages: Dict[asyncio.Task, str] = {}
+        self._histogram = [0] * (len(_BUCKETS_MS) + 1)
+        self._samples = 0
+        self._max_lag = 0.0
+        self._recent_lag = 0.0
+        self._offenders: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat_task is not None and not self._heartbeat_task.done()
+
+    @property
+    def recent_lag(self) -> float:
+        """Smoothed lag in seconds, including a stall still in progress."""
+
+        if not self.running:
+            return 0.0
+        overdue = time.perf_counter() - self._last_beat - self._interval
+        return max(self._recent_lag, overdue)
+
+    def start(self) -> None:
+        """Start monitoring the running event loop; a no-op when already running."""
+
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self._heartbeat_task = self._loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Attribute blocking time inside the block to ``name`` for this task."""
+
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is None:
+            yield
+            return
+        previous = self._task_stages.get(task)
+        self._task_stages[task] = name
+        try:
+            yield
+        finally:
+            if previous is None:
+                self._task_stages.pop(task, None)
+            else:
+                self._task_stages[task] = previous
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.perf_counter() + self._interval
+            await asyncio.sleep(self._interval)
+            now = time.perf_counter()
+            self._record(max(0.0, now - expected), self._last_beat)
+            self._last_beat = now
+
+    def _record(self, lag: float, beat: float) -> None:
+        lag_ms = lag * 1000
+        self._samples += 1
+        self._max_lag = max(self._max_lag, lag)
+        self._recent_lag = 0.9 * self._recent_lag + 0.1 * lag
+        for index, bound in enumerate(_BUCKETS_MS):
+            if lag_ms <= bound:
+                self._histogram[index] += 1
+                break
+        else:
+            self._histogram[-1] += 1
+
+        if lag < self._threshold:
+            return
+        pending = self._pending
+        if pending is not None and pending[0] == beat:
+            _, stage, location, stack = pending
+        else:
+            stage, location, stack = "unattributed", "stall ended before capture", []
+        self._pending = None
+
+        offender = self._offenders.get((stage, location))
+        if offender is None:
+            if len(self._offenders) >= self._max_offenders:
+                # Keep the table bounded by evicting the smallest contributor.
+                smallest = min(self._offenders, key=lambda key: self._offenders[key]["total_ms"])
+                del self._offenders[smallest]
+            offender = self._offenders[(stage, location)] = {
+                "stage": stage,
+                "location": location,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "stack": stack,
+            }
+        offender["count"] += 1
+        offender["total_ms"] += lag_ms
+        offender["max_ms"] = max(offender["max_ms"], lag_ms)
+        self.logger.warning("Event loop blocked for %.1f ms in stage %s at %s", lag_ms, stage, location)
+
+    def _watch(self) -> None:
+        poll = max(0.005, self._threshold / 2)
+        while not self._stop.wait(poll):
+            beat = self._last_beat
+            if time.perf_counter() - beat < self._interval + self._threshold:
+                continue
+            pending = self._pending
+            if pending is not None and pending[0] == beat:
+                continue  # this stall has already been captured
+            self._capture(beat)
+
+    def _capture(self, beat: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)  # noqa: SLF001 - sampling API
+        if frame is None:
+            return
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        stage = self._task_stages.get(task, "unattributed") if task else "loop callback"
+        summary = traceback.extract_stack(frame, limit=12)
+        innermost = summary[-1] if summary else None
+        location = f"{innermost.filename}:{innermost.lineno} in {innermost.name}" if innermost else "unknown"
+        self._pending = (beat, stage, location, traceback.format_list(summary))
+
+    def report(self) -> Dict[str, Any]:
+        labels = [f"<={bound}" for bound in _BUCKETS_MS] + [f">{_BUCKETS_MS[-1]}"]
+        offenders = sorted(self._offenders.values(), key=lambda item: item["total_ms"], reverse=True)
+        return {
+            "running": self.running,
+            "samples": self._samples,
+            "max_lag_ms": round(self._max_lag * 1000, 2),
+            "lag_histogram_ms": dict(zip(labels, self._histogram)),
+            "top_offenders": [
+                {**item, "total_ms": round(item["total_ms"], 2), "max_ms": round(item["max_ms"], 2)}
+                for item in offenders
+            ],
+        }
@@ -0,0 +1,231 @@
+"""Per-user memory budget with spill-to-disk for cold users."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .metrics import REGISTRY
+
+_EVICTIONS = REGISTRY.counter("voice_agent_memory_evictions_total", "Users spilled to disk under memory pressure.")
+_RELOADS = REGISTRY.counter("voice_agent_memory_reloads_total", "Spilled users reloaded on their next turn.")
+_SPILLED_USERS = REGISTRY.gauge("voice_agent_memory_spilled_users", "Users whose state currently lives on disk.")
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Current resident set size, or None where ``/proc`` is unavailable."""
+
+    try:
+        with open("/proc/self/statm", "rb") as handle:
+            pages = int(handle.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class MemoryManager:
+    """Keeps process memory under a budget by spilling the coldest users.
+
+    Every store passed in exposes ``user_footprint``, ``export_user``,
+    ``import_user`` and ``evict_user``. Callers mark a user as active with
+    :meth:`activate` at the start of each turn; a spilled user is reloaded
+    there before the turn touches any store, so eviction is invisible apart
+    from the reload latency. Only users idle for ``idle_after`` seconds are
+    eligible for eviction.
+    """
+
+    def __init__(
+        self,
+        stores: Dict[str, Any],
+        budget_bytes: Optional[int] = None,
+        spill_dir: str | os.PathLike[str] | None = None,
+        idle_after: float = 300.0,
+        check_interval: float = 30.0,
+        max_evictions: int = 100,
+        low_watermark: float = 0.9,
+    ) -> None:
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._stores = stores
+        self.budget_bytes = budget_bytes
+        self._spill_dir = Path(spill_dir) if spill_dir else None
+        self.idle_after = idle_after
+        self.check_interval = check_interval
+        self.max_evictions = max_evictions
+        self.low_watermark = low_watermark
+        # Least recently active users first.
+        self._last_seen: "OrderedDict[str, float]" = OrderedDict()
+        self._spilled: Dict[str, Path] = {}
+        self._evicting: Set[str] = set()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, stores: Dict[str, Any]) -> "MemoryManager":
+        budget = os.getenv("AGENT_MEMORY_BUDGET_MB")
+        return cls(
+            stores,
+            budget_bytes=int(float(budget) * 1024 * 1024) if budget else None,
+            spill_dir=os.getenv("AGENT_SPILL_DIR") or None,
+            idle_after=float(os.getenv("AGENT_EVICT_IDLE_SECONDS", "300")),
+        )
+
+    @property
+    def spill_dir(self) -> Path:
+        if self._spill_dir is None:
+            self._spill_dir = Path(tempfile.mkdtemp(prefix="voice-agent-spill-"))
+        return self._spill_dir
+
+    async def activate(self, user_id: str) -> None:
+        """Mark ``user_id`` as active and reload its state if it was spilled."""
+
+        self._last_seen[user_id] = time.monotonic()
+        self._last_seen.move_to_end(user_id)
+        self._ensure_running()
+        if user_id in self._spilled or user_id in self._evicting:
+            async with self._lock:
+                await self._reload(user_id)
+
+    def adopt(self, user_ids: Iterable[str]) -> None:
+        """Track users loaded in bulk as the coldest ones, so they can be spilled."""
+
+        for user_id in user_ids:
+            if user_id not in self._last_seen:
+                self._last_seen[user_id] = 0.0
+                self._last_seen.move_to_end(user_id, last=False)
+        self._ensure_running()
+
+    def spilled_users(self) -> List[str]:
+        return list(self._spilled)
+
+    async def read_spilled(self, user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Spilled state of ``user_ids`` keyed by store, without reloading it."""
+
+        paths = {user_id: self._spilled[user_id] for user_id in user_ids if user_id in self._spilled}
+        if not paths:
+            return {}
+
+        def _read() -> Dict[str, Dict[str, Any]]:
+            states = {}
+            for user_id, path in paths.items():
+                try:
+                    states[user_id] = pickle.loads(path.read_bytes())
+                except (OSError, pickle.UnpicklingError) as exc:
+                    # Reloaded (and deleted) since, or unreadable.
+                    self.logger.debug("Skipping spilled state of %s: %s", user_id, exc)
+            return states
+
+        return await asyncio.to_thread(_read)
+
+    def footprint(self, user_id: str) -> int:
+        """Approximate bytes held for ``user_id`` across all stores."""
+
+        return sum(store.user_footprint(user_id) for store in self._stores.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "resident_users": len(self._last_seen),
+            "spilled_users": len(self._spilled),
+            "rss_bytes": process_rss_bytes(),
+            "budget_bytes": self.budget_bytes,
+            "evictions": int(_EVICTIONS.value()),
+            "reloads": int(_RELOADS.value()),
+        }
+
+    def _ensure_running(self) -> None:
+        if self.budget_bytes is None or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.enforce_budget()
+            except Exception as exc:
+                self.logger.warning("Memory budget check failed: %s", exc)
+
+    async def enforce_budget(self) -> int:
+        """Spill idle users, coldest first, until RSS is back under the budget.
+
+        Freed memory is estimated from the users' footprints because the
+        allocator rarely returns pages to the OS immediately. Returns the
+        number of users evicted.
+        """
+
+        rss = process_rss_bytes()
+        if self.budget_bytes is None or rss is None or rss <= self.budget_bytes:
+            return 0
+        excess = rss - int(self.budget_bytes * self.low_watermark)
+        cutoff = time.monotonic() - self.idle_after
+        evicted = 0
+        for user_id, seen in list(self._last_seen.items()):
+            if excess <= 0 or evicted >= self.max_evictions or seen > cutoff:
+                break
+            freed = await self.evict(user_id, idle_since=cutoff)
+            if freed:
+                excess -= freed
+                evicted += 1
+        if evicted:
+            self.logger.info("Spilled %d idle users to disk (rss %.1f MiB)", evicted, rss / 1048576)
+        return evicted
+
+    async def evict(self, user_id: str, idle_since: Optional[float] = None) -> int:
+        """Spill one user's state to disk and drop it from memory.
+
+        With ``idle_since`` the user is skipped if it became active after that
+        monotonic timestamp. Returns the approximate number of bytes freed.
+        """
+
+        self._evicting.add(user_id)
+        try:
+            async with self._lock:
+                if idle_since is not None and self._last_seen.get(user_id, idle_since) > idle_since:
+                    return 0
+                freed = self.footprint(user_id)
+                state = {}
+                for name, store in self._stores.items():
+                    exported = await store.export_user(user_id)
+                    if exported:
+                        state[name] = exported
+                self._last_seen.pop(user_id, None)
+                if not state:
+                    return 0
+                path = self.spill_dir / f"{hashlib.sha1(user_id.encode('utf-8')).hexdigest()}.pkl"
+                await asyncio.to_thread(path.write_bytes, pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+                for store in self._stores.values():
+                    await store.evict_user(user_id)
+                self._spilled[user_id] = path
+        finally:
+            self._evicting.discard(user_id)
+        _EVICTIONS.inc()
+        _SPILLED_USERS.set(len(self._spilled))
+        return freed
+
+    async def _reload(self, user_id: str) -> None:
+        path = self._spilled.pop(user_id, None)
+        if path is None:
+            return
+        try:
+            state = pickle.loads(await asyncio.to_thread(path.read_bytes))
+        except (OSError, pickle.UnpicklingError) as exc:
+            self.logger.error("Could not reload spilled state for %s: %s", user_id, exc)
+            self._spilled[user_id] = path
+            return
+        for name, exported in state.items():
+            await self._stores[name].import_user(user_id, exported)
+        path.unlink(missing_ok=True)
+        _RELOADS.inc()
+        _SPILLED_USERS.set(len(self._spilled))
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,331 @@
+"""Prometheus-compatible in-process metrics and a tiny HTTP exporter.
+
+Recording a sample only touches plain Python containers and never awaits or
+takes a lock, so instrumenting a hot path costs a dictionary update. The
+exporter renders the current values from its own thread on each scrape.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import sys
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Sized, Tuple
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(zip(names, values)) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Sequence[str]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(value) for value in labels)
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in list(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1][0] += value
+
+    def snapshot(self, *labels: str) -> Dict[str, Any]:
+        counts, total = self._values.get(self._key(labels), ([0] * (len(self.buckets) + 1), [0.0]))
+        return {"buckets": dict(zip(self.buckets + (math.inf,), counts)), "count": sum(counts), "sum": total[0]}
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in list(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), list(counts)):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, {"le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and scrape-time collectors and renders them as text."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+        self._create_lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, *args: Any, **kwargs: Any) -> Any:
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._create_lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(name, *args, **kwargs)
+        if not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} already registered as {metric.kind}")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def register_collector(self, collector: Collector) -> None:
+        """Add a callback yielding ``(name, kind, help, samples)`` at scrape time."""
+
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        for collector in list(self._collectors):
+            try:
+                families = list(collector())
+            except Exception as exc:  # pragma: no cover - never fail a scrape
+                logger.warning("Metrics collector failed: %s", exc)
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for sample_name, labels, value in samples:
+                    rendered = _format_labels(list(labels), list(labels.values()))
+                    lines.append(f"{sample_name}{rendered} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def approx_size(container: Any) -> int:
+    """Approximate bytes held by one per-user container.
+
+    Uses the same single-sample extrapolation as :func:`per_user_stats`.
+    """
+
+    size = sys.getsizeof(container)
+    if isinstance(container, (str, bytes)) or not isinstance(container, Sized) or not container:
+        return size
+    sample = next(iter(container.values() if isinstance(container, dict) else container))
+    sample_size = sys.getsizeof(sample)
+    if isinstance(sample, dict):
+        sample_size += sum(sys.getsizeof(value) for value in sample.values())
+    return size + len(container) * sample_size
+
+
+def per_user_stats(store: Mapping[str, Any]) -> Dict[str, int]:
+    """Return user/entry counts and an approximate byte size of a per-user store.
+
+    The byte estimate covers the mapping and per-user containers and
+    extrapolates entry size from a single sampled entry, so it stays
+    O(users) rather than O(entries).
+    """
+
+    users = list(store.values())
+    entries = 0
+    size = sys.getsizeof(store)
+    sample = None
+    for container in users:
+        size += sys.getsizeof(container)
+        if isinstance(container, (str, bytes)) or not isinstance(container, Sized):
+            entries += 1
+            continue
+        entries += len(container)
+        if sample is None and container:
+            sample = next(iter(container.values() if isinstance(container, dict) else container))
+    if sample is not None:
+        sample_size = sys.getsizeof(sample)
+        if isinstance(sample, dict):
+            sample_size += sum(sys.getsizeof(value) for value in sample.values())
+        size += entries * sample_size
+    return {"users": len(users), "entries": entries, "approx_bytes": size}
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server API
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - http.server API
+        return
+
+
+class MetricsServer:
+    """Serves ``/metrics`` from a daemon thread, off the agent's event loop."""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, host: str = "0.0.0.0", port: int = 9464) -> None:
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    def start(self, port_attempts: int = 1) -> int:
+        """Bind the first free port in ``[port, port + port_attempts)`` and serve."""
+
+        if self._server is not None:
+            return self.port
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": self.registry})
+        last_error: Optional[OSError] = None
+        for offset in range(max(1, port_attempts)):
+            try:
+                self._server = ThreadingHTTPServer((self.host, self.port + offset), handler)
+            except OSError as exc:
+                last_error = exc
+                continue
+            self.port += offset
+            break
+        if self._server is None:
+            raise last_error or OSError("No free metrics port")
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+        logger.info("Metrics endpoint listening on %s:%s", self.host, self.port)
+        return self.port
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+_process_server: Optional[MetricsServer] = None
+_process_server_pid: Optional[int] = None
+
+
+def start_metrics_server_from_env() -> Optional[MetricsServer]:
+    """Start one exporter per process when ``AGENT_METRICS_PORT`` is set.
+
+    LiveKit may run several job processes per node, so each process takes
+    the next free port within ``AGENT_METRICS_PORT_RANGE`` (default 16).
+    The parent worker starts first and exports the node's shared stores.
+    """
+
+    global _process_server, _process_server_pid
+    # A forked job process inherits the object but not the serving thread.
+    if _process_server is not None and _process_server_pid == os.getpid():
+        return _process_server
+    port = os.getenv("AGENT_METRICS_PORT")
+    if not port:
+        return None
+    server = MetricsServer(host=os.getenv("AGENT_METRICS_HOST", "0.0.0.0"), port=int(port))
+    try:
+        server.start(port_attempts=int(os.getenv("AGENT_METRICS_PORT_RANGE", "16")))
+    except OSError as exc:
+        logger.warning("Could not start metrics endpoint: %s", exc)
+        return None
+    _process_server = server
+    _process_server_pid = os.getpid()
+    return server
@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 import re
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
 
 
 @dataclass
@@ -23,8 +24,28 @@ class NLUProcessor:
         "status": ["status", "state", "update"],
     }
 
-    def __init__(self) -> None:
+    def __init__(self, cache_size: int = 1024) -> None:
         self._word_pattern = re.compile(r"[\w']+")
+        self._cache: "OrderedDict[str, Dict[str, object]]" = OrderedDict()
+        self._cache_size = cache_size
+
+    def cached(self, text: str) -> Optional[Dict[str, object]]:
+        """Analysis of ``text`` from an earlier call, if still cached."""
+        result = self._cache.get(text)
+        if result is not None:
+            self._cache.move_to_end(text)
+        return result
+
+    def export_cache(self) -> List[Tuple[str, Dict[str, object]]]:
+        return list(self._cache.items())
+
+    def import_cache(self, entries: Iterable[Tuple[str, Dict[str, object]]]) -> None:
+        """Add older ``entries`` behind the current cache contents."""
+        merged: "OrderedDict[str, Dict[str, object]]" = OrderedDict(entries)
+        merged.update(self._cache)
+        while len(merged) > self._cache_size:
+            merged.popitem(last=False)
+        self._cache = merged
 
     async def process_query(self, text: str) -> Dict[str, object]:
         tokens = [token.lower() for token in self._word_pattern.findall(text)]
@@ -39,8 +60,12 @@ class NLUProcessor:
         if "pm" in tokens or "am" in tokens:
             entities["time"] = "soon"
 
-        return {
+        result: Dict[str, object] = {
             "intent": intent,
             "keywords": keywords,
             "entities": entities,
         }
+        self._cache[text] = result
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return result
@@ -0,0 +1,102 @@
+"""On-demand statistical sampling profiler for worker processes."""
+
+from __future__ import annotations
+
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """Samples the stacks of every thread for a bounded amount of time.
+
+    Nothing runs until :meth:`start` is called; a profiling run uses one
+    daemon thread that wakes every ``interval`` seconds, reads
+    ``sys._current_frames()`` and aggregates collapsed stacks. The result
+    is written in the ``frame;frame;frame count`` format understood by
+    flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, output_dir: str | os.PathLike[str] | None = None, interval: float = 0.005) -> None:
+        self.output_dir = Path(output_dir or os.getenv("AGENT_PROFILE_DIR", "profiles"))
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.last_output: Optional[Path] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float) -> bool:
+        """Profile for ``duration`` seconds; returns False if already running."""
+
+        with self._lock:
+            if self.running:
+                return False
+            self._thread = threading.Thread(
+                target=self._run, args=(max(0.1, duration),), name="sampling-profiler", daemon=True
+            )
+            self._thread.start()
+        logger.info("Sampling profiler started for %.1f s", duration)
+        return True
+
+    def _run(self, duration: float) -> None:
+        stacks: Counter[str] = Counter()
+        names = {}
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + duration
+        samples = 0
+        while time.monotonic() < deadline:
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():  # noqa: SLF001 - sampling API
+                if thread_id == own_id:
+                    continue
+                parts = []
+                while frame is not None:
+                    code = frame.f_code
+                    parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                parts.append(names.get(thread_id, f"thread-{thread_id}"))
+                stacks[";".join(reversed(parts))] += 1
+            samples += 1
+            time.sleep(self.interval)
+        self._write(stacks, samples)
+
+    def _write(self, stacks: Counter[str], samples: int) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = self.output_dir / f"profile-{os.getpid()}-{stamp}.collapsed"
+        with path.open("w", encoding="utf-8") as handle:
+            for stack, count in stacks.most_common():
+                handle.write(f"{stack} {count}\n")
+        self.last_output = path
+        logger.info("Sampling profiler wrote %d samples to %s", samples, path)
+
+    def install_signal_handler(self, signum: int = getattr(signal, "SIGUSR2", 0), duration: float = 30.0) -> bool:
+        """Start a ``duration`` second profile whenever ``signum`` is received.
+
+        Signal handlers can only be installed from the main thread; returns
+        False when that is not possible on this platform or thread.
+        """
+
+        if not signum:
+            return False
+        try:
+            signal.signal(signum, lambda *_: self.start(duration))
+        except ValueError:
+            return False
+        return True
+
+
+PROFILER = SamplingProfiler()
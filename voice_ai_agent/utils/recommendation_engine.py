@@ -3,9 +3,11 @@
 from __future__ import annotations
 
 import asyncio
-from collections import defaultdict
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Deque, Dict, Iterable, List, Tuple
+
+from .metrics import REGISTRY, approx_size, per_user_stats
 
 
 @dataclass
@@ -13,37 +15,151 @@ class Recommendation:
     content: str
 
 
+# Rules keyed on a stored preference: (preference, expected value, suggestion).
+_PREFERENCE_RULES: Tuple[Tuple[str, Any, str], ...] = (
+    ("focus", "productivity", "Block 25 minutes for focused work."),
+)
+
+# Rules triggered by the current turn: (lower-case keyword, suggestion).
+_CONTEXT_RULES: Tuple[Tuple[str, str], ...] = (
+    ("call", "Prepare a quick agenda for your call."),
+)
+
+_DEFAULT_SUGGESTION = "Review your daily dashboard for new insights."
+
+_CACHE_REQUESTS = REGISTRY.counter(
+    "voice_agent_cache_requests_total", "Cache lookups by cache and result.", ("cache", "result")
+)
+
+
 class RecommendationEngine:
     """Generate task suggestions and personalised hints."""
 
-    def __init__(self) -> None:
-        self._preferences: Dict[str, Dict[str, Any]] = defaultdict(dict)
-        self._history: Dict[str, List[str]] = defaultdict(list)
+    def __init__(self, history_limit: int = 50) -> None:
+        self._preferences: Dict[str, Dict[str, Any]] = {}
+        self._history: Dict[str, Deque[str]] = {}
+        # Preference-driven suggestions compiled whenever preferences change so
+        # the per-turn work is a lookup plus the context keyword check.
+        self._candidates: Dict[str, Tuple[str, ...]] = {}
+        self._history_limit = history_limit
         self._lock = asyncio.Lock()
 
+    @staticmethod
+    def _compile_candidates(prefs: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(
+            suggestion
+            for key, expected, suggestion in _PREFERENCE_RULES
+            if prefs.get(key) == expected
+        )
+
     async def generate_recommendations(self, user_id: str, context: str = "") -> List[Recommendation]:
-        async with self._lock:
-            prefs = self._preferences[user_id]
-            history = self._history[user_id]
+        """Suggestions for ``user_id``; nothing is recorded until :meth:`record_history`.
 
-            suggestions = []
-            if prefs.get("focus") == "productivity":
-                suggestions.append("Block 25 minutes for focused work.")
-            if "call" in context.lower():
-                suggestions.append("Prepare a quick agenda for your call.")
-            if not suggestions:
-                suggestions.append("Review your daily dashboard for new insights.")
+        Suggestions may be computed ahead of time and never shown, so only
+        the caller knows which of them reached the user.
+        """
 
-            history.extend(suggestions)
+        lowered = context.lower()
+        async with self._lock:
+            candidates = self._candidates.get(user_id)
+            _CACHE_REQUESTS.inc("recommendation_candidates", "miss" if candidates is None else "hit")
+            suggestions = list(candidates or ())
+            suggestions.extend(
+                suggestion for keyword, suggestion in _CONTEXT_RULES if keyword in lowered
+            )
+            if not suggestions:
+                suggestions.append(_DEFAULT_SUGGESTION)
 
         return [Recommendation(content=s) for s in suggestions]
 
+    async def record_history(self, user_id: str, suggestions: Iterable[str]) -> None:
+        """Remember suggestions that were delivered to ``user_id``."""
+
+        async with self._lock:
+            history = self._history.get(user_id)
+            if history is None:
+                history = self._history[user_id] = deque(maxlen=self._history_limit)
+            history.extend(suggestions)
+
     async def update_user_preferences(self, user_id: str, preferences: Dict[str, Any]) -> None:
         async with self._lock:
-            self._preferences[user_id].update(preferences)
+            prefs = self._preferences.setdefault(user_id, {})
+            prefs.update(preferences)
+            self._candidates[user_id] = self._compile_candidates(prefs)
+
+    def stats(self) -> Dict[str, int]:
+        stats = per_user_stats(self._history)
+        stats["users"] = max(stats["users"], len(self._preferences))
+        return stats
+
+    def user_footprint(self, user_id: str) -> int:
+        return approx_size(self._preferences.get(user_id, {})) + approx_size(self._history.get(user_id, ()))
+
+    async def export_user(self, user_id: str) -> Dict[str, Any]:
+        async with self._lock:
+            return {
+                "preferences": dict(self._preferences.get(user_id, {})),
+                "history": list(self._history.get(user_id, ())),
+            }
+
+    async def import_user(self, user_id: str, state: Dict[str, Any]) -> None:
+        async with self._lock:
+            self._merge_user(user_id, state)
+
+    def _merge_user(self, user_id: str, state: Dict[str, Any]) -> None:
+        prefs = {**state.get("preferences", {}), **self._preferences.get(user_id, {})}
+        if prefs:
+            self._preferences[user_id] = prefs
+            self._candidates[user_id] = self._compile_candidates(prefs)
+        current = self._history.get(user_id, ())
+        # Suggestions the user already has are not imported again, so a
+        # repeated import leaves the history as it is.
+        present = set(current)
+        history = deque(
+            (item for item in state.get("history", ()) if item not in present), maxlen=self._history_limit
+        )
+        history.extend(current)
+        if history:
+            self._history[user_id] = history
+
+    def user_ids(self) -> List[str]:
+        return list(self._preferences.keys() | self._history.keys())
+
+    async def export_users(self, user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        async with self._lock:
+            exported = {}
+            for user_id in user_ids:
+                prefs = self._preferences.get(user_id)
+                history = self._history.get(user_id)
+                if prefs or history:
+                    exported[user_id] = {"preferences": dict(prefs or {}), "history": list(history or ())}
+            return exported
+
+    async def import_users(self, states: Dict[str, Dict[str, Any]]) -> None:
+        async with self._lock:
+            for user_id, state in states.items():
+                self._merge_user(user_id, state)
+
+    async def export_preferences(self) -> Dict[str, Dict[str, Any]]:
+        async with self._lock:
+            return {user_id: dict(prefs) for user_id, prefs in self._preferences.items()}
+
+    async def import_preferences(self, preferences: Dict[str, Dict[str, Any]]) -> None:
+        """Merge preferences of many users; current values take precedence."""
+        async with self._lock:
+            for user_id, stored in preferences.items():
+                prefs = {**stored, **self._preferences.get(user_id, {})}
+                self._preferences[user_id] = prefs
+                self._candidates[user_id] = self._compile_candidates(prefs)
+
+    async def evict_user(self, user_id: str) -> None:
+        async with self._lock:
+            self._preferences.pop(user_id, None)
+            self._history.pop(user_id, None)
+            self._candidates.pop(user_id, None)
 
     async def personalization_summary(self, user_id: str) -> Dict[str, Any]:
         async with self._lock:
-            prefs = dict(self._preferences[user_id])
-            history = list(self._history[user_id][-5:])
+            prefs = dict(self._preferences.get(user_id, {}))
+            history = list(self._history.get(user_id, ()))[-5:]
         return {"preferences": prefs, "recent_suggestions": history}
@@ -4,7 +4,13 @@ from __future__ import annotations
 
 import asyncio
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List
+
+from .metrics import approx_size, per_user_stats
+
+
+def _entry_key(event: Dict[str, Any]) -> tuple:
+    return event["title"], event["time"]
 
 
 class Scheduler:
@@ -21,6 +27,42 @@ class Scheduler:
                 "time": when.isoformat(),
             })
 
+    def stats(self) -> Dict[str, int]:
+        return per_user_stats(self._events)
+
+    def user_footprint(self, user_id: str) -> int:
+        return approx_size(self._events.get(user_id, ()))
+
+    async def export_user(self, user_id: str) -> List[Dict[str, Any]]:
+        async with self._lock:
+            return list(self._events.get(user_id, ()))
+
+    async def import_user(self, user_id: str, events: List[Dict[str, Any]]) -> None:
+        async with self._lock:
+            self._events[user_id] = list(events) + self._events.get(user_id, [])
+
+    def user_ids(self) -> List[str]:
+        return list(self._events)
+
+    async def export_users(self, user_ids: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        async with self._lock:
+            return {user_id: list(self._events[user_id]) for user_id in user_ids if self._events.get(user_id)}
+
+    async def import_users(self, events: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Restore many users at once; events a user already has are skipped."""
+
+        async with self._lock:
+            for user_id, imported in events.items():
+                current = self._events.get(user_id, [])
+                present = {_entry_key(entry) for entry in current}
+                self._events[user_id] = [
+                    entry for entry in imported if _entry_key(entry) not in present
+                ] + current
+
+    async def evict_user(self, user_id: str) -> None:
+        async with self._lock:
+            self._events.pop(user_id, None)
+
     async def get_event_summary(self, user_id: str) -> Dict[str, Any]:
         async with self._lock:
             events = list(self._events.get(user_id, []))
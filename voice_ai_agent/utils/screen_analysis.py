@@ -0,0 +1,209 @@
+"""Process-pool analysis stage for screen observations."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+# Analyzers run inside worker processes, so they must be picklable module-level
+# functions. They receive a read-only view of the frame and its metadata and
+# must not keep a reference to the view after returning.
+Analyzer = Callable[[memoryview, Dict[str, Any]], Dict[str, Any]]
+ResultListener = Callable[[str, Dict[str, Any], Dict[str, Any]], Awaitable[None]]
+
+_LATENCY_WINDOW = 256
+
+# SharedMemory(track=False) is new in Python 3.13.
+_ATTACH_UNTRACKED = sys.version_info >= (3, 13)
+
+
+def _run_analyzer(
+    analyzer: Analyzer, segment: str, size: int, metadata: Dict[str, Any]
+) -> Tuple[Dict[str, Any], float]:
+    """Worker entry point: attach to the shared frame and run one analyzer."""
+
+    # The stage owns and unlinks the segment. Workers are started by the
+    # forkserver and share its resource tracker, where attaching re-registers
+    # the same name and is harmless; unregistering here would drop the
+    # stage's own registration. Skip tracking altogether where supported.
+    if _ATTACH_UNTRACKED:
+        shm = shared_memory.SharedMemory(name=segment, track=False)
+    else:
+        shm = shared_memory.SharedMemory(name=segment)
+    try:
+        view = shm.buf[:size].toreadonly()
+        try:
+            start = time.perf_counter()
+            result = analyzer(view, metadata)
+            return result, time.perf_counter() - start
+        finally:
+            view.release()
+    finally:
+        shm.close()
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ScreenAnalysisStage:
+    """Runs registered CPU-heavy analyzers off the event loop.
+
+    Frames are copied once into a shared-memory segment which every analyzer
+    worker attaches to, instead of pickling the frame for each call. Pending
+    frames wait in a bounded queue that discards the oldest frame when full,
+    so a slow analyzer only ever works on recent screen state.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, queue_size: int = 4) -> None:
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._max_workers = max_workers
+        self._analyzers: Dict[str, Analyzer] = {}
+        self._listeners: List[ResultListener] = []
+        self._queue: Deque[Tuple[bytes | bytearray | memoryview, Dict[str, Any]]] = deque(
+            maxlen=queue_size
+        )
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._compute: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self.dropped_frames = 0
+
+    def register_analyzer(self, name: str, analyzer: Analyzer) -> None:
+        self._analyzers[name] = analyzer
+        self._latencies[name] = deque(maxlen=_LATENCY_WINDOW)
+        self._compute[name] = deque(maxlen=_LATENCY_WINDOW)
+        self._counts[name] = 0
+        self._errors[name] = 0
+
+    def add_result_listener(self, listener: ResultListener) -> None:
+        self._listeners.append(listener)
+
+    def submit(self, frame: bytes | bytearray | memoryview, metadata: Dict[str, Any]) -> bool:
+        """Queue a frame for analysis without blocking the caller."""
+
+        if not self._analyzers or not len(frame):
+            return False
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped_frames += 1
+        self._queue.append((frame, metadata))
+
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.create_task(self._drain())
+        self._wakeup.set()
+        return True
+
+    async def _drain(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            frame, metadata = self._queue.popleft()
+            try:
+                await self._analyze(frame, metadata)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # pragma: no cover - defensive logging
+                self.logger.warning("Screen analysis failed: %s", exc)
+
+    async def _analyze(self, frame: bytes | bytearray | memoryview, metadata: Dict[str, Any]) -> None:
+        if self._executor is None:
+            # Forking a process that runs threads (LiveKit, logging, metrics)
+            # can copy a held lock into the worker, so start workers fresh.
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers, mp_context=multiprocessing.get_context(method)
+            )
+
+        size = len(frame)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            shm.buf[:size] = memoryview(frame).cast("B")
+            loop = asyncio.get_running_loop()
+            names = list(self._analyzers)
+            started = time.perf_counter()
+            outcomes = await asyncio.gather(
+                *(
+                    self._timed(
+                        loop.run_in_executor(
+                            self._executor,
+                            _run_analyzer,
+                            self._analyzers[name],
+                            shm.name,
+                            size,
+                            metadata,
+                        ),
+                        started,
+                    )
+                    for name in names
+                ),
+                return_exceptions=True,
+            )
+        finally:
+            shm.close()
+            shm.unlink()
+
+        for name, outcome in zip(names, outcomes):
+            self._counts[name] += 1
+            if isinstance(outcome, BaseException):
+                self._errors[name] += 1
+                self.logger.warning("Analyzer %s failed: %s", name, outcome)
+                continue
+            (result, compute_seconds), latency = outcome
+            self._latencies[name].append(latency)
+            self._compute[name].append(compute_seconds)
+            for listener in self._listeners:
+                await listener(name, metadata, result)
+
+    @staticmethod
+    async def _timed(future: Awaitable[Tuple[Dict[str, Any], float]], started: float):
+        result = await future
+        return result, time.perf_counter() - started
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return queue state and per-analyzer latency figures in milliseconds."""
+
+        analyzers = {}
+        for name in self._analyzers:
+            latencies = list(self._latencies[name])
+            compute = list(self._compute[name])
+            analyzers[name] = {
+                "runs": self._counts[name],
+                "errors": self._errors[name],
+                "latency_p50_ms": round(_percentile(latencies, 0.5) * 1000, 2),
+                "latency_p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+                "compute_p50_ms": round(_percentile(compute, 0.5) * 1000, 2),
+            }
+        return {
+            "queue_depth": len(self._queue),
+            "dropped_frames": self.dropped_frames,
+            "analyzers": analyzers,
+        }
+
+    async def aclose(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,23 +1,139 @@
-"""Very light-weight placeholder for screen observation hooks."""
+"""Light-weight screen observation ingestion with change detection."""
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import sys
+import time
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Deque, Dict, Optional, Tuple
+
+# Payload keys that change on every frame and must not affect the fingerprint.
+_VOLATILE_KEYS = frozenset({"timestamp", "frame", "sequence", "stream_id"})
+_FRAME_SAMPLES = 4096
+_HASH_BITS = 64
+
+
+def _average_hash(frame: bytes | bytearray | memoryview) -> int:
+    """Return a 64-bit average hash of a raw frame buffer.
+
+    The buffer is strided down to a few thousand samples first so hashing
+    cost does not depend on the frame resolution.
+    """
+
+    view = memoryview(frame).cast("B")
+    step = max(1, len(view) // _FRAME_SAMPLES)
+    samples = view[::step].tobytes()
+    if not samples:
+        return 0
+    segment = max(1, len(samples) // _HASH_BITS)
+    means = [
+        sum(samples[i:i + segment]) / segment
+        for i in range(0, segment * _HASH_BITS, segment)
+    ]
+    average = sum(means) / len(means)
+    fingerprint = 0
+    for value in means:
+        fingerprint = (fingerprint << 1) | (value > average)
+    return fingerprint
+
+
+def _content_hash(payload: Dict[str, Any]) -> int:
+    stable = {key: value for key, value in payload.items() if key not in _VOLATILE_KEYS}
+    encoded = json.dumps(stable, sort_keys=True, default=str).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "big")
 
 
 class ScreenObserver:
-    """Collects timestamps of screen observations for analytics."""
+    """Keeps a bounded history of material screen changes per stream.
+
+    Observations are rate limited per stream and fingerprinted: raw frames
+    (``payload["frame"]``) with a perceptual average hash, everything else
+    with a content hash. Consecutive observations whose fingerprints are
+    within ``similarity_threshold`` bits are treated as unchanged and dropped.
+    Per-stream state is kept for the ``max_streams`` most recently observed
+    streams; a stream that comes back after being dropped starts afresh.
+    """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        capacity: int = 256,
+        min_interval: float = 0.5,
+        similarity_threshold: int = 4,
+        max_streams: int = 1024,
+    ) -> None:
         self.logger = logging.getLogger(self.__class__.__name__)
-        self._events: list[Dict[str, Any]] = []
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._min_interval = min_interval
+        self._similarity_threshold = similarity_threshold
+        self._max_streams = max_streams
+        # Last accepted observation per stream, least recently observed first
+        self._streams: "OrderedDict[str, Tuple[float, Tuple[str, int]]]" = OrderedDict()
+        self.counters = {"accepted": 0, "duplicates": 0, "rate_limited": 0}
 
-    async def record_event(self, payload: Dict[str, Any]) -> None:
-        event = {"timestamp": datetime.utcnow().isoformat(), **payload}
+    @staticmethod
+    def fingerprint(payload: Dict[str, Any]) -> Tuple[str, int]:
+        frame = payload.get("frame")
+        if isinstance(frame, (bytes, bytearray, memoryview)):
+            return "frame", _average_hash(frame)
+        return "content", _content_hash(payload)
+
+    def _is_similar(self, previous: Tuple[str, int], current: Tuple[str, int]) -> bool:
+        if previous[0] != current[0]:
+            return False
+        if current[0] == "content":
+            return previous[1] == current[1]
+        return bin(previous[1] ^ current[1]).count("1") <= self._similarity_threshold
+
+    async def record_event(self, payload: Dict[str, Any]) -> bool:
+        """Store the observation if it is a material change.
+
+        Returns ``True`` when the observation was accepted and should be
+        passed on for analysis.
+        """
+
+        stream_id = str(payload.get("stream_id", "default"))
+        now = time.monotonic()
+        state: Optional[Tuple[float, Tuple[str, int]]] = self._streams.get(stream_id)
+        if state:
+            self._streams.move_to_end(stream_id)
+        if state and now - state[0] < self._min_interval:
+            self.counters["rate_limited"] += 1
+            return False
+
+        fingerprint = self.fingerprint(payload)
+        if state and self._is_similar(state[1], fingerprint):
+            self.counters["duplicates"] += 1
+            return False
+
+        self._streams[stream_id] = (now, fingerprint)
+        if len(self._streams) > self._max_streams:
+            self._streams.popitem(last=False)
+        event = {
+            "timestamp": datetime.utcnow().isoformat(),
+            **{key: value for key, value in payload.items() if key != "frame"},
+            "fingerprint": f"{fingerprint[1]:016x}",
+        }
+        frame = payload.get("frame")
+        if frame is not None:
+            event["frame_size"] = len(frame)
         self._events.append(event)
-        self.logger.debug("Screen observation stored: %s", event)
+        self.counters["accepted"] += 1
+        self.logger.debug("Screen change stored for stream %s", stream_id)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "users": len(self._streams),
+            "entries": len(self._events),
+            "approx_bytes": sum(sys.getsizeof(event) for event in self._events),
+        }
+
+    def forget_stream(self, stream_id: str) -> None:
+        self._streams.pop(stream_id, None)
 
     def recent_events(self, limit: int = 20) -> list[Dict[str, Any]]:
-        return self._events[-limit:]
+        return list(self._events)[-limit:]
@@ -0,0 +1,138 @@
+"""Speculative turn processing on interim transcripts."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .metrics import REGISTRY
+from .structured_logging import ThrottledLogger
+
+_SPECULATIONS = REGISTRY.counter(
+    "voice_agent_speculations_total",
+    "Speculative turns by outcome (committed, early, discarded).",
+    ("outcome",),
+)
+
+_PUNCTUATION = re.compile(r"[^\w\s']+")
+
+Prepare = Callable[[str, str], Awaitable[Any]]
+# (speaker, final text, speculative task or None)
+Commit = Callable[[str, str, Optional["asyncio.Task[Any]"]], None]
+
+
+def normalize(text: str) -> str:
+    """Compare transcripts without case, punctuation or spacing differences."""
+
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+
+@dataclass
+class _Speculation:
+    text: str
+    key: str
+    task: Optional["asyncio.Task[Any]"] = None
+    timer: Optional[asyncio.TimerHandle] = None
+    committed: bool = False
+
+
+class Speculator:
+    """Starts a speaker's turn from interim transcripts before the final one.
+
+    An interim transcript that stays unchanged for ``stable_after`` seconds,
+    or that ``speculate_now`` accepts (e.g. a voice command), is handed to
+    ``prepare`` in the background. When the final transcript arrives with
+    the same normalized text, ``commit`` receives the speculative task;
+    otherwise the task is cancelled and ``commit`` gets ``None``. Results
+    accepted by ``commit_early`` are committed as soon as they are ready;
+    when the final transcript then differs, it is committed in full, as one
+    turn that supersedes the early one.
+    """
+
+    def __init__(
+        self,
+        prepare: Prepare,
+        commit: Commit,
+        stable_after: float = 0.35,
+        speculate_now: Callable[[str], bool] = lambda text: False,
+        commit_early: Callable[[Any], bool] = lambda result: False,
+    ) -> None:
+        self.logger = ThrottledLogger(logging.getLogger(self.__class__.__name__), per_second=5)
+        self._prepare = prepare
+        self._commit = commit
+        self.stable_after = stable_after
+        self._speculate_now = speculate_now
+        self._commit_early = commit_early
+        self._speculations: Dict[str, _Speculation] = {}
+
+    def interim(self, speaker: str, text: str) -> None:
+        key = normalize(text)
+        current = self._speculations.get(speaker)
+        if current is not None and (current.key == key or current.committed):
+            return
+        self._discard(speaker)
+        if not key:
+            return
+        speculation = self._speculations[speaker] = _Speculation(text, key)
+        if self._speculate_now(text):
+            self._start(speaker, speculation)
+        else:
+            speculation.timer = asyncio.get_running_loop().call_later(
+                self.stable_after, self._start, speaker, speculation
+            )
+
+    def final(self, speaker: str, text: str) -> None:
+        speculation = self._speculations.pop(speaker, None)
+        key = normalize(text)
+        if speculation is not None:
+            if speculation.committed:
+                if key == speculation.key:
+                    return
+                self.logger.debug("Final transcript of %s differs from an early turn; committing it", speaker)
+            elif speculation.task is not None and speculation.key == key:
+                _SPECULATIONS.inc("committed")
+                self._commit(speaker, text, speculation.task)
+                return
+            else:
+                self._cancel(speculation)
+        self._commit(speaker, text, None)
+
+    def discard_all(self) -> None:
+        for speaker in list(self._speculations):
+            self._discard(speaker)
+
+    def _start(self, speaker: str, speculation: _Speculation) -> None:
+        if self._speculations.get(speaker) is not speculation:
+            return
+        speculation.timer = None
+        # Prepared and final text are compared stripped, so strip once here.
+        speculation.text = speculation.text.strip()
+        speculation.task = asyncio.create_task(self._prepare(speculation.text, speaker))
+        speculation.task.add_done_callback(lambda task: self._ready(speaker, speculation, task))
+
+    def _ready(self, speaker: str, speculation: _Speculation, task: "asyncio.Task[Any]") -> None:
+        if task.cancelled() or self._speculations.get(speaker) is not speculation:
+            return
+        if task.exception() is not None:
+            self.logger.debug("Speculative turn failed for %s: %s", speaker, task.exception())
+            return
+        if self._commit_early(task.result()):
+            speculation.committed = True
+            _SPECULATIONS.inc("early")
+            self._commit(speaker, speculation.text, task)
+
+    def _discard(self, speaker: str) -> None:
+        speculation = self._speculations.pop(speaker, None)
+        if speculation is not None and not speculation.committed:
+            self._cancel(speculation)
+
+    @staticmethod
+    def _cancel(speculation: _Speculation) -> None:
+        if speculation.timer is not None:
+            speculation.timer.cancel()
+        if speculation.task is not None:
+            speculation.task.cancel()
+            _SPECULATIONS.inc("discarded")
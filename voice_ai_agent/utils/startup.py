@@ -0,0 +1,129 @@
+"""Lazily built components and startup cost accounting."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .metrics import REGISTRY
+
+_STARTUP_SECONDS = REGISTRY.gauge(
+    "voice_agent_startup_seconds", "Import and init cost of startup steps.", ("kind", "name")
+)
+
+
+class StartupTimer:
+    """Records how long imports and component initialisation take.
+
+    Steps are recorded in the order they finish; nested steps are included
+    in their parent's time, so the report lists inclusive costs.
+    """
+
+    def __init__(self) -> None:
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.started = time.perf_counter()
+        self._steps: List[Tuple[str, str, float]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, kind: str, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(kind, name, time.perf_counter() - started)
+
+    def record(self, kind: str, name: str, seconds: float) -> None:
+        with self._lock:
+            self._steps.append((kind, name, seconds))
+        _STARTUP_SECONDS.set(seconds, kind, name)
+
+    def steps(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {"kind": kind, "name": name, "ms": round(seconds * 1000, 2)}
+                for kind, name, seconds in self._steps
+            ]
+
+    def report(self, title: str = "Startup") -> Dict[str, Any]:
+        """Log and return the recorded steps, slowest first."""
+
+        elapsed = time.perf_counter() - self.started
+        steps = sorted(self.steps(), key=lambda step: step["ms"], reverse=True)
+        self.logger.info(
+            "%s took %.0f ms: %s",
+            title,
+            elapsed * 1000,
+            ", ".join(f"{step['kind']} {step['name']} {step['ms']:.0f} ms" for step in steps) or "no steps",
+        )
+        return {"elapsed_ms": round(elapsed * 1000, 2), "steps": steps}
+
+
+STARTUP = StartupTimer()
+
+
+class ComponentRegistry:
+    """Builds named components from their factories on first access.
+
+    Factories may use other components; those are built on demand as well.
+    Each build is timed in :data:`STARTUP`. :meth:`set` installs a ready
+    instance instead, e.g. a proxy to the shared state daemon.
+    """
+
+    def __init__(self, timer: StartupTimer = STARTUP) -> None:
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._timer = timer
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        self._factories[name] = factory
+
+    def get(self, name: str) -> Any:
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._instances:
+                factory = self._factories[name]
+                with self._timer.measure("init", name):
+                    self._instances[name] = factory()
+                self.logger.debug("Initialised component %s", name)
+            return self._instances[name]
+
+    def set(self, name: str, instance: Any) -> None:
+        self._instances[name] = instance
+
+    def is_built(self, name: str) -> bool:
+        return name in self._instances
+
+    def built(self, name: str) -> Optional[Any]:
+        """The component if it has been built, without building it."""
+
+        return self._instances.get(name)
+
+    def warm(self, names: Optional[List[str]] = None) -> None:
+        """Build ``names`` (default: all registered components) now."""
+
+        for name in names or list(self._factories):
+            self.get(name)
+
+
+class Component:
+    """Attribute backed by the owner's ``components`` registry."""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        if instance is None:
+            return self
+        return instance.components.get(self.name)
+
+    def __set__(self, instance: Any, value: Any) -> None:
+        instance.components.set(self.name, value)
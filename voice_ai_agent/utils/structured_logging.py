@@ -0,0 +1,225 @@
+"""Non-blocking structured logging with trace/room context and throttling."""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional
+
+from .metrics import REGISTRY
+
+_DROPPED = REGISTRY.counter("voice_agent_log_records_dropped_total", "Log records dropped by a full queue.")
+
+_TRACE_ID: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("log_trace_id", default=None)
+_ROOM: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("log_room", default=None)
+
+# Arguments that are safe to format later on the writer thread.
+_IMMUTABLE = (str, int, float, bool, type(None), bytes)
+
+# Attributes every LogRecord has; anything else came in through ``extra``.
+_RECORD_FIELDS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "trace_id", "room"}
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def current_trace_id() -> Optional[str]:
+    return _TRACE_ID.get()
+
+
+def bind_log_context(trace_id: Optional[str] = None, room: Optional[str] = None) -> None:
+    """Attach ids for the rest of the current task (and tasks it creates)."""
+
+    if trace_id is not None:
+        _TRACE_ID.set(trace_id)
+    if room is not None:
+        _ROOM.set(room)
+
+
+@contextmanager
+def log_context(trace_id: Optional[str] = None, room: Optional[str] = None) -> Iterator[None]:
+    """Attach ``trace_id`` and/or ``room`` to records logged inside the block.
+
+    Tasks created inside the block inherit the ids.
+    """
+
+    tokens = []
+    if trace_id is not None:
+        tokens.append((_TRACE_ID, _TRACE_ID.set(trace_id)))
+    if room is not None:
+        tokens.append((_ROOM, _ROOM.set(room)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records without formatting them on the caller's thread.
+
+    Context ids are captured at enqueue time. Messages whose arguments are
+    all immutable are formatted later by the writer thread; anything else
+    is formatted now, as the argument could change before it is written.
+    A full queue drops the record instead of blocking the event loop.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.trace_id = _TRACE_ID.get()
+        record.room = _ROOM.get()
+        args = record.args
+        if args and not (isinstance(args, tuple) and all(isinstance(arg, _IMMUTABLE) for arg in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DROPPED.inc()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including context ids and ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in ("trace_id", "room"):
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class ContextTextFormatter(logging.Formatter):
+    """Plain text that appends the context ids when present."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        context = " ".join(
+            f"{key}={getattr(record, key)}" for key in ("room", "trace_id") if getattr(record, key, None)
+        )
+        return f"{line} [{context}]" if context else line
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None, queue_size: int = 10000) -> None:
+    """Route the root logger through a queue drained by a writer thread.
+
+    Handlers already on the root logger (e.g. installed by the LiveKit CLI)
+    are moved behind the queue; otherwise a stderr handler is created using
+    ``AGENT_LOG_FORMAT`` (``json`` or ``text``). Calling it again adopts any
+    handlers added since.
+    """
+
+    global _listener
+    root = logging.getLogger()
+    root.setLevel((level or os.getenv("AGENT_LOG_LEVEL", "INFO")).upper())
+    with _listener_lock:
+        adopted = [handler for handler in root.handlers if not isinstance(handler, ContextQueueHandler)]
+        if _listener is not None:
+            if not adopted:
+                return
+            _listener.stop()
+            handlers = list(_listener.handlers) + adopted
+        elif adopted:
+            handlers = adopted
+        else:
+            handler = logging.StreamHandler(sys.stderr)
+            if (fmt or os.getenv("AGENT_LOG_FORMAT", "json")).lower() == "json":
+                handler.setFormatter(JsonFormatter())
+            else:
+                handler.setFormatter(ContextTextFormatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+            handlers = [handler]
+
+        for handler in adopted:
+            root.removeHandler(handler)
+        if not any(isinstance(handler, ContextQueueHandler) for handler in root.handlers):
+            log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=queue_size)
+            root.addHandler(ContextQueueHandler(log_queue))
+        queue_handler = next(handler for handler in root.handlers if isinstance(handler, ContextQueueHandler))
+        _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+class ThrottledLogger(logging.LoggerAdapter):
+    """Logger for per-turn lines that samples and rate-limits before logging.
+
+    A fraction ``sample`` of calls is kept, and at most ``per_second``
+    records per message template (with bursts of ``burst``). Rejected calls
+    never create a record. The next record of a template reports how many
+    were suppressed in a ``suppressed`` field.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        sample: float = 1.0,
+        per_second: Optional[float] = None,
+        burst: Optional[int] = None,
+    ) -> None:
+        super().__init__(logger, {})
+        self.sample = sample
+        self.per_second = per_second
+        self.burst = float(burst if burst is not None else max(1.0, per_second or 1.0))
+        # template -> [tokens, last refill, suppressed]
+        self._buckets: Dict[str, list] = {}
+
+    def log(self, level: int, msg: Any, *args: Any, **kwargs: Any) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        if self.sample < 1.0 and random.random() >= self.sample:
+            return
+        if self.per_second is not None:
+            now = time.monotonic()
+            bucket = self._buckets.get(msg)
+            if bucket is None:
+                bucket = self._buckets[msg] = [self.burst, now, 0]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.per_second)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                return
+            bucket[0] -= 1.0
+            if bucket[2]:
+                kwargs["extra"] = {**kwargs.get("extra", {}), "suppressed": bucket[2]}
+                bucket[2] = 0
+        self.logger.log(level, msg, *args, **kwargs)
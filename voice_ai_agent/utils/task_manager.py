@@ -3,7 +3,15 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any, Dict, List
+import json
+from typing import Any, Dict, Iterable, List
+
+from .metrics import approx_size, per_user_stats
+
+
+def _entry_key(task: Dict[str, Any]) -> str:
+    # Tasks are free-form, JSON-serialisable dicts
+    return json.dumps(task, sort_keys=True, default=str)
 
 
 class TaskManager:
@@ -17,6 +25,42 @@ class TaskManager:
         async with self._lock:
             self._tasks.setdefault(user_id, []).append(task)
 
+    def stats(self) -> Dict[str, int]:
+        return per_user_stats(self._tasks)
+
+    def user_footprint(self, user_id: str) -> int:
+        return approx_size(self._tasks.get(user_id, ()))
+
+    async def export_user(self, user_id: str) -> List[Dict[str, Any]]:
+        async with self._lock:
+            return list(self._tasks.get(user_id, ()))
+
+    async def import_user(self, user_id: str, tasks: List[Dict[str, Any]]) -> None:
+        async with self._lock:
+            self._tasks[user_id] = list(tasks) + self._tasks.get(user_id, [])
+
+    def user_ids(self) -> List[str]:
+        return list(self._tasks)
+
+    async def export_users(self, user_ids: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        async with self._lock:
+            return {user_id: list(self._tasks[user_id]) for user_id in user_ids if self._tasks.get(user_id)}
+
+    async def import_users(self, tasks: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Restore many users at once; tasks a user already has are skipped."""
+
+        async with self._lock:
+            for user_id, imported in tasks.items():
+                current = self._tasks.get(user_id, [])
+                present = {_entry_key(entry) for entry in current}
+                self._tasks[user_id] = [
+                    entry for entry in imported if _entry_key(entry) not in present
+                ] + current
+
+    async def evict_user(self, user_id: str) -> None:
+        async with self._lock:
+            self._tasks.pop(user_id, None)
+
     async def get_task_summary(self, user_id: str) -> Dict[str, Any]:
         async with self._lock:
             tasks = list(self._tasks.get(user_id, []))
@@ -2,48 +2,163 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Dict
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Optional, Tuple
 
-try:
-    from transformers import pipeline
-except Exception:  # pragma: no cover - optional dependency guard
-    pipeline = None  # type: ignore
+from .metrics import REGISTRY, approx_size, per_user_stats
+from .startup import STARTUP
+
+
+_TRANSLATIONS = REGISTRY.counter(
+    "voice_agent_translation_requests_total",
+    "Translation model calls by direction and outcome.",
+    ("direction", "outcome"),
+)
+_CACHE_REQUESTS = REGISTRY.counter(
+    "voice_agent_cache_requests_total", "Cache lookups by cache and result.", ("cache", "result")
+)
+
+# Frequent English function words; text made of ASCII words that includes
+# some of these is passed through instead of running the mul->en model.
+_ENGLISH_HINTS = frozenset(
+    "a an and am are be can could do does for have how i is it me my of on please "
+    "the this to was what when where why will with you your".split()
+)
+_WORDS = re.compile(r"[a-z']+")
+
+
+def looks_english(text: str) -> bool:
+    if not text.isascii():
+        return False
+    words = _WORDS.findall(text.lower())
+    return bool(words) and sum(word in _ENGLISH_HINTS for word in words) * 5 >= len(words)
 
 
 class MultilingualProcessor:
     """Translate and keep track of the preferred language per user."""
 
-    def __init__(self) -> None:
+    def __init__(self, cache_size: int = 2048, model: Optional[str] = "Helsinki-NLP/opus-mt-mul-en") -> None:
         self.logger = logging.getLogger(self.__class__.__name__)
-        self._user_language: Dict[str, str] = {}
+        self._user_language: MutableMapping[str, str] = {}
+        # transformers and the model are loaded on the translation thread by
+        # warm_up() or the first translation; text passes through until then.
+        self.model = model
         self._detector = None
-        if pipeline:
-            try:
-                self._detector = pipeline("translation", model="Helsinki-NLP/opus-mt-mul-en")
-            except Exception as exc:  # pragma: no cover - model download failure
-                self.logger.warning("Could not load translation pipeline: %s", exc)
-                self._detector = None
-
-    async def process_multilingual_input(self, text: str, user_id: str) -> Dict[str, str]:
+        self._loading: Optional["Future[None]"] = None
+        # Model calls run on one worker thread so they never block the event
+        # loop; jobs still queued when their turn is cancelled are dropped.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="translation")
+        self._queued = 0
+        # LRU of input text -> English translation, also filled by jobs whose
+        # turn stopped waiting for them.
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_size = cache_size
+        self.expected_latency = 0.0
+
+    def warm_up(self) -> None:
+        """Start loading the translation model in the background."""
+        if self._detector is None and self._loading is None and self.model:
+            self._loading = self._executor.submit(self._load_model)
+
+    def _load_model(self) -> None:
+        try:
+            with STARTUP.measure("import", "transformers"):
+                from transformers import pipeline
+        except Exception:  # pragma: no cover - optional dependency guard
+            self.logger.info("transformers is not installed; translation disabled")
+            return
+        try:
+            with STARTUP.measure("init", f"translation model {self.model}"):
+                self._detector = pipeline("translation", model=self.model)
+        except Exception as exc:  # pragma: no cover - model download failure
+            self.logger.warning("Could not load translation pipeline: %s", exc)
+
+    async def process_multilingual_input(
+        self, text: str, user_id: str, timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Translate ``text`` to English for the pipeline.
+
+        With ``timeout`` the model is skipped when its expected latency does
+        not fit, or abandoned once the timeout passes; the untranslated text
+        is returned with ``degraded`` set. Abandoned jobs still fill the cache.
+        While the model is still loading only cached translations are used.
+        """
         target_language = self._user_language.get(user_id, "en")
         detected_language = "en"
         processed = text
-        if self._detector and target_language == "en":
-            try:
-                result = self._detector(text, max_length=256)
-                if result and isinstance(result, list):
-                    processed = result[0]["translation_text"]
-                    detected_language = "auto"
-            except Exception as exc:  # pragma: no cover
-                self.logger.debug("Translation failed: %s", exc)
+        degraded = False
+        self.warm_up()
+        loading = self._loading is not None and not self._loading.done()
+        if (self._detector or loading) and target_language == "en" and not looks_english(text):
+            cached = self._cache.get(text)
+            _CACHE_REQUESTS.inc("translation", "miss" if cached is None else "hit")
+            if cached is not None:
+                self._cache.move_to_end(text)
+                processed, detected_language = cached, "auto"
+            elif self._detector is None:
+                _TRANSLATIONS.inc("input", "skipped")
+                degraded = True
+            elif timeout is not None and timeout < self.expected_latency:
+                _TRANSLATIONS.inc("input", "skipped")
+                degraded = True
+            else:
+                translated = await self._translate(text, timeout)
+                if translated is None:
+                    degraded = timeout is not None
+                else:
+                    processed, detected_language = translated, "auto"
 
         return {
             "processed_text": processed,
             "detected_language": detected_language,
             "target_language": target_language,
+            "degraded": degraded,
         }
 
+    async def _translate(self, text: str, timeout: Optional[float]) -> Optional[str]:
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(self._detector, text, max_length=256)
+        )
+        future.add_done_callback(partial(self._remember, text, started))
+        self._queued += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            _TRANSLATIONS.inc("input", "timeout")
+            return None
+        except asyncio.CancelledError:
+            future.cancel()  # drop the job if it has not started yet
+            raise
+        except Exception as exc:  # pragma: no cover
+            self.logger.debug("Translation failed: %s", exc)
+            return None
+        finally:
+            self._queued -= 1
+        return self._cache.get(text)
+
+    def _remember(self, text: str, started: float, future: "asyncio.Future[Any]") -> None:
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            _TRANSLATIONS.inc("input", "error")
+            return
+        _TRANSLATIONS.inc("input", "success")
+        elapsed = time.perf_counter() - started
+        self.expected_latency = 0.8 * self.expected_latency + 0.2 * elapsed if self.expected_latency else elapsed
+        result = future.result()
+        if result and isinstance(result, list):
+            self._cache[text] = result[0]["translation_text"]
+            self._cache.move_to_end(text)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
     async def translate_response(self, text: str, user_id: str) -> Dict[str, str]:
         target_language = self._user_language.get(user_id, "en")
         if target_language == "en" or not text:
@@ -51,7 +166,77 @@ class MultilingualProcessor:
         # Translation pipeline defaults to english target; since we do not ship
         # extra models, we emulate localisation with a prefix.
         translated = f"[{target_language}] {text}"
+        _TRANSLATIONS.inc("response", "success")
         return {"final_response": translated, "language": target_language}
 
+    @property
+    def queue_depth(self) -> int:
+        """Translation jobs queued or running."""
+        return self._queued
+
+    @property
+    def language_preferences(self) -> MutableMapping[str, str]:
+        return self._user_language
+
+    def use_preference_store(self, store: MutableMapping[str, str]) -> None:
+        """Replace the per-user language mapping, e.g. with a shared one."""
+        self._user_language = store
+
+    def stats(self) -> Dict[str, int]:
+        stats = per_user_stats(self._user_language)
+        stats["cached_translations"] = len(self._cache)
+        return stats
+
+    def export_cache(self) -> List[Tuple[str, str]]:
+        return list(self._cache.items())
+
+    def import_cache(self, entries: Iterable[Tuple[str, str]]) -> None:
+        """Add older translations behind the current cache contents."""
+        merged: "OrderedDict[str, str]" = OrderedDict(entries)
+        merged.update(self._cache)
+        while len(merged) > self._cache_size:
+            merged.popitem(last=False)
+        self._cache = merged
+
+    def export_language_preferences(self) -> Dict[str, str]:
+        return dict(self._user_language.items())
+
+    def import_language_preferences(self, preferences: Mapping[str, str]) -> None:
+        """Add preferences for users without one; current choices win."""
+        merge_missing = getattr(self._user_language, "merge_missing", None)
+        if merge_missing is not None:
+            merge_missing(dict(preferences))
+            return
+        for user_id, language in preferences.items():
+            self._user_language.setdefault(user_id, language)
+
+    def user_footprint(self, user_id: str) -> int:
+        language = self._user_language.get(user_id)
+        return approx_size(language) if language is not None else 0
+
+    async def export_user(self, user_id: str) -> Optional[str]:
+        return self._user_language.get(user_id)
+
+    async def import_user(self, user_id: str, language: str) -> None:
+        self.import_language_preferences({user_id: language})
+
+    async def evict_user(self, user_id: str) -> None:
+        self._user_language.pop(user_id, None)
+
+    def user_ids(self) -> List[str]:
+        return [user_id for user_id, _ in self._user_language.items()]
+
+    async def export_users(self, user_ids: Iterable[str]) -> Dict[str, str]:
+        return {user_id: self._user_language[user_id] for user_id in user_ids if user_id in self._user_language}
+
+    async def import_users(self, preferences: Dict[str, str]) -> None:
+        self.import_language_preferences(preferences)
+
+    async def load_language_preferences(self, user_ids: Iterable[str]) -> None:
+        """Pull users' current preferences when the store is a shared copy."""
+        refresh = getattr(self._user_language, "refresh", None)
+        if refresh is not None:
+            await refresh(user_ids)
+
     def set_user_language_preference(self, user_id: str, language: str) -> None:
         self._user_language[user_id] = language.lower()
@@ -0,0 +1,107 @@
+"""Turn-level cancellation for barge-in."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Coroutine, Dict, List, Optional
+
+from .metrics import REGISTRY
+from .structured_logging import ThrottledLogger
+
+_CANCELLED_TURNS = REGISTRY.counter(
+    "voice_agent_turns_cancelled_total", "In-flight turns cancelled by barge-in.", ("reason",)
+)
+_INTERRUPTED_SPEECH = REGISTRY.counter(
+    "voice_agent_speech_interrupted_total", "Queued or playing replies interrupted by barge-in."
+)
+_CANCEL_LATENCY = REGISTRY.histogram(
+    "voice_agent_turn_cancel_seconds",
+    "Time from a barge-in until the superseded turn stopped.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+
+@dataclass
+class Turn:
+    speaker: str
+    task: Optional[asyncio.Task] = None
+    speech: List[Any] = field(default_factory=list)
+    cancel_requested: Optional[float] = None
+
+
+_CURRENT_TURN: contextvars.ContextVar[Optional[Turn]] = contextvars.ContextVar("current_turn", default=None)
+
+
+class TurnTracker:
+    """Keeps the latest turn per speaker so newer speech can supersede it.
+
+    :meth:`start` runs a turn as a task; speech queued from inside that task
+    is attached with :meth:`track_speech`. Cancelling a turn cancels its
+    task, which aborts whatever it is awaiting (an OpenAI request, a queued
+    translation job, ...), and interrupts its speech handles.
+    """
+
+    def __init__(self) -> None:
+        self.logger = ThrottledLogger(logging.getLogger(self.__class__.__name__), per_second=5)
+        self._turns: Dict[str, Turn] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return sum(1 for turn in self._turns.values() if turn.task is not None and not turn.task.done())
+
+    def start(self, speaker: str, coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        """Supersede ``speaker``'s previous turn and run ``coro`` as the new one."""
+
+        self.cancel(speaker, "transcript")
+        turn = Turn(speaker)
+        self._turns[speaker] = turn
+
+        async def _run() -> Any:
+            _CURRENT_TURN.set(turn)
+            return await coro
+
+        turn.task = asyncio.create_task(_run())
+        turn.task.add_done_callback(lambda task: self._finished(turn, task, coro))
+        return turn.task
+
+    def track_speech(self, handle: Any) -> None:
+        """Attach a speech handle to the turn running in the current task."""
+
+        turn = _CURRENT_TURN.get()
+        if turn is not None:
+            turn.speech = [item for item in turn.speech if not item.done()]
+            turn.speech.append(handle)
+
+    def cancel(self, speaker: str, reason: str) -> bool:
+        """Cancel ``speaker``'s turn and interrupt its speech; True if anything stopped."""
+
+        turn = self._turns.get(speaker)
+        if turn is None:
+            return False
+        stopped = False
+        if turn.task is not None and not turn.task.done():
+            turn.cancel_requested = time.perf_counter()
+            turn.task.cancel()
+            _CANCELLED_TURNS.inc(reason)
+            stopped = True
+        for handle in turn.speech:
+            if not handle.done():
+                handle.interrupt()
+                _INTERRUPTED_SPEECH.inc()
+                stopped = True
+        turn.speech.clear()
+        if stopped:
+            self.logger.debug("Cancelled turn for %s (%s)", speaker, reason)
+        return stopped
+
+    def _finished(self, turn: Turn, task: asyncio.Task, coro: Coroutine[Any, Any, Any]) -> None:
+        if task.cancelled():
+            coro.close()  # never started if cancelled before its first step
+            if turn.cancel_requested is not None:
+                _CANCEL_LATENCY.observe(time.perf_counter() - turn.cancel_requested)
+        if self._turns.get(turn.speaker) is turn and not turn.speech:
+            del self._turns[turn.speaker]
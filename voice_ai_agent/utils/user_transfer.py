@@ -0,0 +1,413 @@
+"""Streaming bulk export and import of per-user state across all stores.
+
+An export is a sequence of user records, ``{"user_id": ..., "stores":
+{store name: exported state}}``, in user id order. Two file formats are
+supported: ``ndjson`` (one compact JSON record per line) and ``frames``
+(a magic header, then each JSON record prefixed by its big-endian
+``uint32`` length).
+
+Export resume tokens are the last user id written, so an interrupted export
+continues after it. Import resume tokens are the byte offset after the
+last imported batch.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import bisect
+import dataclasses
+import json
+import logging
+import os
+import struct
+from collections import deque
+from pathlib import Path
+from typing import IO, Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from .metrics import REGISTRY
+from .structured_logging import configure_logging, stop_logging
+
+FORMATS = ("ndjson", "frames")
+MAGIC = b"VAUSERS1"
+_LENGTH = struct.Struct(">I")
+
+_TRANSFERRED = REGISTRY.counter(
+    "voice_agent_user_transfer_users_total", "Users exported or imported in bulk.", ("direction",)
+)
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+class UserTransfer:
+    """Reads and writes the per-user state of all stores a page at a time.
+
+    Each store exposes ``user_ids``, ``export_users`` and ``import_users``.
+    Users are exported in user id order, so the last id of a page is the
+    token for the next one. The sorted id list is built once per export and
+    reused while pages are requested in sequence; it only references the
+    ids the stores already hold. Users spilled by the memory manager are
+    read from their spill files without being reloaded. Imported users are
+    handed to the memory manager as the coldest ones, so a bulk load can be
+    spilled under the memory budget.
+    """
+
+    def __init__(self, stores: Dict[str, Any], memory_manager: Any = None, page_size: int = 500) -> None:
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._stores = stores
+        self._memory_manager = memory_manager
+        self.page_size = page_size
+        # (token the next page starts after, sorted ids, index of the next id)
+        self._cursor: Optional[Tuple[str, List[str], int]] = None
+
+    def _sorted_user_ids(self) -> List[str]:
+        user_ids = set()
+        for store in self._stores.values():
+            user_ids.update(store.user_ids())
+        if self._memory_manager is not None:
+            user_ids.update(self._memory_manager.spilled_users())
+        return sorted(user_ids)
+
+    async def export_page(
+        self, after: Optional[str] = None, limit: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Records of the users after the token ``after``.
+
+        Returns the records and the token for the next page, or ``([],
+        None)`` once no users are left. Users created since the export
+        started are included if their id sorts after the current page.
+        """
+
+        limit = limit or self.page_size
+        if self._cursor is not None and after is not None and self._cursor[0] == after:
+            _, user_ids, position = self._cursor
+        else:
+            user_ids = self._sorted_user_ids()
+            position = bisect.bisect_right(user_ids, after) if after is not None else 0
+        page = user_ids[position:position + limit]
+        if not page:
+            self._cursor = None
+            return [], None
+        self._cursor = (page[-1], user_ids, position + len(page))
+
+        states: Dict[str, Dict[str, Any]] = {}
+        for name, store in self._stores.items():
+            for user_id, state in (await store.export_users(page)).items():
+                states.setdefault(user_id, {})[name] = state
+        if self._memory_manager is not None:
+            for user_id, spilled in (await self._memory_manager.read_spilled(page)).items():
+                stores = states.setdefault(user_id, {})
+                for name, state in spilled.items():
+                    stores.setdefault(name, state)
+        records = [{"user_id": user_id, "stores": states[user_id]} for user_id in page if user_id in states]
+        _TRANSFERRED.inc("export", amount=len(records))
+        return records, page[-1]
+
+    async def import_page(self, records: List[Dict[str, Any]]) -> int:
+        """Load a batch of records with one bulk insert per store."""
+
+        batches: Dict[str, Dict[str, Any]] = {}
+        unknown = set()
+        for record in records:
+            user_id = record["user_id"]
+            for name, state in record.get("stores", {}).items():
+                if name in self._stores:
+                    batches.setdefault(name, {})[user_id] = state
+                else:
+                    unknown.add(name)
+        if unknown:
+            self.logger.warning("Skipping state of unknown stores: %s", ", ".join(sorted(unknown)))
+        for name, states in batches.items():
+            await self._stores[name].import_users(states)
+        if self._memory_manager is not None:
+            self._memory_manager.adopt(record["user_id"] for record in records)
+        _TRANSFERRED.inc("import", amount=len(records))
+        return len(records)
+
+
+async def export_records(
+    transfer: Any, resume: Optional[str] = None, page_size: Optional[int] = None
+) -> AsyncIterator[Tuple[List[Dict[str, Any]], str]]:
+    """Pages of records, each with the resume token that follows it.
+
+    ``transfer`` is a :class:`UserTransfer` or its shared state proxy.
+    """
+
+    token = resume
+    while True:
+        records, token = await transfer.export_page(token, page_size)
+        if token is None:
+            return
+        yield records, token
+
+
+def _json_default(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (set, frozenset, deque)):
+        return list(value)
+    return str(value)
+
+
+def encode_records(records: List[Dict[str, Any]], fmt: str = "ndjson") -> bytes:
+    bodies = [
+        json.dumps(record, separators=(",", ":"), default=_json_default).encode("utf-8") for record in records
+    ]
+    if fmt == "ndjson":
+        return b"".join(body + b"\n" for body in bodies)
+    if fmt == "frames":
+        return b"".join(_LENGTH.pack(len(body)) + body for body in bodies)
+    raise ValueError(f"Unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+
+
+class RecordReader:
+    """Reads records from an export file in bounded chunks.
+
+    :meth:`read_batch` blocks on file I/O and JSON decoding; run it in a
+    thread. Each record comes with the file offset just after it.
+    """
+
+    def __init__(self, handle: IO[bytes], fmt: str = "ndjson", offset: int = 0, chunk_size: int = 1 << 20) -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+        self._handle = handle
+        self._fmt = fmt
+        self._chunk_size = chunk_size
+        if fmt == "frames" and offset == 0:
+            if handle.read(len(MAGIC)) != MAGIC:
+                raise ValueError("not a user export in the frames format")
+            offset = len(MAGIC)
+        else:
+            handle.seek(offset)
+        self._buffer = bytearray()
+        # File offset of the first byte in the buffer
+        self._start = offset
+        self._eof = False
+
+    def _fill(self, position: int) -> int:
+        del self._buffer[:position]
+        self._start += position
+        chunk = self._handle.read(self._chunk_size)
+        if chunk:
+            self._buffer += chunk
+        else:
+            self._eof = True
+        return 0
+
+    def read_batch(self, limit: int) -> List[Tuple[Dict[str, Any], int]]:
+        batch: List[Tuple[Dict[str, Any], int]] = []
+        position = 0
+        while len(batch) < limit:
+            if self._fmt == "ndjson":
+                end = self._buffer.find(b"\n", position)
+                if end < 0:
+                    if self._eof:
+                        if bytes(self._buffer[position:]).strip():
+                            raise ValueError(f"Truncated record at offset {self._start + position}")
+                        break
+                    position = self._fill(position)
+                    continue
+                line = self._buffer[position:end]
+                position = end + 1
+                if line.strip():
+                    batch.append((json.loads(line), self._start + position))
+            else:
+                available = len(self._buffer) - position
+                length = (
+                    _LENGTH.unpack_from(self._buffer, position)[0] if available >= _LENGTH.size else None
+                )
+                if length is None or available < _LENGTH.size + length:
+                    if self._eof:
+                        if available:
+                            raise ValueError(f"Truncated record at offset {self._start + position}")
+                        break
+                    position = self._fill(position)
+                    continue
+                body = self._buffer[position + _LENGTH.size:position + _LENGTH.size + length]
+                position += _LENGTH.size + length
+                batch.append((json.loads(body), self._start + position))
+        del self._buffer[:position]
+        self._start += position
+        return batch
+
+
+def recover_export(path: PathLike, fmt: str = "ndjson") -> Optional[str]:
+    """Resume token of an interrupted export file.
+
+    A partially written last record is truncated. Returns the user id of
+    the last complete record, or None if there is none.
+    """
+
+    with open(path, "r+b") as handle:
+        if fmt == "ndjson":
+            size = handle.seek(0, os.SEEK_END)
+            tail = b""
+            position = size
+            # Read backwards until the last two line breaks are in view.
+            while position > 0 and tail.count(b"\n") < 2:
+                step = min(65536, position)
+                position -= step
+                handle.seek(position)
+                tail = handle.read(step) + tail
+            complete = tail.rfind(b"\n")
+            handle.truncate(position + complete + 1 if complete >= 0 else 0)
+            if complete < 0:
+                return None
+            last = tail[tail.rfind(b"\n", 0, complete) + 1:complete]
+        else:
+            if handle.read(len(MAGIC)) != MAGIC:
+                raise ValueError("not a user export in the frames format")
+            end, last_offset = len(MAGIC), None
+            while True:
+                header = handle.read(_LENGTH.size)
+                if len(header) < _LENGTH.size:
+                    break
+                (length,) = _LENGTH.unpack(header)
+                if len(handle.read(length)) < length:
+                    break
+                last_offset, end = end, end + _LENGTH.size + length
+            handle.truncate(end)
+            if last_offset is None:
+                return None
+            handle.seek(last_offset)
+            (length,) = _LENGTH.unpack(handle.read(_LENGTH.size))
+            last = handle.read(length)
+    return json.loads(last)["user_id"]
+
+
+async def export_to_file(
+    transfer: Any, path: PathLike, fmt: str = "ndjson", resume: Optional[str] = None
+) -> Tuple[int, Optional[str]]:
+    """Stream every user into ``path``; returns the count and the last token.
+
+    With ``resume`` the file is appended to, e.g. with the token from
+    :func:`recover_export`. The next page is fetched while the previous one
+    is encoded and written, so at most two pages are held in memory.
+    """
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    handle = await asyncio.to_thread(open, path, "ab" if resume is not None else "wb")
+    exported, token = 0, resume
+    pending: Optional[asyncio.Future] = None
+    try:
+        if fmt == "frames" and resume is None:
+            await asyncio.to_thread(handle.write, MAGIC)
+        async for records, token in export_records(transfer, resume):
+            if pending is not None:
+                await pending
+            pending = asyncio.ensure_future(asyncio.to_thread(_write_page, handle, records, fmt))
+            exported += len(records)
+        if pending is not None:
+            await pending
+        await asyncio.to_thread(_sync, handle)
+    finally:
+        if pending is not None and not pending.done():
+            await asyncio.wait([pending])
+        await asyncio.to_thread(handle.close)
+    return exported, token
+
+
+def _write_page(handle: IO[bytes], records: List[Dict[str, Any]], fmt: str) -> None:
+    handle.write(encode_records(records, fmt))
+
+
+def _sync(handle: IO[bytes]) -> None:
+    handle.flush()
+    os.fsync(handle.fileno())
+
+
+async def import_from_file(
+    transfer: Any,
+    path: PathLike,
+    fmt: str = "ndjson",
+    resume: Optional[str] = None,
+    batch_size: int = 500,
+    on_batch: Optional[Any] = None,
+) -> Tuple[int, Optional[str]]:
+    """Bulk load an export file; returns the count and the last token.
+
+    Records are loaded ``batch_size`` at a time while the next batch is
+    read. ``on_batch(imported, token)`` is called after each batch, so a
+    caller can record where to resume.
+    """
+
+    handle = await asyncio.to_thread(open, path, "rb")
+    imported, token = 0, resume
+    try:
+        reader = await asyncio.to_thread(RecordReader, handle, fmt, int(resume or 0))
+        batch = await asyncio.to_thread(reader.read_batch, batch_size)
+        while batch:
+            following = asyncio.ensure_future(asyncio.to_thread(reader.read_batch, batch_size))
+            try:
+                imported += await transfer.import_page([record for record, _ in batch])
+            except BaseException:
+                await asyncio.wait([following])
+                raise
+            token = str(batch[-1][1])
+            if on_batch is not None:
+                on_batch(imported, token)
+            batch = await following
+    finally:
+        await asyncio.to_thread(handle.close)
+    return imported, token
+
+
+def format_for(path: PathLike, fmt: Optional[str] = None) -> str:
+    """``fmt`` if given, else ``ndjson`` for JSON-like suffixes and ``frames`` otherwise."""
+
+    if fmt:
+        return fmt
+    return "ndjson" if Path(path).suffix in (".ndjson", ".jsonl", ".json") else "frames"
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from ..database.shared_state import StateClient
+
+    socket_path = args.socket or os.getenv("AGENT_STATE_SOCKET")
+    if not socket_path:
+        raise SystemExit("Set AGENT_STATE_SOCKET or pass --socket to reach a running worker")
+    client = StateClient(socket_path)
+    transfer = client.proxy("user_transfer")
+    fmt = format_for(args.path, args.format)
+    logger = logging.getLogger("user_transfer")
+    try:
+        if args.command == "export":
+            resume = args.resume
+            if resume == "auto":
+                resume = await asyncio.to_thread(recover_export, args.path, fmt) if Path(args.path).exists() else None
+            count, token = await export_to_file(transfer, args.path, fmt, resume)
+            logger.info("Exported %d users to %s (last token %s)", count, args.path, token)
+        else:
+            count, token = await import_from_file(
+                transfer,
+                args.path,
+                fmt,
+                args.resume,
+                args.batch_size,
+                on_batch=lambda imported, token: logger.info("Imported %d users, resume token %s", imported, token),
+            )
+            logger.info("Imported %d users from %s", count, args.path)
+    finally:
+        client.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Export or import the per-user state of a running worker.")
+    parser.add_argument("command", choices=("export", "import"))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file suffix")
+    parser.add_argument("--resume", help="export: a user id token or 'auto'; import: a byte offset token")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--socket", help="shared state socket (default: AGENT_STATE_SOCKET)")
+    args = parser.parse_args(argv)
+    configure_logging(fmt="text")
+    try:
+        asyncio.run(_run(args))
+    finally:
+        stop_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -14,9 +14,12 @@ class VoiceCommandProcessor:
         "open dashboard": ("open_dashboard", "Opening the cockpit dashboard."),
     }
 
-    async def process_text(self, text: str) -> Optional[Tuple[str, str]]:
+    def match(self, text: str) -> Optional[Tuple[str, str]]:
         lowered = text.lower().strip()
         for phrase, result in self._commands.items():
             if phrase in lowered:
                 return result
         return None
+
+    async def process_text(self, text: str) -> Optional[Tuple[str, str]]:
+        return self.match(text)
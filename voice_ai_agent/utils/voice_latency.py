@@ -0,0 +1,135 @@
+"""Latency breakdown of voice turns, from end of speech to first audio."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional
+
+from .metrics import REGISTRY, Histogram
+from .structured_logging import ThrottledLogger
+
+# Segment -> (start mark, end mark)
+SEGMENTS = {
+    "stt": ("speech_end", "final_transcript"),
+    "pipeline": ("final_transcript", "pipeline_complete"),
+    "reply_queue": ("pipeline_complete", "tts_request"),
+    "tts": ("tts_request", "first_audio"),
+    "total": ("speech_end", "first_audio"),
+}
+
+_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+_VOICE_LATENCY = REGISTRY.histogram(
+    "voice_agent_voice_latency_seconds",
+    "Voice turn latency by segment, from the user's end of speech to the agent's first audio.",
+    ("segment",),
+    buckets=_BUCKETS,
+)
+_VOICE_TURNS = REGISTRY.counter(
+    "voice_agent_voice_turns_total", "Voice turns by outcome (spoken, abandoned).", ("outcome",)
+)
+
+
+@dataclass
+class VoiceTurn:
+    """perf_counter() timestamps of one voice turn, keyed by mark name."""
+
+    marks: Dict[str, float] = field(default_factory=dict)
+
+    def mark(self, name: str) -> None:
+        self.marks.setdefault(name, time.perf_counter())
+
+    def segments(self) -> Dict[str, float]:
+        durations = {}
+        for segment, (start, end) in SEGMENTS.items():
+            if start in self.marks and end in self.marks and self.marks[end] >= self.marks[start]:
+                durations[segment] = self.marks[end] - self.marks[start]
+        return durations
+
+
+class VoiceLatencyTracker:
+    """Follows the voice turns of one room through the AgentSession events.
+
+    The entrypoint reports VAD transitions, final transcripts and agent
+    state changes; the pipeline marks its own completion and the TTS
+    request on the :class:`VoiceTurn` it was handed. The first time the
+    agent starts speaking after a TTS request counts as the first audio of
+    that turn. Segments are observed in a process-wide histogram and in a
+    per-room one that is summarised by :meth:`close`.
+    """
+
+    def __init__(self, room: str) -> None:
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._turn_log = ThrottledLogger(self.logger, per_second=5)
+        self.room = room
+        self._room_latency = Histogram(
+            "voice_agent_room_voice_latency_seconds", "", ("segment",), buckets=_BUCKETS
+        )
+        self._current: Optional[VoiceTurn] = None
+        self._awaiting_audio: Deque[VoiceTurn] = deque()
+
+    @property
+    def current(self) -> VoiceTurn:
+        """The turn for the utterance being spoken or transcribed."""
+
+        if self._current is None:
+            self._current = VoiceTurn()
+        return self._current
+
+    def speech_started(self) -> None:
+        # Replies not yet audible when the user speaks again are abandoned.
+        while self._awaiting_audio:
+            self._awaiting_audio.popleft()
+            _VOICE_TURNS.inc("abandoned")
+        self._current = VoiceTurn()
+
+    def speech_ended(self) -> None:
+        self.current.mark("speech_end")
+
+    def final_transcript(self) -> VoiceTurn:
+        turn = self.current
+        turn.mark("final_transcript")
+        return turn
+
+    def tts_requested(self, turn: VoiceTurn) -> None:
+        if "tts_request" not in turn.marks:
+            turn.mark("tts_request")
+            self._awaiting_audio.append(turn)
+
+    def agent_speaking(self) -> None:
+        if not self._awaiting_audio:
+            return
+        turn = self._awaiting_audio.popleft()
+        turn.mark("first_audio")
+        durations = turn.segments()
+        for segment, seconds in durations.items():
+            _VOICE_LATENCY.observe(seconds, segment)
+            self._room_latency.observe(seconds, segment)
+        _VOICE_TURNS.inc("spoken")
+        self._turn_log.debug("Voice turn latency", extra={"segments": durations})
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-segment count, mean and bucket counts for this room."""
+
+        result = {}
+        for segment in SEGMENTS:
+            snapshot = self._room_latency.snapshot(segment)
+            if snapshot["count"]:
+                snapshot["mean"] = snapshot["sum"] / snapshot["count"]
+                result[segment] = snapshot
+        return result
+
+    def close(self) -> Dict[str, Dict[str, Any]]:
+        summary = self.summary()
+        if summary:
+            self.logger.info(
+                "Voice latency in %s: %s",
+                self.room,
+                " ".join(
+                    f"{segment}={stats['mean'] * 1000:.0f}ms/{stats['count']}" for segment, stats in summary.items()
+                ),
+            )
+        return summary
@@ -0,0 +1,288 @@
+"""Periodic snapshots of warm in-memory state for fast worker restarts."""
+
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import inspect
+import logging
+import mmap
+import os
+import pickle
+import struct
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from .metrics import REGISTRY
+
+MAGIC = b"VAWARM"
+FORMAT_VERSION = 1
+# magic, format version, section count
+_HEADER = struct.Struct("<6sHI")
+# name length, offset, length; followed by the UTF-8 name
+_ENTRY = struct.Struct("<HQQ")
+
+Export = Callable[[], Union[Any, Awaitable[Any]]]
+Restore = Callable[[Any], Union[None, Awaitable[None]]]
+
+_SNAPSHOTS = REGISTRY.counter(
+    "voice_agent_warm_state_snapshots_total", "Warm-state snapshot writes by outcome.", ("outcome",)
+)
+_RESTORES = REGISTRY.counter(
+    "voice_agent_warm_state_restores_total", "Warm-state sections restored by outcome.", ("outcome",)
+)
+
+
+def merge_section(previous: Any, current: Any) -> Any:
+    """Combine a section from the file with this process's copy of it.
+
+    Dicts are merged by key and lists of key/value pairs (LRU caches, oldest
+    first) keep the newest entries up to the longer of the two; the entries
+    of ``current`` win. Any other value replaces the previous one.
+    """
+
+    if isinstance(previous, dict) and isinstance(current, dict):
+        return {**previous, **current}
+    if isinstance(previous, list) and isinstance(current, list):
+        try:
+            merged = OrderedDict(previous)
+            for key, value in current:
+                merged.pop(key, None)
+                merged[key] = value
+        except (TypeError, ValueError):
+            return current
+        return list(merged.items())[-max(len(previous), len(current)):]
+    return current
+
+
+class WarmStateFile:
+    """A versioned snapshot file of independently pickled sections.
+
+    Layout: header, table of contents, then the section bodies. Opening a
+    snapshot only maps the file and reads the table of contents; a section
+    is unpickled straight from the mapping when it is first loaded.
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        self.path = Path(path)
+        self._file: Optional[Any] = None
+        self._map: Optional[mmap.mmap] = None
+        self._sections: Dict[str, Tuple[int, int]] = {}
+
+    def open(self) -> bool:
+        """Map the snapshot; False when it is missing, corrupt or another version."""
+
+        self.close()
+        try:
+            handle = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        try:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # empty file
+            handle.close()
+            return False
+        try:
+            self._sections = self._read_index(mapped)
+        except (struct.error, ValueError) as exc:
+            logging.getLogger(self.__class__.__name__).warning("Ignoring snapshot %s: %s", self.path, exc)
+            mapped.close()
+            handle.close()
+            return False
+        self._file, self._map = handle, mapped
+        return True
+
+    @staticmethod
+    def _read_index(mapped: mmap.mmap) -> Dict[str, Tuple[int, int]]:
+        magic, version, count = _HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC:
+            raise ValueError("not a warm-state snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"format version {version}, expected {FORMAT_VERSION}")
+        sections = {}
+        position = _HEADER.size
+        for _ in range(count):
+            name_length, offset, length = _ENTRY.unpack_from(mapped, position)
+            position += _ENTRY.size
+            name = mapped[position:position + name_length].decode("utf-8")
+            position += name_length
+            if offset + length > len(mapped):
+                raise ValueError(f"section {name} is truncated")
+            sections[name] = (offset, length)
+        return sections
+
+    @property
+    def sections(self) -> Tuple[str, ...]:
+        return tuple(self._sections)
+
+    def raw(self, name: str) -> Optional[bytes]:
+        if self._map is None or name not in self._sections:
+            return None
+        offset, length = self._sections[name]
+        return self._map[offset:offset + length]
+
+    def load(self, name: str) -> Any:
+        """Unpickle one section from the mapping; KeyError if it is absent."""
+
+        if self._map is None or name not in self._sections:
+            raise KeyError(name)
+        offset, length = self._sections[name]
+        with memoryview(self._map) as view:
+            return pickle.loads(view[offset:offset + length])
+
+    @classmethod
+    def write(cls, path: Union[str, "os.PathLike[str]"], sections: Dict[str, bytes]) -> int:
+        """Atomically replace ``path`` with pickled ``sections``; returns its size."""
+
+        path = Path(path)
+        names = [(name, name.encode("utf-8")) for name in sections]
+        offset = _HEADER.size + sum(_ENTRY.size + len(encoded) for _, encoded in names)
+        index = [_HEADER.pack(MAGIC, FORMAT_VERSION, len(names))]
+        for name, encoded in names:
+            index.append(_ENTRY.pack(len(encoded), offset, len(sections[name])) + encoded)
+            offset += len(sections[name])
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(temporary, "wb") as handle:
+            handle.writelines(index)
+            handle.writelines(sections[name] for name, _ in names)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+        return offset
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._sections = {}
+
+
+class WarmStateManager:
+    """Restores and periodically snapshots registered warm-state sections.
+
+    Each section is an ``(export, restore)`` pair of plain or coroutine
+    functions. :meth:`start` merges whatever the snapshot holds into the
+    components once, then saves every ``interval`` seconds. Writers take a
+    lock on the file and merge their sections into the ones on disk (see
+    :func:`merge_section`), and sections they did not register are carried
+    over unchanged, so several processes can share one snapshot without a
+    cold one overwriting it.
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"], interval: float = 300.0) -> None:
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.path = Path(path)
+        self.interval = interval
+        self._snapshot = WarmStateFile(self.path)
+        # Map the previous snapshot now; sections are decoded on restore.
+        self._snapshot.open()
+        self._sections: Dict[str, Tuple[Export, Restore]] = {}
+        self._started = False
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["WarmStateManager"]:
+        path = os.getenv("AGENT_SNAPSHOT_PATH")
+        if not path:
+            return None
+        return cls(path, interval=float(os.getenv("AGENT_SNAPSHOT_INTERVAL", "300")))
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    async def start(self, sections: Dict[str, Tuple[Export, Restore]]) -> int:
+        """Restore ``sections`` from the snapshot and begin saving them.
+
+        Only the first call has any effect. Returns the number of sections
+        restored.
+        """
+
+        async with self._lock:
+            if self._started:
+                return 0
+            self._started = True
+            self._sections = dict(sections)
+            restored = 0
+            for name, (_, restore) in self._sections.items():
+                if name not in self._snapshot.sections:
+                    continue
+                try:
+                    # Sections can be large; decode them off the loop.
+                    value = await asyncio.to_thread(self._snapshot.load, name)
+                    result = restore(value)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as exc:
+                    _RESTORES.inc("error")
+                    self.logger.warning("Could not restore warm state %s: %s", name, exc)
+                    continue
+                _RESTORES.inc("success")
+                restored += 1
+        if restored:
+            self.logger.info("Restored %d warm-state sections from %s", restored, self.path)
+        if self.interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return restored
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.save()
+
+    async def save(self) -> Optional[int]:
+        """Write a snapshot now; returns its size or None if it failed."""
+
+        started = time.perf_counter()
+        async with self._lock:
+            try:
+                # Copy state on the loop, then pickle and write off it.
+                exported = {}
+                for name, (export, _) in self._sections.items():
+                    value = export()
+                    exported[name] = await value if inspect.isawaitable(value) else value
+                size = await asyncio.to_thread(self._write, exported)
+            except Exception as exc:
+                _SNAPSHOTS.inc("error")
+                self.logger.warning("Could not write warm-state snapshot %s: %s", self.path, exc)
+                return None
+        _SNAPSHOTS.inc("success")
+        self.logger.debug(
+            "Wrote %d byte warm-state snapshot in %.1f ms", size, (time.perf_counter() - started) * 1000
+        )
+        return size
+
+    def _write(self, exported: Dict[str, Any]) -> int:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_name(f".{self.path.name}.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            # Merge into the latest file on disk; other sections are kept as is.
+            self._snapshot.open()
+            bodies = {}
+            for name, value in exported.items():
+                if name in self._snapshot.sections:
+                    try:
+                        value = merge_section(self._snapshot.load(name), value)
+                    except Exception as exc:
+                        self.logger.debug("Replacing unreadable warm-state section %s: %s", name, exc)
+                bodies[name] = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            for name in self._snapshot.sections:
+                if name not in bodies:
+                    bodies[name] = self._snapshot.raw(name)
+            size = WarmStateFile.write(self.path, bodies)
+            self._snapshot.open()
+        return size
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._snapshot.close()
@@ -0,0 +1,120 @@
+"""Worker load for LiveKit dispatch, from live pipeline pressure."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict
+
+from .metrics import REGISTRY
+
+_WORKER_LOAD = REGISTRY.gauge("voice_agent_worker_load", "Load reported to LiveKit dispatch (0-1).")
+_LOAD_FACTORS = REGISTRY.gauge(
+    "voice_agent_worker_load_factor", "Pipeline pressures as a fraction of their limits.", ("factor",)
+)
+
+
+@dataclass
+class LoadSample:
+    in_flight: int
+    translation_queue: int
+    loop_lag: float
+    received: float
+
+
+class WorkerLoad:
+    """Aggregates job-process pressure into the worker's dispatch load.
+
+    Job processes call :meth:`report` about once a second through the state
+    daemon. :meth:`load` is the ``load_fnc`` for ``WorkerOptions``: each
+    pressure is normalised by its limit, the highest one wins (so the
+    bottleneck decides), and the result is smoothed so the worker does not
+    flap around ``load_threshold``. Samples from processes that stopped
+    reporting are dropped after ``stale_after`` seconds.
+
+    Reports only reach the parent through the shared state daemon; without
+    it each job process would fill its own instance, so the worker then
+    keeps LiveKit's default load function. Samples are guarded by a thread
+    lock, as ``load`` and ``snapshot`` may be called from other threads.
+    """
+
+    def __init__(
+        self,
+        max_turns: int = 16,
+        max_translation_queue: int = 8,
+        max_loop_lag: float = 0.1,
+        stale_after: float = 5.0,
+        smoothing: float = 0.5,
+    ) -> None:
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.max_turns = max_turns
+        self.max_translation_queue = max_translation_queue
+        self.max_loop_lag = max_loop_lag
+        self.stale_after = stale_after
+        self.smoothing = smoothing
+        self._samples: Dict[int, LoadSample] = {}
+        self._samples_lock = threading.Lock()
+        self._load = 0.0
+
+    @classmethod
+    def from_env(cls) -> "WorkerLoad":
+        return cls(
+            max_turns=int(os.getenv("AGENT_LOAD_MAX_TURNS", "16")),
+            max_translation_queue=int(os.getenv("AGENT_LOAD_MAX_TRANSLATION_QUEUE", "8")),
+            max_loop_lag=float(os.getenv("AGENT_LOAD_MAX_LOOP_LAG_MS", "100")) / 1000,
+        )
+
+    async def report(self, pid: int, in_flight: int, translation_queue: int, loop_lag: float) -> None:
+        """Record the latest pressure of job process ``pid``."""
+
+        sample = LoadSample(in_flight, translation_queue, loop_lag, time.monotonic())
+        with self._samples_lock:
+            self._samples[pid] = sample
+
+    def _current_samples(self) -> Dict[int, LoadSample]:
+        """Drop stale samples and return a copy of the rest."""
+
+        cutoff = time.monotonic() - self.stale_after
+        with self._samples_lock:
+            for pid, sample in list(self._samples.items()):
+                if sample.received < cutoff:
+                    del self._samples[pid]
+            return dict(self._samples)
+
+    def factors(self) -> Dict[str, float]:
+        """Current pressures, each as a fraction of its limit."""
+
+        samples = list(self._current_samples().values())
+        factors = {
+            "turns": sum(sample.in_flight for sample in samples) / self.max_turns,
+            "translation_queue": sum(sample.translation_queue for sample in samples) / self.max_translation_queue,
+            # Every job process has its own loop; the most lagged one is the limit.
+            "loop_lag": max((sample.loop_lag for sample in samples), default=0.0) / self.max_loop_lag,
+        }
+        try:
+            factors["cpu"] = os.getloadavg()[0] / (os.cpu_count() or 1)
+        except OSError:  # pragma: no cover - not available on this platform
+            pass
+        return factors
+
+    def load(self, worker: Any = None) -> float:
+        """``load_fnc`` for LiveKit: 0 is idle, 1 is at capacity."""
+
+        factors = self.factors()
+        for name, value in factors.items():
+            _LOAD_FACTORS.set(value, name)
+        current = max(factors.values())
+        # Rise immediately, decay gradually: new jobs stop as soon as pressure appears.
+        self._load = min(1.0, max(current, self.smoothing * self._load + (1 - self.smoothing) * current))
+        _WORKER_LOAD.set(self._load)
+        return self._load
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "load": round(self._load, 3),
+            "factors": {name: round(value, 3) for name, value in self.factors().items()},
+            "processes": {pid: asdict(sample) for pid, sample in self._current_samples().items()},
+        }